@@ -1,106 +1,74 @@
 """
 Base class for Bible objects
 """
+import contextlib
+import os
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import List, Tuple
-from multipledispatch import dispatch
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Any, Callable, ContextManager, Dict, Hashable, Iterable, Iterator, List, Mapping, Optional,
+    Sequence, Tuple, Union
+)
 
 from bibles.book import Book
+from bibles.canon import (
+    BOOKS, CHAPTER_COUNTS, chapter_ordinal, chapter_reference, next_chapter, previous_chapter
+)
+from bibles.compresscache import CompressCache
+from bibles.passage import PassageFailedRecently, PassageInvalid, PassageNotFound
+from bibles.readahead import ReadAhead
+from bibles.singleflight import SingleFlight
+from bibles.versestore import split_verse
+
+
+# Number of chapters whose verse index each version keeps
+VERSE_INDEX_SIZE: int = 256
+
+# Default number of uncached chapters get_passages fetches at once
+PARALLEL_FETCHES: int = 8
+
+# Seconds a failed fetch is remembered, failing repeats of it fast (0 turns this off)
+NEGATIVE_TTL: float = float(os.environ.get("BIBLE_NEGATIVE_TTL", "60"))
 
 
 class Bible(ABC):
     """
     Abstract class for future implementation of other versions
     """
+    # Uncached chapters get_passages may fetch at once, for versions fetched over the network
+    parallel_fetches: int = PARALLEL_FETCHES
 
     def __init__(self) -> None:
         """
-        Instantiate the abstract Bible class and its attribute
-        """
-        books_of_the_bible: List[Tuple[str, int]] = [("Genesis", 50),
-                                                     ("Exodus", 40),
-                                                     ("Leviticus", 27),
-                                                     ("Numbers", 36),
-                                                     ("Deuteronomy", 34),
-                                                     ("Joshua", 24),
-                                                     ("Judges", 21),
-                                                     ("Ruth", 4),
-                                                     ("1 Samuel", 31),
-                                                     ("2 Samuel", 24),
-                                                     ("1 Kings", 22),
-                                                     ("2 Kings", 25),
-                                                     ("1 Chronicles", 29),
-                                                     ("2 Chronicles", 36),
-                                                     ("Ezra", 10),
-                                                     ("Nehemiah", 13),
-                                                     ("Esther", 10),
-                                                     ("Job", 42),
-                                                     ("Psalms", 150),
-                                                     ("Proverbs", 31),
-                                                     ("Ecclesiastes", 12),
-                                                     ("Song of Solomon", 8),
-                                                     ("Isaiah", 66),
-                                                     ("Jeremiah", 52),
-                                                     ("Lamentations", 5),
-                                                     ("Ezekiel", 48),
-                                                     ("Daniel", 12),
-                                                     ("Hosea", 14),
-                                                     ("Joel", 3),
-                                                     ("Amos", 9),
-                                                     ("Obadiah", 1),
-                                                     ("Jonah", 4),
-                                                     ("Micah", 7),
-                                                     ("Nahum", 3),
-                                                     ("Habakkuk", 3),
-                                                     ("Zephaniah", 3),
-                                                     ("Haggai", 2),
-                                                     ("Zechariah", 14),
-                                                     ("Malachi", 4),
-                                                     ("Matthew", 28),
-                                                     ("Mark", 16),
-                                                     ("Luke", 24),
-                                                     ("John", 21),
-                                                     ("Acts", 28),
-                                                     ("Romans", 16),
-                                                     ("1 Corinthians", 16),
-                                                     ("2 Corinthians", 13),
-                                                     ("Galatians", 6),
-                                                     ("Ephesians", 6),
-                                                     ("Philippians", 4),
-                                                     ("Colossians", 4),
-                                                     ("1 Thessalonians", 5),
-                                                     ("2 Thessalonians", 3),
-                                                     ("1 Timothy", 6),
-                                                     ("2 Timothy", 4),
-                                                     ("Titus", 3),
-                                                     ("Philemon", 1),
-                                                     ("Hebrews", 13),
-                                                     ("James", 5),
-                                                     ("1 Peter", 5),
-                                                     ("2 Peter", 3),
-                                                     ("1 John", 5),
-                                                     ("2 John", 1),
-                                                     ("3 John", 1),
-                                                     ("Jude", 1),
-                                                     ("Revelation", 22)]
-        self.__books: List[Book] = [
-            Book(title, chapters) for title, chapters in books_of_the_bible
-        ]
-        self.__books_of_the_bible: dict = dict(books_of_the_bible)
+        Instantiate the abstract Bible class and its verse index.
+        The canon tables are module level and shared by every version (see bibles.canon).
+        """
+        # (book, chapter) -> (the verse lists the index was built from, verse number ->
+        # (heading, position)), least recently used first
+        self.__verse_indexes: OrderedDict = OrderedDict()
+        self.__verse_index_lock = threading.Lock()
+        self.__read_ahead: Optional[ReadAhead] = None
+        self.__flights = SingleFlight()
+        # Fetch key -> (monotonic expiry, the failure) of recently failed fetches
+        self.__failures: Dict[Hashable, Tuple[float, BaseException]] = {}
+        self.__failures_lock = threading.Lock()
 
     @property
-    def books(self) -> List[Book]:
+    def books(self) -> Tuple[Book, ...]:
         """
-        List of book objects for each book in the Bible
+        Book objects for each book in the Bible
         """
-        return self.__books
+        return BOOKS
 
     @property
-    def books_of_the_bible(self) -> dict:
+    def books_of_the_bible(self) -> Mapping[str, int]:
         """
-        List of book dictionaries for each book in the Bible
+        Read-only mapping of each book in the Bible to its chapter count
         """
-        return self.__books_of_the_bible
+        return CHAPTER_COUNTS
 
     @abstractmethod
     def get_passage(self, book, chapter) -> dict:
@@ -112,59 +80,160 @@ class Bible(ABC):
         """
         raise NotImplementedError
 
-    @dispatch(str, str)
-    def next_passage(self, book: str, chapter: str) -> Tuple[str, str]:
+    def is_cached(self, book: str, chapter: int) -> bool:
         """
-        Get the passage after the given one.
-        :param book: The current book.
-        :param chapter: The current chapter.
-        :return: The next book and chapter reference.
+        Whether get_passage can return a chapter without fetching it.
+        Versions that fetch over the network override this; local versions are always cached.
+        :param book: The book of the chapter.
+        :param chapter: The chapter.
+        :return: True if the chapter is cached (or invalid, so get_passage fails fast).
         """
-        return self.next_passage(book, int(chapter))
+        return True
 
-    # pylint: disable=function-redefined,inconsistent-return-statements
-    @dispatch(str, int)
-    def next_passage(self, book: str, chapter: int) -> Tuple[str, str]:
+    def deferred_saves(self) -> ContextManager:
         """
-        Get the passage after the given one.
-        :param book: The current book.
-        :param chapter: The current chapter.
-        :return: The next book and chapter reference.
+        Context in which cache saves are held back and made once on exit.
+        Versions with a cache on disk override this; by default nothing is deferred.
+        :return: The context manager.
         """
-        it_books = iter(self.__books_of_the_bible)
-        for key in it_books:
-            if key == book:
-                if chapter == self.__books_of_the_bible[key]:
-                    return next(it_books, "Genesis"), "1"
-                return book, str(chapter + 1)
+        return contextlib.nullcontext()
 
-    @dispatch(str, str)
-    def previous_passage(self, book: str, chapter: str) -> Tuple[str, str]:
+    def enable_read_ahead(self, previous: bool = False, max_workers: int = 2) -> None:
         """
-        Get the passage before the given one.
+        Fetches the chapters around each chapter read in the background, for versions that
+        fetch over the network. Off by default.
+        :param previous: Also fetch the previous chapter, not only the next one.
+        :param max_workers: Chapters fetched at once.
+        :return: None
+        """
+        self.disable_read_ahead()
+        self.__read_ahead = ReadAhead(self, previous, max_workers)
+
+    def disable_read_ahead(self) -> None:
+        """
+        Stops reading ahead, cancelling queued fetches.
+        :return: None
+        """
+        if self.__read_ahead is not None:
+            self.__read_ahead.shutdown()
+            self.__read_ahead = None
+
+    def pending_read_ahead(self) -> List[Tuple[str, int]]:
+        """
+        Chapters being read ahead.
+        :return: (book, chapter) of each queued or running fetch.
+        """
+        return self.__read_ahead.pending if self.__read_ahead is not None else []
+
+    def _read_ahead(self, book: str, chapter: int) -> None:
+        """
+        Called by get_passage implementations after serving a chapter, to start reading ahead
+        if it is enabled.
+        :param book: Book of the chapter served.
+        :param chapter: The chapter served.
+        :return: None
+        """
+        if self.__read_ahead is not None:
+            self.__read_ahead.around(book, chapter)
+
+    def _single_flight(self, key: Hashable, function: Callable[..., Any], *args) -> Any:
+        """
+        Runs a fetch, unless one for the same key is in flight, in which case its outcome is
+        waited for and shared. Used by get_passage implementations on a cache miss, so that
+        concurrent readers of an uncached chapter make one upstream request and one save.
+        A fetch that failed upstream (PassageNotFound, or a network error) is not retried for
+        NEGATIVE_TTL seconds; repeats fail straight away with PassageFailedRecently.
+        :param key: What is being fetched (i.e. (book, chapter)).
+        :param function: The fetch.
+        :param args: Arguments for the fetch.
+        :return: The fetch's result.
+        :raises: Whatever the fetch raised, or PassageFailedRecently (a PassageNotFound) if it
+        failed recently.
+        """
+        with self.__failures_lock:
+            failure = self.__failures.get(key)
+            if failure is not None and time.monotonic() >= failure[0]:
+                del self.__failures[key]
+                failure = None
+        if failure is not None:
+            passage = " ".join(map(str, key)) if isinstance(key, tuple) else str(key)
+            raise PassageFailedRecently(
+                f"{passage} (failed recently: {failure[1]})"
+            ) from failure[1]
+        try:
+            return self.__flights.do(key, function, *args)
+        except (PassageNotFound, OSError) as exc:
+            # requests.RequestException is an OSError
+            if NEGATIVE_TTL > 0:
+                with self.__failures_lock:
+                    self.__failures[key] = (time.monotonic() + NEGATIVE_TTL, exc)
+            raise
+
+    @property
+    def recent_failures(self) -> int:
+        """
+        Number of fetches currently failing fast after a recent failure.
+        """
+        now = time.monotonic()
+        with self.__failures_lock:
+            return sum(expiry > now for expiry, _ in self.__failures.values())
+
+    def get_passages(self, refs: Iterable[Sequence]) -> List[dict]:
+        """
+        Gets many chapters in one call.
+        Cached chapters are returned straight away, uncached ones are fetched concurrently
+        and the cache is saved once at the end.
+        :param refs: (book, chapter) references.
+        :return: One get_passage dictionary per reference, in the same order.
+        :raises: PassageInvalid or PassageNotFound as get_passage would, for the first failing
+        reference.
+        """
+        refs = [(ref[0], int(ref[1])) for ref in refs]
+        misses = list(dict.fromkeys(ref for ref in refs if not self.is_cached(*ref)))
+        fetched: Dict[Tuple[str, int], Future] = {}
+        if misses:
+            with self.deferred_saves():
+                with ThreadPoolExecutor(
+                        max_workers=max(1, min(len(misses), self.parallel_fetches))
+                ) as executor:
+                    for ref in misses:
+                        fetched[ref] = executor.submit(self.get_passage, *ref)
+        # In the order of the references, so the error raised is that of the first failing one
+        return [
+            fetched[ref].result() if ref in fetched else self.get_passage(*ref) for ref in refs
+        ]
+
+    # pylint: disable=inconsistent-return-statements
+    def next_passage(self, book: str, chapter: Union[str, int]) -> Tuple[str, str]:
+        """
+        Get the passage after the given one.
         :param book: The current book.
         :param chapter: The current chapter.
-        :return: The previous book and chapter reference.
+        :return: The next book and chapter reference.
         """
-        return self.previous_passage(book, int(chapter))
+        chapter = int(chapter)
+        ordinal = chapter_ordinal(book, chapter)
+        if ordinal is not None:
+            next_book, next_chapter_number = chapter_reference(next_chapter(ordinal))
+            return next_book, str(next_chapter_number)
+        if book in CHAPTER_COUNTS:
+            return book, str(chapter + 1)
 
-    # pylint: disable=function-redefined,inconsistent-return-statements
-    @dispatch(str, int)
-    def previous_passage(self, book: str, chapter: int) -> Tuple[str, str]:
+    # pylint: disable=inconsistent-return-statements
+    def previous_passage(self, book: str, chapter: Union[str, int]) -> Tuple[str, str]:
         """
         Get the passage before the given one.
         :param book: The current book.
         :param chapter: The current chapter.
         :return: The previous book and chapter reference.
         """
-        it_books = iter(self.__books_of_the_bible)
-        previous_key = "Revelation"
-        for key in it_books:
-            if key == book:
-                if chapter == 1:
-                    return previous_key, str(self.__books_of_the_bible[previous_key])
-                return book, str(chapter - 1)
-            previous_key = key
+        chapter = int(chapter)
+        ordinal = chapter_ordinal(book, chapter)
+        if ordinal is not None:
+            previous_book, previous_chapter_number = chapter_reference(previous_chapter(ordinal))
+            return previous_book, str(previous_chapter_number)
+        if book in CHAPTER_COUNTS:
+            return book, str(chapter - 1)
 
     def has_passage(self, book_name: str, chapter: int) -> bool:
         """
@@ -174,7 +243,7 @@ class Bible(ABC):
         :return: True if passage is valid, False if passage is invalid
         """
         try:
-            return 0 < chapter <= self.__books_of_the_bible[book_name]
+            return 0 < chapter <= CHAPTER_COUNTS[book_name]
         except KeyError:
             return False
 
@@ -185,6 +254,188 @@ class Bible(ABC):
         :return: Number of chapters in the book or 0 if invalid
         """
         try:
-            return self.__books_of_the_bible[book_name]
+            return CHAPTER_COUNTS[book_name]
         except KeyError:
             return 0
+
+    def get_verse(self, book: str, chapter: int, verse: int) -> str:
+        """
+        Gets a single verse.
+        :param book: The book to get from.
+        :param chapter: The chapter to get from.
+        :param verse: The verse number.
+        :return: The verse, in the same form as get_passage ("16 For God so loved...").
+        :raises: PassageInvalid for invalid chapters, PassageNotFound for missing verses.
+        """
+        verses = self.get_passage(book, int(chapter))['verses']
+        try:
+            heading, position = self._verse_index(book, int(chapter), verses)[int(verse)]
+        except KeyError as exc:
+            raise PassageNotFound(f"{book} {chapter}:{verse}") from exc
+        return verses[heading][position]
+
+    def get_range(self, start_ref: Sequence, end_ref: Sequence) -> List[dict]:
+        """
+        Gets a range of verses, which may cross chapter and book boundaries
+        (i.e. ("Genesis", 1, 26) to ("Genesis", 2, 3)).
+        :param start_ref: (book, chapter, verse) of the first verse. Without a verse, the range
+        starts at the beginning of the chapter.
+        :param end_ref: (book, chapter, verse) of the last verse. Without a verse, the range
+        ends at the end of the chapter.
+        :return: One get_passage dictionary per chapter, with its verses trimmed to the range.
+        :raises: PassageInvalid for invalid or reversed ranges, PassageNotFound for missing verses.
+        """
+        start_ordinal = chapter_ordinal(start_ref[0], start_ref[1])
+        end_ordinal = chapter_ordinal(end_ref[0], end_ref[1])
+        start_verse = int(start_ref[2]) if len(start_ref) > 2 else None
+        end_verse = int(end_ref[2]) if len(end_ref) > 2 else None
+        if (start_ordinal is None or end_ordinal is None or start_ordinal > end_ordinal or
+                (start_ordinal == end_ordinal and None not in (start_verse, end_verse) and
+                 start_verse > end_verse)):
+            raise PassageInvalid(
+                f"{' '.join(map(str, start_ref))} - {' '.join(map(str, end_ref))}"
+            )
+
+        result: List[dict] = []
+        passages = self.get_passages(
+            chapter_reference(ordinal) for ordinal in range(start_ordinal, end_ordinal + 1)
+        )
+        for ordinal, passage in zip(range(start_ordinal, end_ordinal + 1), passages):
+            book, chapter = chapter_reference(ordinal)
+            first = start_verse if ordinal == start_ordinal else None
+            last = end_verse if ordinal == end_ordinal else None
+            if first is not None or last is not None:
+                passage = dict(passage)
+                passage['verses'] = self.__trim(book, chapter, passage['verses'], first, last)
+            result.append(passage)
+        return result
+
+    def _verse_index(self, book: str, chapter: int, verses: dict) -> Dict[int, Tuple[str, int]]:
+        """
+        Gets the index of a chapter's verses, building it only when the chapter was not
+        indexed yet or its verses have since been replaced.
+        :param book: The book of the chapter.
+        :param chapter: The chapter.
+        :param verses: The chapter's verses, as in get_passage (heading -> list of verses).
+        :return: Verse number -> (heading, position within the heading).
+        """
+        key = (book, chapter)
+        lists = tuple(verses.values())
+        with self.__verse_index_lock:
+            cached = self.__verse_indexes.get(key)
+            if (cached is not None and len(cached[0]) == len(lists) and
+                    all(old is new for old, new in zip(cached[0], lists))):
+                self.__verse_indexes.move_to_end(key)
+                return cached[1]
+
+        index: Dict[int, Tuple[str, int]] = {}
+        for heading, heading_verses in verses.items():
+            for position, verse in enumerate(heading_verses):
+                number = split_verse(verse)[0]
+                if number and number not in index:
+                    index[number] = (heading, position)
+
+        with self.__verse_index_lock:
+            self.__verse_indexes[key] = (lists, index)
+            self.__verse_indexes.move_to_end(key)
+            if len(self.__verse_indexes) > VERSE_INDEX_SIZE:
+                self.__verse_indexes.popitem(last=False)
+        return index
+
+    def __trim(self, book: str, chapter: int, verses: dict, first, last) -> dict:
+        """
+        Trims a chapter's verses to those from the first to the last verse number.
+        :param book: The book of the chapter.
+        :param chapter: The chapter.
+        :param verses: The chapter's verses (heading -> list of verses).
+        :param first: First verse number to keep, or None to keep from the start.
+        :param last: Last verse number to keep, or None to keep to the end.
+        :return: The trimmed verses (heading -> list of verses).
+        :raises: PassageNotFound if either verse is missing.
+        """
+        index = self._verse_index(book, chapter, verses)
+        headings = list(verses)
+        try:
+            first_heading, first_position = index[first] if first is not None else (headings[0], 0)
+            last_heading, last_position = (
+                index[last] if last is not None
+                else (headings[-1], len(verses[headings[-1]]) - 1)
+            )
+        except KeyError as exc:
+            raise PassageNotFound(f"{book} {chapter}:{first}-{last}") from exc
+
+        trimmed = {}
+        first_heading_index = headings.index(first_heading)
+        last_heading_index = headings.index(last_heading)
+        for heading_index in range(first_heading_index, last_heading_index + 1):
+            heading = headings[heading_index]
+            start = first_position if heading_index == first_heading_index else 0
+            end = (last_position + 1 if heading_index == last_heading_index
+                   else len(verses[heading]))
+            if start < end:
+                trimmed[heading] = verses[heading][start:end]
+        return trimmed
+
+
+class NetworkBible(Bible):
+    """
+    Base class for versions fetched over the network and cached in json-bibles.
+    It owns the cache (book -> chapter -> verses), the lock guarding it and the CompressCache it
+    is saved with. Subclasses fill self._cache under self._lock and then call _mark_dirty.
+    """
+    def __init__(self, cache_name: str) -> None:
+        """
+        :param cache_name: Name the cache is saved under (i.e. csb).
+        """
+        super().__init__()
+        # Guards the cache against changes while it is being changed or serialized
+        self._lock = threading.RLock()
+        self._compress_cache = CompressCache(cache_name)
+        self._cache: dict = {}
+
+    def _load_cache(self, empty: Callable[[], Any]) -> None:
+        """
+        Loads the cache, starting empty entries for anything not cached yet (i.e. a new cache, or
+        missing shards).
+        :param empty: Makes the entry of a chapter that is not cached (i.e. list).
+        :return: None
+        """
+        try:
+            cached: dict = self._compress_cache.load()
+        except FileNotFoundError:
+            cached = {}
+        self._cache = {
+            book.name: {
+                str(chapter): cached.get(book.name, {}).get(str(chapter), empty())
+                for chapter in range(1, book.chapter_count + 1)
+            } for book in self.books
+        }
+
+    def is_cached(self, book: str, chapter: int) -> bool:
+        """
+        Whether a chapter is in the cache
+        :param book: Name of the book
+        :param chapter: the chapter
+        :return: True if cached, or if invalid so that get_passage fails fast
+        """
+        try:
+            return len(self._cache[book][str(chapter)]) > 0
+        except KeyError:
+            return True
+
+    @contextlib.contextmanager
+    def deferred_saves(self) -> Iterator[None]:
+        """
+        Coalesces the cache saves of a batch into one, made on exit (see Bible.get_passages)
+        :return: The context manager
+        """
+        with self._compress_cache.deferred():
+            yield
+
+    def _mark_dirty(self, books: Optional[Iterable[str]] = None) -> None:
+        """
+        Marks the cache dirty; the write-behind persister coalesces the saves.
+        :param books: The books that changed, or None for all of them.
+        :return: None
+        """
+        self._compress_cache.save_in_background(self._cache, self._lock, books)
@@ -0,0 +1,257 @@
+"""
+Base class for versions fetched from the bolls.life API, with an asyncio fetch engine
+"""
+import asyncio
+import atexit
+import contextlib
+import functools
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+import requests
+
+from bibles import session
+from bibles.bible import NetworkBible
+from bibles.bolls_translate import translate
+from bibles.passage import PassageInvalid, PassageNotFound
+
+
+API_URL: str = "https://bolls.life/get-chapter/"
+TAG_REMOVER: re.Pattern = re.compile(r'<.*?>')
+
+T = TypeVar('T')
+
+# Threads the asyncio fetches make their requests on, as many as the session keeps connections
+_executor_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_size: int = 0
+
+
+def _fetch_executor() -> ThreadPoolExecutor:
+    """
+    Gets the fetch threads, making them on first use and again whenever the session's pool
+    size has changed (see session.configure).
+    :return: The thread pool.
+    """
+    global _executor, _executor_size  # pylint: disable=global-statement
+    size = session.pool_size()
+    with _executor_lock:
+        if _executor is None or _executor_size != size:
+            if _executor is not None:
+                # Fetches already running finish on the old threads
+                _executor.shutdown(wait=False)
+            _executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="bolls-fetch")
+            _executor_size = size
+        return _executor
+
+
+def _shutdown_fetch_executor() -> None:
+    """
+    Stops the fetch threads at interpreter shutdown.
+    :return: None
+    """
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(_shutdown_fetch_executor)
+
+
+def run(awaitable: Awaitable[T]) -> T:
+    """
+    Runs a coroutine to completion from synchronous code.
+    When called from inside a running event loop, it runs on a private loop in a worker thread.
+    :param awaitable: The coroutine to run.
+    :return: Its result.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(awaitable)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, awaitable).result()
+
+
+async def gather_passages(requests_in: Iterable[Tuple['BollsBible', str, int]]) -> List[dict]:
+    """
+    Gets chapters of any number of bolls.life versions at once, from one thread.
+    Cached chapters are returned straight away. Uncached ones are fetched concurrently (up to
+    the session's pool size), and each version with misses saves its cache once at the end.
+    :param requests_in: (version, book, chapter) requests.
+    :return: One get_passage dictionary per request, in the same order.
+    :raises: PassageInvalid or PassageNotFound as get_passage would, for the first failing
+    request.
+    """
+    requests_in = [(bible, book, int(chapter)) for bible, book, chapter in requests_in]
+    unique: Dict[Tuple[int, str, int], Tuple['BollsBible', str, int]] = {
+        (id(bible), book, chapter): (bible, book, chapter) for bible, book, chapter in requests_in
+    }
+    missing = {
+        id(bible): bible for bible, book, chapter in unique.values()
+        if not bible.is_cached(book, chapter)
+    }
+    limit = asyncio.Semaphore(session.pool_size())
+
+    async def limited(bible: 'BollsBible', book: str, chapter: int) -> dict:
+        async with limit:
+            return await bible.get_passage_async(book, chapter)
+
+    with contextlib.ExitStack() as stack:
+        for bible in missing.values():
+            stack.enter_context(bible.deferred_saves())
+        # Let every fetch finish (and be cached) before raising the first failure
+        results = await asyncio.gather(
+            *(limited(*request) for request in unique.values()), return_exceptions=True
+        )
+    passages = dict(zip(unique, results))
+    ordered = [passages[(id(bible), book, chapter)] for bible, book, chapter in requests_in]
+    for passage in ordered:
+        if isinstance(passage, BaseException):
+            raise passage
+    return ordered
+
+
+def get_passages_many(requests_in: Iterable[Tuple['BollsBible', str, int]]) -> List[dict]:
+    """
+    Synchronous wrapper of gather_passages.
+    :param requests_in: (version, book, chapter) requests.
+    :return: One get_passage dictionary per request, in the same order.
+    """
+    return run(gather_passages(requests_in))
+
+
+class BollsBible(NetworkBible):
+    """
+    Base class for versions fetched from the bolls.life API and cached in json-bibles.
+    Subclasses only need to set translation and cache_name.
+    """
+    # bolls.life's code for the translation (i.e. NKJV)
+    translation: str = ""
+    cache_name: str = ""
+
+    def __init__(self) -> None:
+        """
+        Loads the cache, or starts an empty one.
+        """
+        super().__init__(self.cache_name)
+
+        # Caching
+        self._load_cache(list)
+
+        self.__api_url: str = f"{API_URL}{self.translation}/"
+
+    def get_passage(self, book: str, chapter: int) -> dict:
+        """
+        Gets a chapter, fetching it from the API on a cache miss
+        :param book: Name of the book to get from
+        :param chapter: the chapter to get
+        :return: dict of the chapter in the format
+        {"book": bookname, "chapter": chapter_number, "verses":
+            {'none': ["1 ...", "2 ..."]}}
+        :raises: PassageInvalid for invalid passages (According to Bible ABC validator)
+        """
+        if not super().has_passage(book, chapter):
+            raise PassageInvalid(book + " " + str(chapter))
+        if not self.is_cached(book, chapter):
+            self._single_flight((book, chapter), self.__fill, book, chapter)
+        self._read_ahead(book, chapter)
+        return self.__passage(book, chapter)
+
+    async def get_passage_async(self, book: str, chapter: int) -> dict:
+        """
+        Gets a chapter without blocking the event loop on a cache miss. Like get_passage, it
+        starts reading ahead (if enabled) once the chapter is served; that runs on the read-ahead
+        threads, not the loop.
+        :param book: Name of the book to get from
+        :param chapter: the chapter to get
+        :return: dict of the chapter, as get_passage
+        :raises: PassageInvalid for invalid passages (According to Bible ABC validator)
+        """
+        if not super().has_passage(book, chapter):
+            raise PassageInvalid(book + " " + str(chapter))
+        if not self.is_cached(book, chapter):
+            # The request itself runs in a fetch thread over the shared, pooled session
+            await asyncio.get_running_loop().run_in_executor(
+                _fetch_executor(),
+                functools.partial(self._single_flight, (book, chapter), self.__fill, book, chapter)
+            )
+        self._read_ahead(book, chapter)
+        return self.__passage(book, chapter)
+
+    async def get_passages_async(self, refs: Iterable[Sequence]) -> List[dict]:
+        """
+        Gets many chapters at once from an event loop (see gather_passages)
+        :param refs: (book, chapter) references
+        :return: One get_passage dictionary per reference, in the same order
+        """
+        return await gather_passages((self, ref[0], ref[1]) for ref in refs)
+
+    def get_passages(self, refs: Iterable[Sequence]) -> List[dict]:
+        """
+        Gets many chapters at once, fetching the uncached ones concurrently on an event loop
+        :param refs: (book, chapter) references
+        :return: One get_passage dictionary per reference, in the same order
+        """
+        return run(self.get_passages_async(refs))
+
+    def __passage(self, book: str, chapter: int) -> dict:
+        """
+        Formats a cached chapter
+        :param book: Name of the book (pre-validated)
+        :param chapter: chapter number (pre-validated)
+        :return: dict of the chapter
+        :raises: PassageNotFound if the chapter is missing from the cache
+        """
+        try:
+            return {
+                'book': book,
+                'chapter': chapter,
+                'verses': {
+                    'none': self._cache[book][str(chapter)]
+                }
+            }
+        except KeyError as exc:
+            raise PassageNotFound(book + " " + str(chapter)) from exc
+
+    def __fetch(self, book: str, chapter: int) -> List[str]:
+        """
+        Gets a chapter from the API
+        :param book: Name of the book to get (pre-validated)
+        :param chapter: chapter number to get (pre-validated)
+        :return: The verses of the chapter
+        """
+        try:
+            response = session.get(f"{self.__api_url}{translate(book)}/{chapter}/")
+            response.raise_for_status()
+            return [
+                str(verse['verse']) + " " + TAG_REMOVER.sub('', verse['text'])
+                for verse in response.json()
+            ]
+        except KeyError as exc:
+            raise PassageInvalid(book + " " + str(chapter)) from exc
+        except requests.HTTPError as exc:
+            raise PassageNotFound(book + " " + str(chapter)) from exc
+
+    def __fill(self, book: str, chapter: int) -> None:
+        """
+        Fetches and caches a chapter, unless a caller that just finished cached it already
+        :param book: Name of the book (pre-validated)
+        :param chapter: chapter number (pre-validated)
+        :return: None
+        """
+        if not self.is_cached(book, chapter):
+            self.__store(book, chapter, self.__fetch(book, chapter))
+
+    def __store(self, book: str, chapter: int, verses: List[str]) -> None:
+        """
+        Caches a fetched chapter
+        :param book: Name of the book (pre-validated)
+        :param chapter: chapter number (pre-validated)
+        :param verses: The verses of the chapter
+        :return: None
+        """
+        with self._lock:
+            self._cache[book][str(chapter)] = verses
+        self._mark_dirty((book,))
@@ -4,8 +4,11 @@ Base class representing a book of the Bible
 
 class Book:
     """
-    Defines a book of the Bible. Used for safety constraints
+    Defines a book of the Bible. Used for safety constraints.
+    Instances are shared by every version (see bibles.canon), so they are immutable and slotted.
     """
+    __slots__ = ('__name', '__chapter_count')
+
     def __init__(self, title: str, chapter_count: int) -> None:
         """
         :param title: The title of the book.
@@ -30,3 +33,6 @@ class Book:
 
     def __eq__(self, other) -> bool:
         return other.name == self.__name
+
+    def __hash__(self) -> int:
+        return hash(self.__name)
@@ -0,0 +1,155 @@
+"""
+Circuit breakers for the upstream hosts of the network-backed versions.
+After repeated failures a host's circuit opens and requests to it fail at once instead of
+tying up a worker for the full timeout. After a cool-down one probe request is let through,
+and its outcome closes the circuit again or keeps it open.
+"""
+import os
+import threading
+import time
+from typing import Dict, Union
+from urllib.parse import urlsplit
+
+import requests
+
+
+# Consecutive failures that open a host's circuit, and seconds it stays open before a probe
+FAILURE_THRESHOLD: int = int(os.environ.get("BIBLE_BREAKER_FAILURES", "5"))
+RESET_TIMEOUT: float = float(os.environ.get("BIBLE_BREAKER_RESET", "30"))
+
+CLOSED: str = "closed"
+OPEN: str = "open"
+HALF_OPEN: str = "half-open"
+
+
+class CircuitOpen(requests.ConnectionError):
+    """
+    Raised instead of sending a request to a host whose circuit is open.
+    It is a requests.ConnectionError, so callers handle it as they would the host being down.
+    """
+
+
+class CircuitBreaker:
+    """
+    Tracks the failures of one upstream host.
+    """
+    def __init__(
+            self,
+            host: str,
+            threshold: int = FAILURE_THRESHOLD,
+            reset_timeout: float = RESET_TIMEOUT
+    ) -> None:
+        """
+        :param host: The host guarded (i.e. bolls.life).
+        :param threshold: Consecutive failures that open the circuit.
+        :param reset_timeout: Seconds the circuit stays open before a probe request.
+        """
+        self.__host = host
+        self.__threshold = threshold
+        self.__reset_timeout = reset_timeout
+        self.__lock = threading.Lock()
+        self.__state: str = CLOSED
+        self.__failures: int = 0
+        self.__opened_at: float = 0.0
+        self.__rejected: int = 0
+        self.__total_failures: int = 0
+
+    @property
+    def state(self) -> str:
+        """
+        closed, open or half-open (a probe request is in flight).
+        """
+        with self.__lock:
+            return self.__state
+
+    def before(self) -> None:
+        """
+        Checks that a request may be sent.
+        :return: None
+        :raises: CircuitOpen if the circuit is open, or half-open with a probe already in flight.
+        """
+        with self.__lock:
+            if self.__state == OPEN \
+                    and time.monotonic() - self.__opened_at >= self.__reset_timeout:
+                # Let this request through as the probe
+                self.__state = HALF_OPEN
+                return
+            if self.__state != CLOSED:
+                self.__rejected += 1
+                raise CircuitOpen(f"{self.__host} is failing; not retrying for now")
+
+    def success(self) -> None:
+        """
+        Records a successful request, closing the circuit.
+        :return: None
+        """
+        with self.__lock:
+            self.__state = CLOSED
+            self.__failures = 0
+
+    def failure(self) -> None:
+        """
+        Records a failed request, opening the circuit after enough of them in a row, or at once
+        if it was the probe.
+        :return: None
+        """
+        with self.__lock:
+            self.__failures += 1
+            self.__total_failures += 1
+            if self.__state == HALF_OPEN or self.__failures >= self.__threshold:
+                self.__state = OPEN
+                self.__opened_at = time.monotonic()
+
+    def health(self) -> Dict[str, Union[str, int, float]]:
+        """
+        The breaker's state, for monitoring.
+        :return: {"state", "failures": consecutive failures, "total_failures",
+        "rejected": requests failed fast, "retry_in": seconds until the next probe}
+        """
+        with self.__lock:
+            retry_in = max(
+                self.__reset_timeout - (time.monotonic() - self.__opened_at), 0.0
+            ) if self.__state == OPEN else 0.0
+            return {
+                "state": self.__state,
+                "failures": self.__failures,
+                "total_failures": self.__total_failures,
+                "rejected": self.__rejected,
+                "retry_in": round(retry_in, 3)
+            }
+
+
+_lock = threading.Lock()
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def breaker_for(url: str) -> CircuitBreaker:
+    """
+    Gets the breaker of a URL's host, making it on first use.
+    :param url: URL about to be requested.
+    :return: The host's breaker.
+    """
+    host = urlsplit(url).netloc
+    with _lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host)
+        return _breakers[host]
+
+
+def health() -> Dict[str, Dict[str, Union[str, int, float]]]:
+    """
+    Health of every upstream host requested so far.
+    :return: host -> CircuitBreaker.health()
+    """
+    with _lock:
+        breakers = dict(_breakers)
+    return {host: breaker.health() for host, breaker in breakers.items()}
+
+
+def reset() -> None:
+    """
+    Forgets every breaker, closing all circuits.
+    :return: None
+    """
+    with _lock:
+        _breakers.clear()
@@ -0,0 +1,153 @@
+"""
+The canon of the Bible: books, chapter counts, and chapter ordinals.
+Everything here is built once at import and shared by every version.
+"""
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+
+from bibles.book import Book
+
+
+# Books of the Bible, in order, with their chapter counts
+BOOKS_OF_THE_BIBLE: Tuple[Tuple[str, int], ...] = (
+    ("Genesis", 50),
+    ("Exodus", 40),
+    ("Leviticus", 27),
+    ("Numbers", 36),
+    ("Deuteronomy", 34),
+    ("Joshua", 24),
+    ("Judges", 21),
+    ("Ruth", 4),
+    ("1 Samuel", 31),
+    ("2 Samuel", 24),
+    ("1 Kings", 22),
+    ("2 Kings", 25),
+    ("1 Chronicles", 29),
+    ("2 Chronicles", 36),
+    ("Ezra", 10),
+    ("Nehemiah", 13),
+    ("Esther", 10),
+    ("Job", 42),
+    ("Psalms", 150),
+    ("Proverbs", 31),
+    ("Ecclesiastes", 12),
+    ("Song of Solomon", 8),
+    ("Isaiah", 66),
+    ("Jeremiah", 52),
+    ("Lamentations", 5),
+    ("Ezekiel", 48),
+    ("Daniel", 12),
+    ("Hosea", 14),
+    ("Joel", 3),
+    ("Amos", 9),
+    ("Obadiah", 1),
+    ("Jonah", 4),
+    ("Micah", 7),
+    ("Nahum", 3),
+    ("Habakkuk", 3),
+    ("Zephaniah", 3),
+    ("Haggai", 2),
+    ("Zechariah", 14),
+    ("Malachi", 4),
+    ("Matthew", 28),
+    ("Mark", 16),
+    ("Luke", 24),
+    ("John", 21),
+    ("Acts", 28),
+    ("Romans", 16),
+    ("1 Corinthians", 16),
+    ("2 Corinthians", 13),
+    ("Galatians", 6),
+    ("Ephesians", 6),
+    ("Philippians", 4),
+    ("Colossians", 4),
+    ("1 Thessalonians", 5),
+    ("2 Thessalonians", 3),
+    ("1 Timothy", 6),
+    ("2 Timothy", 4),
+    ("Titus", 3),
+    ("Philemon", 1),
+    ("Hebrews", 13),
+    ("James", 5),
+    ("1 Peter", 5),
+    ("2 Peter", 3),
+    ("1 John", 5),
+    ("2 John", 1),
+    ("3 John", 1),
+    ("Jude", 1),
+    ("Revelation", 22)
+)
+
+# Shared Book objects, in canonical order
+BOOKS: Tuple[Book, ...] = tuple(Book(title, chapters) for title, chapters in BOOKS_OF_THE_BIBLE)
+
+# Book name -> chapter count
+CHAPTER_COUNTS: Mapping[str, int] = MappingProxyType(dict(BOOKS_OF_THE_BIBLE))
+
+# Chapter ordinal - 1 -> (book, chapter), for ordinals 1 (Genesis 1) to 1189 (Revelation 22)
+CHAPTERS: Tuple[Tuple[str, int], ...] = tuple(
+    (title, chapter)
+    for title, chapters in BOOKS_OF_THE_BIBLE
+    for chapter in range(1, chapters + 1)
+)
+CHAPTER_TOTAL: int = len(CHAPTERS)
+
+
+def _first_ordinals() -> Dict[str, int]:
+    """
+    Computes the ordinal of the first chapter of each book.
+    :return: Book name -> ordinal of its first chapter.
+    """
+    ordinals: Dict[str, int] = {}
+    ordinal = 1
+    for title, chapters in BOOKS_OF_THE_BIBLE:
+        ordinals[title] = ordinal
+        ordinal += chapters
+    return ordinals
+
+
+# Book name -> ordinal of its first chapter
+FIRST_ORDINALS: Mapping[str, int] = MappingProxyType(_first_ordinals())
+
+
+def chapter_ordinal(book: str, chapter: int) -> Optional[int]:
+    """
+    Gets the canonical ordinal of a chapter.
+    :param book: Name of the book.
+    :param chapter: Chapter of the book.
+    :return: The ordinal (1 to 1189), or None for chapters that do not exist.
+    """
+    chapter = int(chapter)
+    if 0 < chapter <= CHAPTER_COUNTS.get(book, 0):
+        return FIRST_ORDINALS[book] + chapter - 1
+    return None
+
+
+def chapter_reference(ordinal: int) -> Tuple[str, int]:
+    """
+    Gets the book and chapter of a canonical ordinal.
+    :param ordinal: The ordinal (1 to 1189).
+    :return: The book and chapter.
+    :raises: IndexError for ordinals outside the canon.
+    """
+    if not 0 < ordinal <= CHAPTER_TOTAL:
+        raise IndexError(f"Chapter ordinal {ordinal} is outside the canon")
+    return CHAPTERS[ordinal - 1]
+
+
+def next_chapter(ordinal: int) -> int:
+    """
+    Gets the ordinal after the given one, wrapping from Revelation 22 to Genesis 1.
+    :param ordinal: The current ordinal.
+    :return: The next ordinal.
+    """
+    return ordinal % CHAPTER_TOTAL + 1
+
+
+def previous_chapter(ordinal: int) -> int:
+    """
+    Gets the ordinal before the given one, wrapping from Genesis 1 to Revelation 22.
+    :param ordinal: The current ordinal.
+    :return: The previous ordinal.
+    """
+    return (ordinal - 2) % CHAPTER_TOTAL + 1
@@ -0,0 +1,103 @@
+"""
+Compression codecs for the cached JSON of the Bible.
+zstd and lz4 are only available when the zstandard and lz4 packages are installed.
+"""
+import bz2
+import lzma
+import zlib
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+
+class Codec(NamedTuple):
+    """
+    A compression codec and how to recognize its files.
+    """
+    name: str
+    extension: str
+    magic: bytes
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+def _raw(data: bytes) -> bytes:
+    """
+    Identity "compression" for uncompressed JSON.
+    :param data: The data.
+    :return: The same data.
+    """
+    return data
+
+
+CODECS: Dict[str, Codec] = {
+    'bz2': Codec('bz2', '.json.pbz2', b'BZh', bz2.compress, bz2.decompress),
+    'lzma': Codec(
+        'lzma', '.json.xz', b'\xfd7zXZ\x00',
+        lambda data: lzma.compress(data, preset=9), lzma.decompress
+    ),
+    'zlib': Codec(
+        'zlib', '.json.zz', b'\x78', lambda data: zlib.compress(data, 9), zlib.decompress
+    ),
+    'raw': Codec('raw', '.json', b'', _raw, _raw),
+}
+if zstandard is not None:
+    CODECS['zstd'] = Codec(
+        'zstd', '.json.zst', b'\x28\xb5\x2f\xfd',
+        zstandard.ZstdCompressor(level=19).compress,
+        zstandard.ZstdDecompressor().decompress
+    )
+if lz4 is not None:
+    CODECS['lz4'] = Codec(
+        'lz4', '.json.lz4', b'\x04\x22\x4d\x18',
+        lambda data: lz4.frame.compress(data, compression_level=16), lz4.frame.decompress
+    )
+
+# Order in which existing files are looked for, fastest to decompress first. bz2 is last since
+# every other format only exists if it was deliberately converted to.
+LOAD_ORDER: List[str] = [
+    name for name in ('raw', 'lz4', 'zstd', 'zlib', 'lzma', 'bz2') if name in CODECS
+]
+
+
+def get_codec(name: str) -> Codec:
+    """
+    Gets a codec by name.
+    :param name: Name of the codec (i.e. bz2).
+    :return: The codec.
+    :raises: ValueError for unknown or uninstalled codecs.
+    """
+    try:
+        return CODECS[name]
+    except KeyError as exc:
+        raise ValueError(f"Codec {name} is unknown or not installed") from exc
+
+
+def detect_codec(data: bytes, path: Optional[str] = None) -> Codec:
+    """
+    Detects the codec of compressed data from its header, falling back to the file extension.
+    :param data: The start of the compressed data.
+    :param path: Path of the file the data came from.
+    :return: The detected codec.
+    :raises: ValueError if the codec cannot be detected or is not installed.
+    """
+    for codec in CODECS.values():
+        if codec.magic and data.startswith(codec.magic):
+            # zlib only has a one byte signature, so also check its header checksum
+            if codec.name != 'zlib' or (len(data) > 1 and (data[0] << 8 | data[1]) % 31 == 0):
+                return codec
+    if data.lstrip()[:1] in (b'{', b'['):
+        return CODECS['raw']
+    if path is not None:
+        for codec in CODECS.values():
+            if path.endswith(codec.extension):
+                return codec
+    raise ValueError(f"Unable to detect the codec of {path or 'the data'}")
@@ -1,41 +1,571 @@
 """
 For saving and loading compressed JSON of the Bible.
 """
-import bz2
+import contextlib
+import itertools
 import json
 import os
+import stat
+import struct
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import ContextManager, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+from bibles.codec import Codec, LOAD_ORDER, detect_codec, get_codec
+from bibles.dedup import VersePool
+from bibles.delta import apply_delta, make_delta
+from bibles.persister import PERSISTER
+
+
+# Chapter-indexed container layout:
+#   magic (4 bytes) | format version (1 byte) | header length (uint32, big endian) |
+#   header JSON | independently compressed chapter blocks
+INDEXED_MAGIC: bytes = b"CIDX"
+INDEXED_VERSION: int = 1
+_PREAMBLE = struct.Struct(">4sBI")
+
+# Directory the caches are kept in, next to the bundled versions
+CACHE_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "json-bibles")
+
+# Codec for versions that do not have a cache file yet
+DEFAULT_CODEC: str = os.environ.get("BIBLE_CODEC", "bz2")
+
+# Whether to share identical verse strings across versions from the start
+DEDUP: bool = os.environ.get("BIBLE_DEDUP", "").lower() in ("1", "true", "yes")
+
+# Whether versions without a cache yet save one shard per book (see CompressCache.save_sharded)
+SHARDED: bool = os.environ.get("BIBLE_SHARDED", "").lower() in ("1", "true", "yes")
+# Lists the codec and the books, in order, of a sharded cache
+MANIFEST: str = "manifest.json"
+
+
+def merge_books(
+        first: Optional[FrozenSet[str]],
+        second: Optional[FrozenSet[str]]
+) -> Optional[FrozenSet[str]]:
+    """
+    Combines two sets of changed books, where None stands for every book.
+    :param first: Changed books, or None.
+    :param second: Changed books, or None.
+    :return: The union, or None if either is None.
+    """
+    if first is None or second is None:
+        return None
+    return first | second
+
+
+def _write_atomic(path: str, chunks: Iterable[bytes]) -> int:
+    """
+    Writes a file through a temporary file in the same directory that is renamed over it,
+    so readers and concurrent writers never see a partly written file.
+    :param path: Path of the file to write.
+    :param chunks: The content.
+    :return: Bytes written.
+    """
+    written = 0
+    directory, name = os.path.split(path)
+    handle, temp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory)
+    try:
+        # mkstemp creates the file private to the owner; keep the usual permissions instead
+        os.chmod(
+            temp_path, stat.S_IMODE(os.stat(path).st_mode) if os.path.exists(path) else 0o644
+        )
+        with os.fdopen(handle, "wb") as data_file:
+            for chunk in chunks:
+                written += data_file.write(chunk)
+            data_file.flush()
+            os.fsync(data_file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return written
+
+
+def write_json(path: str, data) -> int:
+    """
+    Writes a small JSON file kept beside the caches (i.e. recency or progress), atomically
+    (see _write_atomic).
+    :param path: Path of the file to write.
+    :param data: What to write, as JSON.
+    :return: Bytes written.
+    """
+    return _write_atomic(path, (json.dumps(data).encode("utf-8"),))
+
+
+def _timed_load(name: str, directory: str) -> Tuple[str, dict, float]:
+    """
+    Loads a version and times it. Module level so that it can run in a worker process.
+    :param name: Name of the version to load.
+    :param directory: Directory of its cache (see CACHE_DIR).
+    :return: The name, the loaded dictionary, and the seconds taken to load it.
+    """
+    start = time.perf_counter()
+    data = CompressCache(name, directory=directory).load(dedup=False)
+    return name, data, time.perf_counter() - start
 
 
 class CompressCache:
     """
     For saving and loading compressed JSON of the Bible.
     """
-    def __init__(self, name: str) -> None:
+    # Shared verse pool applied to every load, see enable_dedup()
+    pool: Optional[VersePool] = None
+
+    def __init__(
+            self,
+            name: str,
+            codec: Optional[str] = None,
+            sharded: Optional[bool] = None,
+            directory: Optional[str] = None
+    ) -> None:
         """
         :param name: Name of the version to save (i.e. KJV)
+        :param codec: Name of the codec to use (i.e. bz2). Defaults to the codec of the
+        version's existing cache file, then to the BIBLE_CODEC environment variable.
+        :param sharded: Save one shard per book instead of a single file. Defaults to whether
+        the version already has shards, then to the BIBLE_SHARDED environment variable.
+        :param directory: Directory of the cache files. Defaults to CACHE_DIR.
         :returns: None
         """
         self.__name = name
-        self.__base_path = os.path.dirname(os.path.abspath(__file__))
+        self.__directory: str = CACHE_DIR if directory is None else directory
+        # (index, codec, data offset) of the chapter-indexed file, published together so that
+        # concurrent readers never see part of one header and part of another
+        self.__header: Optional[Tuple[dict, Codec, int]] = None
+        # Saves held back by deferred(): nesting depth and the latest
+        # (data, lock, background, changed books)
+        self.__defer_lock = threading.Lock()
+        self.__deferring: int = 0
+        self.__pending: Optional[
+            Tuple[dict, Optional[ContextManager], bool, Optional[FrozenSet[str]]]
+        ] = None
+        manifest = self.__read_manifest() if self.has_shards() else None
+        self.__sharded: bool = (manifest is not None or SHARDED) if sharded is None else sharded
+        if codec is None and manifest is not None:
+            codec = manifest["codec"]
+        self.__codec: Codec = get_codec(codec) if codec is not None else self.__existing_codec()
 
-    def save(self, data: dict) -> None:
+    @property
+    def codec(self) -> Codec:
+        """
+        The codec used for this version's cache files.
+        """
+        return self.__codec
+
+    @property
+    def path(self) -> str:
+        """
+        Path of the single stream cache file.
+        """
+        return f"{self.__directory}/{self.__name}{self.__codec.extension}"
+
+    @property
+    def indexed_path(self) -> str:
+        """
+        Path of the chapter-indexed cache file.
+        """
+        return f"{self.__directory}/{self.__name}.json.cidx"
+
+    @property
+    def delta_path(self) -> str:
+        """
+        Path of the delta file, storing this version as a patch against a base version.
+        """
+        return f"{self.__directory}/{self.__name}.delta{self.__codec.extension}"
+
+    @property
+    def store_path(self) -> str:
+        """
+        Path of the uncompressed, memory mappable verse store file (see bibles.versestore).
+        """
+        return f"{self.__directory}/{self.__name}.verses"
+
+    @property
+    def shard_path(self) -> str:
+        """
+        Directory of the per-book shards and their manifest.
+        """
+        return f"{self.__directory}/{self.__name}.shards"
+
+    @property
+    def sharded(self) -> bool:
+        """
+        Whether save() writes one shard per book.
+        """
+        return self.__sharded
+
+    def save(
+            self,
+            data: dict,
+            lock: Optional[ContextManager] = None,
+            books: Optional[Iterable[str]] = None
+    ) -> int:
         """
         Saves the given data with the given version name.
+        The file is replaced in one step, so it is never seen partly written.
+        Inside deferred(), the save is held back until the outermost deferral ends.
         :param data: the Dictionary data to save.
+        :param lock: Lock guarding the data against changes, held while it is serialized.
+        :param books: The books that changed, when only some did. Sharded caches only rewrite
+        their shards.
+        :return: Bytes written (0 when deferred).
+        """
+        books = frozenset(books) if books is not None else None
+        if self.__defer(data, lock, False, books):
+            return 0
+        if self.__sharded:
+            return self.save_sharded(data, books, lock)
+        with lock if lock is not None else contextlib.nullcontext():
+            raw = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        return _write_atomic(self.path, (self.__codec.compress(raw),))
+
+    def save_in_background(
+            self,
+            data: dict,
+            lock: Optional[ContextManager] = None,
+            books: Optional[Iterable[str]] = None
+    ) -> None:
+        """
+        Marks the data dirty for the write-behind persister (see bibles.persister), which
+        saves it in the background, keeping serialization and compression out of the caller's
+        request. Markings between flushes are coalesced into one save.
+        :param data: the Dictionary data to save.
+        :param lock: Lock guarding the data against changes, held while it is serialized.
+        :param books: The books that changed, when only some did.
         :return: None
         """
-        with bz2.open(f"{self.__base_path}/json-bibles/{self.__name}.json.pbz2", "wb") as data_file:
-            data_file.write(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+        books = frozenset(books) if books is not None else None
+        if not self.__defer(data, lock, True, books):
+            PERSISTER.mark_dirty(self, data, lock, books)
+
+    def has_shards(self) -> bool:
+        """
+        Finds out if this version has a sharded cache.
+        :return: True if the shard manifest exists.
+        """
+        return os.path.exists(os.path.join(self.shard_path, MANIFEST))
+
+    def save_sharded(
+            self,
+            data: dict,
+            books: Optional[Iterable[str]] = None,
+            lock: Optional[ContextManager] = None
+    ) -> int:
+        """
+        Saves each book as its own compressed shard, then the manifest listing every book.
+        Only the given books are rewritten, unless there is no manifest in this codec yet.
+        :param data: the Dictionary data to save.
+        :param books: The books to rewrite. Defaults to all of them.
+        :param lock: Lock guarding the data against changes, held while it is serialized.
+        :return: Bytes written.
+        """
+        manifest = self.__read_manifest() if self.has_shards() else None
+        if manifest is None or manifest["codec"] != self.__codec.name:
+            books = None
+        with lock if lock is not None else contextlib.nullcontext():
+            names: List[str] = list(data)
+            raws = {
+                book: json.dumps(data[book], separators=(',', ':')).encode('utf-8')
+                for book in (names if books is None else books) if book in data
+            }
+        os.makedirs(self.shard_path, exist_ok=True)
+        written = 0
+        for book, raw in raws.items():
+            written += _write_atomic(self.__shard_file(book), (self.__codec.compress(raw),))
+        # The manifest goes last, so it never lists a shard that was not written
+        return written + _write_atomic(
+            os.path.join(self.shard_path, MANIFEST),
+            (json.dumps({"codec": self.__codec.name, "books": names}).encode('utf-8'),)
+        )
 
+    def load_sharded(self) -> dict:
+        """
+        Loads the books of a sharded cache, in manifest order. Books whose shard is missing
+        (i.e. a partial cache copied from another instance) are skipped.
+        :return: The dictionary version of the books found.
+        """
+        data: dict = {}
+        for book in self.__read_manifest()["books"]:
+            try:
+                data[book] = self.__read(self.__shard_file(book))
+            except FileNotFoundError:
+                continue
+        return data
 
-    def load(self) -> dict:
+    @staticmethod
+    def flush() -> None:
+        """
+        Saves every cache marked dirty by save_in_background now.
+        :return: None
+        """
+        PERSISTER.flush()
+
+    @contextlib.contextmanager
+    def deferred(self) -> Iterator[None]:
+        """
+        Holds back saves made inside the context and makes the latest one once on exit,
+        so a batch of fetches writes the cache once instead of once per fetch.
+        Deferrals may nest and may be entered from several threads.
+        :return: The context manager.
+        """
+        with self.__defer_lock:
+            self.__deferring += 1
+        try:
+            yield
+        finally:
+            with self.__defer_lock:
+                self.__deferring -= 1
+                pending = self.__pending if not self.__deferring else None
+                if pending is not None:
+                    self.__pending = None
+            if pending is not None:
+                data, lock, background, books = pending
+                if background:
+                    self.save_in_background(data, lock, books)
+                else:
+                    self.save(data, lock, books)
+
+    @classmethod
+    def enable_dedup(cls) -> VersePool:
+        """
+        Shares identical verse strings across every version loaded from now on.
+        :return: The shared pool, which reports the bytes saved per version.
+        """
+        if cls.pool is None:
+            cls.pool = VersePool()
+        return cls.pool
+
+    def load(self, dedup: bool = True) -> dict:
         """
         Loads the compressed JSON of the Bible.
+        Shards are preferred, as sharded caches are saved to nothing else. Then the single
+        stream file, then the chapter-indexed file, then the delta file.
+        :param dedup: Share identical verses through the pool, if one is enabled.
         :return: The dictionary version of the loaded JSON
         """
-        with bz2.open(
-                f"{self.__base_path}/json-bibles/{self.__name}.json.pbz2",
-                "rt",
-                encoding='utf-8'
-        ) as data_file:
-            return json.load(data_file)
+        if self.has_shards():
+            data = self.load_sharded()
+        elif os.path.exists(self.path):
+            data = self.__read(self.path)
+        elif self.has_index():
+            data = self.__load_indexed()
+        elif self.has_delta():
+            data = self.load_delta()
+        else:
+            raise FileNotFoundError(self.path)
+        if dedup and CompressCache.pool is not None:
+            CompressCache.pool.intern_corpus(self.__name, data)
+        return data
+
+    @staticmethod
+    def load_many(
+            names: Iterable[str],
+            max_workers: Optional[int] = None
+    ) -> Tuple[Dict[str, dict], Dict[str, float]]:
+        """
+        Loads several versions at once, decompressing and parsing them in a process pool.
+        :param names: Names of the versions to load.
+        :param max_workers: Number of worker processes. Defaults to the number of CPUs.
+        :return: The loaded dictionaries and the seconds each version took, both by name.
+        :raises: FileNotFoundError if any of the versions is missing.
+        """
+        names = list(names)
+        corpora: Dict[str, dict] = {}
+        timings: Dict[str, float] = {}
+        if max_workers == 1 or len(names) <= 1:
+            results = list(map(_timed_load, names, itertools.repeat(CACHE_DIR)))
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(_timed_load, names, itertools.repeat(CACHE_DIR)))
+        for name, data, seconds in results:
+            if CompressCache.pool is not None:
+                CompressCache.pool.intern_corpus(name, data)
+            corpora[name] = data
+            timings[name] = seconds
+        return corpora, timings
+
+    def has_delta(self) -> bool:
+        """
+        Finds out if a delta file exists for this version.
+        :return: True if the delta file exists.
+        """
+        return os.path.exists(self.delta_path)
+
+    def save_delta(self, data: dict, base_name: str) -> None:
+        """
+        Saves the given data as a verse and word level patch against a base version.
+        :param data: the Dictionary data to save.
+        :param base_name: Name of the base version (i.e. kjv)
+        :return: None
+        """
+        base = CompressCache(base_name, directory=self.__directory).load(dedup=False)
+        delta = make_delta(base_name, base, data)
+        _write_atomic(
+            self.delta_path,
+            (self.__codec.compress(json.dumps(delta, separators=(',', ':')).encode('utf-8')),)
+        )
+
+    def load_delta(self) -> dict:
+        """
+        Loads the delta file and applies it to its base version.
+        :return: The dictionary version of this version.
+        """
+        delta = self.__read(self.delta_path)
+        base = CompressCache(delta["base"], directory=self.__directory).load(dedup=False)
+        return apply_delta(base, delta)
+
+    def has_index(self) -> bool:
+        """
+        Finds out if a chapter-indexed file exists for this version.
+        :return: True if the chapter-indexed file exists.
+        """
+        return os.path.exists(self.indexed_path)
+
+    def save_indexed(self, data: dict) -> None:
+        """
+        Saves the given data as independently compressed chapters behind a header index
+        that maps each book and chapter to the byte range of its block.
+        :param data: the Dictionary data to save.
+        :return: None
+        """
+        index: dict = {}
+        blocks: list = []
+        offset = 0
+        for book, chapters in data.items():
+            index[book] = {}
+            for chapter, content in chapters.items():
+                block = self.__codec.compress(
+                    json.dumps(content, separators=(',', ':')).encode('utf-8')
+                )
+                index[book][chapter] = [offset, len(block)]
+                blocks.append(block)
+                offset += len(block)
+        header = json.dumps(
+            {"codec": self.__codec.name, "index": index}, separators=(',', ':')
+        ).encode('utf-8')
+
+        _write_atomic(
+            self.indexed_path,
+            [_PREAMBLE.pack(INDEXED_MAGIC, INDEXED_VERSION, len(header)), header] + blocks
+        )
+        self.__header = None
+
+    def load_chapter(self, book: str, chapter) -> list:
+        """
+        Loads a single chapter from the chapter-indexed file, decompressing only that chapter.
+        :param book: Name of the book.
+        :param chapter: Chapter of the book.
+        :return: The chapter's content.
+        :raises: KeyError if the chapter is not in the index.
+        """
+        index, codec, data_offset = self.__read_header()
+        offset, length = index[book][str(chapter)]
+        with open(self.indexed_path, "rb") as data_file:
+            data_file.seek(data_offset + offset)
+            return json.loads(codec.decompress(data_file.read(length)).decode('utf-8'))
+
+    def __defer(
+            self,
+            data: dict,
+            lock: Optional[ContextManager],
+            background: bool,
+            books: Optional[FrozenSet[str]]
+    ) -> bool:
+        """
+        Holds a save back while inside deferred(), adding up the changed books.
+        :param data: the Dictionary data to save.
+        :param lock: Lock guarding the data.
+        :param background: Whether the save was asked for with save_in_background.
+        :param books: The books that changed, or None for all of them.
+        :return: True if the save was held back.
+        """
+        with self.__defer_lock:
+            if not self.__deferring:
+                return False
+            if self.__pending is not None:
+                background = background or self.__pending[2]
+                books = merge_books(self.__pending[3], books)
+            self.__pending = (data, lock, background, books)
+            return True
+
+    def __shard_file(self, book: str) -> str:
+        """
+        Path of a book's shard.
+        :param book: Name of the book.
+        :return: The path.
+        """
+        return os.path.join(self.shard_path, f"{book}{self.__codec.extension}")
+
+    def __read_manifest(self) -> dict:
+        """
+        Reads the shard manifest.
+        :return: {"codec": codec name, "books": [book names in order]}
+        """
+        with open(os.path.join(self.shard_path, MANIFEST), "r", encoding="utf-8") as manifest:
+            return json.load(manifest)
+
+    def __existing_codec(self) -> Codec:
+        """
+        Finds the codec of this version's existing cache or delta file.
+        :return: The codec of the first file found, or the default codec if there is none.
+        """
+        for name in LOAD_ORDER:
+            codec = get_codec(name)
+            for kind in ("", ".delta"):
+                if os.path.exists(
+                        f"{self.__directory}/{self.__name}{kind}{codec.extension}"
+                ):
+                    return codec
+        return get_codec(DEFAULT_CODEC)
+
+    @staticmethod
+    def __read(path: str):
+        """
+        Reads and decompresses a JSON file, detecting its codec.
+        :param path: Path of the file.
+        :return: The parsed JSON.
+        """
+        with open(path, "rb") as data_file:
+            raw = data_file.read()
+        return json.loads(detect_codec(raw, path).decompress(raw).decode('utf-8'))
+
+    def __read_header(self) -> Tuple[dict, Codec, int]:
+        """
+        Reads and validates the header index of the chapter-indexed file, unless it has been
+        read already.
+        :return: The index, the codec of the chapter blocks, and the offset they start at.
+        :raises: ValueError if the file is not a chapter-indexed file.
+        """
+        header = self.__header
+        if header is not None:
+            return header
+        with open(self.indexed_path, "rb") as data_file:
+            magic, version, header_length = _PREAMBLE.unpack(data_file.read(_PREAMBLE.size))
+            if magic != INDEXED_MAGIC or version != INDEXED_VERSION:
+                raise ValueError(f"{self.indexed_path} is not a chapter-indexed cache")
+            raw = json.loads(data_file.read(header_length).decode('utf-8'))
+        header = (raw['index'], get_codec(raw['codec']), _PREAMBLE.size + header_length)
+        self.__header = header
+        return header
+
+    def __load_indexed(self) -> dict:
+        """
+        Loads every chapter of the chapter-indexed file.
+        :return: The dictionary version of the whole file.
+        """
+        index, codec, data_offset = self.__read_header()
+        with open(self.indexed_path, "rb") as data_file:
+            data_file.seek(data_offset)
+            blob = data_file.read()
+        return {
+            book: {
+                chapter: json.loads(codec.decompress(blob[offset:offset + length]).decode('utf-8'))
+                for chapter, (offset, length) in chapters.items()
+            } for book, chapters in index.items()
+        }
+
+
+if DEDUP:
+    CompressCache.enable_dedup()
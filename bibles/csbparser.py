@@ -0,0 +1,570 @@
+"""
+Incremental parser of the CSB's per-book XML files.
+It reads a book as it downloads, converting each chapter as soon as its closing tag arrives and
+then dropping its elements, so only one chapter is held as a tree at a time.
+"""
+import re
+from typing import Callable, List, Optional, Tuple, Union
+from xml.etree import ElementTree
+
+
+CONDENSE: re.Pattern = re.compile(r'\s\s+|\n\s*')
+LEADING_NUMBER: re.Pattern = re.compile(r'^\s*\d+\s*')
+HEADINGS = frozenset({'head1', 'head2', 'supertitle'})
+# Blocks with verses anywhere inside them, and blocks with verses as their children
+NESTED_VERSES = frozenset({'blockindent', 'listtenwords', 'dynprose', 'otdynprose'})
+CHILD_VERSES = frozenset({'p', 'poetryblock', 'listtable'})
+# Lots of list variations for some reason
+LISTS = frozenset({'list', 'listblockindent'})
+VERSE_BLOCKS = NESTED_VERSES | CHILD_VERSES | LISTS | {'verse'}
+
+
+def clean(text: str) -> str:
+    """
+    Drops a verse's leading number and condenses its whitespace.
+    :param text: Text of the verse.
+    :return: The cleaned text.
+    """
+    return CONDENSE.sub(' ', LEADING_NUMBER.sub('', text))
+
+
+def add_verse(verses: List[str], number: Optional[str], text: str, spaced: bool = False) -> None:
+    """
+    Adds a verse under a heading, or continues the last verse if it has the same number (a verse
+    split over several lines or paragraphs).
+    :param verses: Verses of the heading.
+    :param number: The verse's number.
+    :param text: The verse's cleaned text.
+    :param spaced: Whether a continuation is joined with a space.
+    :return: None
+    """
+    if len(verses) > 0 and verses[-1][0:verses[-1].find(" ")] == number:
+        if spaced:
+            verses[-1] = CONDENSE.sub(' ', verses[-1] + " " + text)
+        else:
+            verses[-1] += text
+    else:
+        verses.append(f"{number} {text}")
+
+
+def verse_element_text(element: ElementTree.Element) -> Tuple[str, str]:
+    """
+    Gets the text of a verse element holding its own items, paragraphs or poetry.
+    Pieces already in the text (i.e. a paragraph that is also an item) are not added again.
+    :param element: The verse element.
+    :return: The verse's number (empty if it holds none of those) and its cleaned text.
+    """
+    verse_text = ""
+    verse_number = ""
+    for part in (element.findall('.//item') + element.findall('p') + element.findall('.//p') +
+                 element.findall('poetryblock')):
+        verse_number = element.get('display-number')
+        new_text = ''.join(part.itertext())
+        verse_text += new_text if new_text not in verse_text else ""
+        verse_text = clean(verse_text)
+    return verse_number, verse_text
+
+
+def list_verse_number(verse: ElementTree.Element) -> str:
+    """
+    Gets the number of a verse in a list, which may only be in its reference or id.
+    :param verse: The verse element.
+    :return: The verse's number.
+    """
+    if verse.get('display-number'):
+        return verse.get('display-number')
+    if verse.get('reference'):
+        return verse.get('reference')[verse.get('reference').rfind('.') + 1:]
+    return verse.get('id')[verse.get('id').rfind('.') + 1:]
+
+
+def parse_chapter(chapter: ElementTree.Element, bookname: str) -> dict:
+    """
+    Converts a chapter element.
+    :param chapter: The complete chapter element.
+    :param bookname: Name of the book it is in.
+    :return: {heading: [verses]}
+    """
+    chapter_dict: dict = {}
+    current_heading = 'none'
+    for element in chapter:
+        if element.tag in HEADINGS:
+            current_heading = CONDENSE.sub('', ''.join(element.itertext()))
+            chapter_dict[current_heading] = []
+            continue
+        if element.tag == 'verse' and (heads := element.findall('head1')):
+            current_heading = ''.join(head.text for head in heads)
+        if element.tag not in VERSE_BLOCKS:
+            continue
+        verses = chapter_dict.setdefault(current_heading, [])
+        if element.tag == 'verse':
+            add_verse(verses, *verse_element_text(element), spaced=True)
+        elif element.tag in LISTS:
+            for verse in element.findall('.//verse'):
+                add_verse(verses, list_verse_number(verse), clean(''.join(verse.itertext())))
+        elif element.tag == 'listtable' and bookname == "Joshua":
+            for row in element.findall('row'):
+                cells = row.findall('cell')
+                verse = cells[0].find('.//verse')
+                row_text = ''.join(cells[0].itertext()) + " " + ''.join(cells[1].itertext())
+                if verse is not None:
+                    add_verse(verses, verse.get('display'), clean(row_text))
+                else:
+                    # A row carrying on the verse above
+                    verses[-1] += ', ' + CONDENSE.sub(' ', row_text)
+        else:
+            path = './/verse' if element.tag in NESTED_VERSES else 'verse'
+            for verse in element.findall(path):
+                add_verse(verses, verse.get('display-number'), clean(''.join(verse.itertext())))
+    return chapter_dict
+
+
+def parse_chapter_xml(bookname: str, chapter_xml: bytes) -> Tuple[str, dict]:
+    """
+    Parses the XML of one chapter, serialized from its book (see CSBBookParser). Runs in a parse
+    worker.
+    :param bookname: Name of the book it is in.
+    :param chapter_xml: The chapter element.
+    :return: The chapter's number and its corrected verses, {heading: [verses]}.
+    :raises: ElementTree.ParseError if the chapter is malformed.
+    """
+    chapter = ElementTree.fromstring(chapter_xml)
+    chapter_number = chapter.get('display')
+    chapter_dict = parse_chapter(chapter, bookname)
+    fix_chapter(bookname, chapter_number, chapter_dict)
+    return chapter_number, chapter_dict
+
+
+class CSBBookParser:
+    """
+    Parses a CSB book file fed to it in pieces, i.e. as it downloads.
+    Each chapter is converted, corrected (see fix_chapter) and handed to a callback as soon as
+    it is complete, then cleared, so the rest of the book never builds up in memory. Given a
+    run function, the conversion of each chapter is handed to it as serialized XML (see
+    parse_chapter_xml), so that it can run in a worker process.
+    """
+    def __init__(
+            self,
+            on_chapter: Callable[[str, str, dict], None],
+            run: Optional[Callable[..., Tuple[str, dict]]] = None
+    ) -> None:
+        """
+        :param on_chapter: Called with (book, chapter, {heading: [verses]}) for each chapter, in
+        the order of the file.
+        :param run: Runs parse_chapter_xml with the arguments given, i.e. PARSE_POOL.run, or None
+        to convert the parsed chapters directly.
+        """
+        self.__parser = ElementTree.XMLPullParser(events=('start', 'end'))
+        self.__on_chapter = on_chapter
+        self.__run = run
+        self.__root: Optional[ElementTree.Element] = None
+        self.__depth: int = 0
+        self.__bookname: str = ""
+
+    @classmethod
+    def parse(cls, xml_in: Union[str, bytes]) -> dict:
+        """
+        Parses a whole book at once.
+        :param xml_in: Full XML document.
+        :return: {book: {chapter: {heading: [verses]}}}
+        """
+        result: dict = {}
+
+        def add(book: str, chapter: str, verses: dict) -> None:
+            result.setdefault(book, {})[chapter] = verses
+
+        parser = cls(add)
+        parser.feed(xml_in)
+        parser.close()
+        return result
+
+    def feed(self, data: Union[str, bytes]) -> None:
+        """
+        Parses the next piece of the file, handing on the chapters it completes.
+        :param data: The piece, as bytes (decoded as the XML declaration says) or a string.
+        :return: None
+        :raises: ElementTree.ParseError if the XML is malformed.
+        """
+        self.__parser.feed(data)
+        self.__read_events()
+
+    def close(self) -> None:
+        """
+        Finishes the file.
+        :return: None
+        :raises: ElementTree.ParseError if the file ended early.
+        """
+        self.__parser.close()
+        self.__read_events()
+
+    def __read_events(self) -> None:
+        """
+        Acts on the elements opened and closed by the last piece.
+        Only the book name and chapters (the children of the root) are acted on.
+        :return: None
+        """
+        for event, element in self.__parser.read_events():
+            if event == 'start':
+                if self.__root is None:
+                    self.__root = element
+                self.__depth += 1
+                continue
+            self.__depth -= 1
+            if self.__depth != 1:
+                continue
+            if element.tag == 'bookname':
+                self.__bookname = element.text if element.text != "Song of Songs" \
+                    else "Song of Solomon"
+            elif element.tag == 'chapter':
+                if self.__run is None:
+                    chapter_number = element.get('display')
+                    chapter_dict = parse_chapter(element, self.__bookname)
+                    fix_chapter(self.__bookname, chapter_number, chapter_dict)
+                else:
+                    chapter_number, chapter_dict = self.__run(
+                        parse_chapter_xml, self.__bookname, ElementTree.tostring(element)
+                    )
+                self.__on_chapter(self.__bookname, chapter_number, chapter_dict)
+            # Done with it, so let it go
+            self.__root.remove(element)
+
+
+# pylint: disable=too-many-branches,too-many-statements
+def fix_chapter(book: str, chapter: str, verses: dict) -> None:
+    """
+    Corrects the chapters the XML gets wrong, mostly by splitting verses that are not separated
+    by a unique verse tag and cutting text that is in the file twice.
+    :param book: Name of the book.
+    :param chapter: The chapter's number.
+    :param verses: The parsed chapter, {heading: [verses]}, which is changed in place.
+    :return: None
+    """
+    if book == 'Genesis':
+        if chapter == '3':
+            verses['Sin’s Consequences'][9] = verses['Sin’s Consequences'][9][135:]
+        elif chapter == '4':
+            verses['Cain Murders Abel'][8] = verses['Cain Murders Abel'][8][:120]
+        elif chapter == '9':
+            split_location = verses['God’s Covenant with Noah'][14].find('16')
+            tmp_split = verses['God’s Covenant with Noah'][14][0:split_location], \
+                verses['God’s Covenant with Noah'][14][split_location:]
+            verses['God’s Covenant with Noah'][14] = tmp_split[0]
+            verses['God’s Covenant with Noah'].insert(15, tmp_split[1])
+        elif chapter == '22':
+            verses['The Sacrifice of Isaac'][6] = verses['The Sacrifice of Isaac'][6][:193]
+        elif chapter == '27':
+            verses['The Stolen Blessing'][38] += \
+                "Look, your dwelling place will be away from the " \
+                "richness of the land, away from the dew of the sky " \
+                "above."
+        elif chapter == '30':
+            verses['none'][14] = verses['none'][14][:221]
+        elif chapter == '37':
+            verses['Joseph’s Dreams'][1] = verses['Joseph’s Dreams'][1][:245]
+        elif chapter == '39':
+            split_location = verses['Joseph in Potiphar’s House'][12].find('14')
+            tmp_split = \
+                verses['Joseph in Potiphar’s House'][12][0:split_location], \
+                verses['Joseph in Potiphar’s House'][12][split_location:]
+            verses['Joseph in Potiphar’s House'][12] = tmp_split[0]
+            verses['Joseph in Potiphar’s House'].insert(13, tmp_split[1])
+    elif book == 'Exodus':
+        if chapter == '32':
+            verses['The Gold Calf'][17] += \
+                "It’s not the sound of a victory cry and not the sound of " \
+                "a cry of defeat; I hear the sound of singing!"
+    elif book == 'Numbers':
+        if chapter == '1':
+            split_location = verses['The Census of Israel'][31].find('33')
+            tmp_split = verses['The Census of Israel'][31][0:split_location], \
+                verses['The Census of Israel'][31][split_location:]
+            verses['The Census of Israel'][31] = tmp_split[0]
+            verses['The Census of Israel'].insert(32, tmp_split[1])
+        elif chapter == '12':
+            # This one grabs data twice for some reason, so here's this
+            split_location = verses['Miriam and Aaron Rebel'][6].find('8')
+            tmp_split = verses['Miriam and Aaron Rebel'][6][0:split_location], \
+                verses['Miriam and Aaron Rebel'][6][split_location:]
+            verses['Miriam and Aaron Rebel'][6] = tmp_split[0]
+            verses['Miriam and Aaron Rebel'][7] = \
+                tmp_split[1] + verses['Miriam and Aaron Rebel'][8][1:]
+            verses['Miriam and Aaron Rebel'].pop(8)
+    elif book == "Joshua":
+        if chapter == '5':
+            verses['Commander of the Lord’s Army'][1] = \
+                verses['Commander of the Lord’s Army'][1][:196]
+    elif book == 'Judges':
+        if chapter == '15':
+            verses['Samson’s Revenge'][5] = verses['Samson’s Revenge'][5][:238]
+        elif chapter == '17':
+            verses['Micah’s Priest'][8] = verses['Micah’s Priest'][8][:155]
+    elif book == 'Ruth':
+        if chapter == '2':
+            verses['Ruth and Boaz Meet'][18] = verses['Ruth and Boaz Meet'][18][:252]
+    elif book == '1 Samuel':
+        if chapter == '3':
+            verses['Samuel’s Call'][4] = verses['Samuel’s Call'][4][:133]
+            verses['Samuel’s Call'][5] = verses['Samuel’s Call'][5][:167]
+            verses['Samuel’s Call'][9] = verses['Samuel’s Call'][9][:130]
+            verses['Samuel’s Call'][15] = verses['Samuel’s Call'][15][:80]
+        elif chapter == '27':
+            verses['David Flees to Ziklag'][9] = verses['David Flees to Ziklag'][9][:172]
+        elif chapter == '28':
+            verses['Saul and the Medium'][1] = verses['Saul and the Medium'][1][:163]
+            verses['Saul and the Medium'][6] = verses['Saul and the Medium'][6][:166]
+            verses['Saul and the Medium'][10] = verses['Saul and the Medium'][10][:110]
+            verses['Saul and the Medium'][12] = verses['Saul and the Medium'][12][:136]
+            verses['Saul and the Medium'][13] = verses['Saul and the Medium'][13][:211]
+            verses['Saul and the Medium'][14] = verses['Saul and the Medium'][14][:308]
+        elif chapter == '29':
+            verses['Philistines Reject David'][2] = verses['Philistines Reject David'][2][:289]
+        elif chapter == '30':
+            verses['David’s Defeat of the Amalekites'][7] = \
+                verses['David’s Defeat of the Amalekites'][7][:184]
+            verses['David’s Defeat of the Amalekites'][14] = \
+                verses['David’s Defeat of the Amalekites'][14][:175]
+    elif book == '2 Samuel':
+        if chapter == '1':
+            verses['Responses to Saul’s Death'][2] = verses['Responses to Saul’s Death'][2][:107]
+            verses['Responses to Saul’s Death'][3] = verses['Responses to Saul’s Death'][3][:189]
+            verses['Responses to Saul’s Death'][12] = verses['Responses to Saul’s Death'][12][:154]
+        elif chapter == '16':
+            verses['Ziba Helps David'][1] = verses['Ziba Helps David'][1][:250]
+            verses['Ziba Helps David'][2] = verses['Ziba Helps David'][2][:204]
+            verses['Ziba Helps David'][3] = verses['Ziba Helps David'][3][:154]
+        elif chapter == '17':
+            verses['David Informed of Absalom’s Plans'][5] = \
+                verses['David Informed of Absalom’s Plans'][5][:232]
+            verses['David Informed of Absalom’s Plans'][14] = \
+                verses['David Informed of Absalom’s Plans'][14][:42] + \
+                verses['David Informed of Absalom’s Plans'][14][51:]
+        elif chapter == '18':
+            verses['Absalom’s Death'][13] = verses['Absalom’s Death'][13][:201]
+            verses['Absalom’s Death'][18] = verses['Absalom’s Death'][18][:170]
+            verses['Absalom’s Death'][20] = verses['Absalom’s Death'][20][:184]
+            verses['Absalom’s Death'][23] = verses['Absalom’s Death'][23][:229]
+        elif chapter == '24':
+            # This one is messed up in the XML to the extent it's messed up on their site too
+            verses['David’s Punishment'][5] = \
+                verses['David’s Punishment'][5][:270] + " the Jebusite."
+            verses['David’s Altar'][3] = verses['David’s Altar'][3][:202]
+    elif book == "1 Kings":
+        if chapter == '2':
+            verses['Joab’s Execution'][1] = verses['Joab’s Execution'][1][:187]
+        elif chapter == '3':
+            verses['Solomon’s Wisdom'][6] = verses['Solomon’s Wisdom'][6][:197]
+        elif chapter == '8':
+            verses['Solomon’s Dedication of the Temple'][17] = \
+                verses['Solomon’s Dedication of the Temple'][16][104:]
+            verses['Solomon’s Dedication of the Temple'][16] = \
+                verses['Solomon’s Dedication of the Temple'][16][:104]
+        elif chapter == '20':
+            verses['Victory over Ben-hadad'][13] = verses['Victory over Ben-hadad'][13][:188]
+            verses['Victory over Ben-hadad'][33] = verses['Victory over Ben-hadad'][33][:300]
+            verses['Ahab Rebuked by theLord'][5] = verses['Ahab Rebuked by theLord'][5][:160]
+        elif chapter == '22':
+            split_location = verses['Jehoshaphat’s Alliance with Ahab'][3].find('5')
+            tmp_split = \
+                verses['Jehoshaphat’s Alliance with Ahab'][3][0:split_location], \
+                verses['Jehoshaphat’s Alliance with Ahab'][3][split_location:278]
+            verses['Jehoshaphat’s Alliance with Ahab'][3] = tmp_split[0]
+            verses['Jehoshaphat’s Alliance with Ahab'].insert(4, tmp_split[1])
+            verses['Jehoshaphat’s Alliance with Ahab'][5] = \
+                verses['Jehoshaphat’s Alliance with Ahab'][5][:223]
+            verses['Micaiah’s Message of Defeat'][2] = \
+                verses['Micaiah’s Message of Defeat'][2][:206]
+            verses['Micaiah’s Message of Defeat'][9] = \
+                verses['Micaiah’s Message of Defeat'][9][:190]
+    elif book == "2 Kings":
+        if chapter == '3':
+            verses['Moab’s Rebellion against Israel'][3] = \
+                verses['Moab’s Rebellion against Israel'][3][:243]
+            verses['Moab’s Rebellion against Israel'][7] = \
+                verses['Moab’s Rebellion against Israel'][7][:234]
+            verses['Moab’s Rebellion against Israel'][9] = \
+                verses['Moab’s Rebellion against Israel'][9][:253]
+        elif chapter == '7':
+            verses['none'][1] = verses['none'][1][:253]
+        elif chapter == '8':
+            verses['Aram’s King Hazael'][5] = verses['Aram’s King Hazael'][5][:288]
+        elif chapter == '9':
+            verses['Jehu Anointed as Israel’s King'][11] = \
+                verses['Jehu Anointed as Israel’s King'][11][:172]
+            verses['Jehu Kills Joram and Ahaziah'][1] = \
+                verses['Jehu Kills Joram and Ahaziah'][1][:221]
+            verses['Jehu Kills Joram and Ahaziah'][6] =\
+                "22 " + verses['Jehu Kills Joram and Ahaziah'][1][3:183]
+        elif chapter == '20':
+            verses['Hezekiah’s Folly'][3] = verses['Hezekiah’s Folly'][3][:180]
+        elif chapter == '23':
+            verses['Josiah’s Reforms'][13] = verses['Josiah’s Reforms'][13][:205]
+    elif book == "1 Chronicles":
+        if chapter == '11':
+            verses['Exploits of David’s Warriors'][1] = \
+                verses['Exploits of David’s Warriors'][1][:90] + \
+                verses['Exploits of David’s Warriors'][1][344:]
+        elif chapter == '29':
+            verses['David’s Prayer'][12] = "22 " + verses['David’s Prayer'][12][3:]
+            verses['The Enthronement of Solomon'][0] = \
+                "22 " + verses['The Enthronement of Solomon'][0][4:]
+    elif book == "2 Chronicles":
+        if chapter == '11':
+            verses['Rehoboam in Jerusalem'][3] = verses['Rehoboam in Jerusalem'][3][:236]
+        elif chapter == '25':
+            verses['Amaziah’s Campaign against Edom'][11] = \
+                verses['Amaziah’s Campaign against Edom'][11][:276]
+    elif book == "Ezra":
+        if chapter == '2':
+            verses['The Exiles Who Returned'][35] += \
+                "Jedaiah’s descendants of the house of Jeshua 973"
+            verses['The Exiles Who Returned'][39] += \
+                "Jeshua’s and Kadmiel’s descendants from Hodaviah’s" \
+                " descendants 74"
+            verses['The Exiles Who Returned'][40] += "Asaph’s descendants 128"
+            verses['The Exiles Who Returned'][41] += \
+                "Shallum’s descendants, Ater’s descendants, " \
+                "Talmon’s descendants, Akkub’s descendants, " \
+                "Hatita’s descendants, Shobai’s descendants, " \
+                "in all 139"
+            verses['The Exiles Who Returned'][43] += " Siaha’s descendants, Padon’s descendants,"
+            verses['The Exiles Who Returned'][44] += "Akkub’s descendants,"
+            verses['The Exiles Who Returned'][44] = verses['The Exiles Who Returned'][44][3:]
+    elif book == "Nehemiah":
+        if chapter == '5':
+            verses['Social Injustice'][12] = verses['Social Injustice'][12][:283]
+        elif chapter == '13':
+            verses['Nehemiah’s Further Reforms'][21] = \
+                verses['Nehemiah’s Further Reforms'][21][:234]
+            verses['Nehemiah’s Further Reforms'][30] = \
+                verses['Nehemiah’s Further Reforms'][30][:125]
+    elif book == "Isaiah":
+        if chapter == '31':
+            verses['The Lord, the Only Help'][8] = verses['The Lord, the Only Help'][8][:195]
+        elif chapter == '39':
+            verses['Hezekiah’s Folly'][3] = verses['Hezekiah’s Folly'][3][:239]
+    elif book == "Jeremiah":
+        if chapter == '49':
+            split_location = verses['Prophecies against Kedar and Hazor'][0].find('29')
+            tmp_split = \
+                verses['Prophecies against Kedar and Hazor'][0][0:split_location], \
+                verses['Prophecies against Kedar and Hazor'][0][split_location:]
+            verses['Prophecies against Kedar and Hazor'][0] = tmp_split[0]
+            verses['Prophecies against Kedar and Hazor'].insert(1, tmp_split[1])
+    elif book == "Ezekiel":
+        if chapter == '27':
+            split_location = verses['The Sinking of Tyre'][2].find('4')
+            tmp_split = verses['The Sinking of Tyre'][2][0:split_location], \
+                verses['The Sinking of Tyre'][2][split_location:]
+            verses['The Sinking of Tyre'][2] = tmp_split[0]
+            verses['The Sinking of Tyre'].insert(3, tmp_split[1])
+    elif book == "Amos":
+        if chapter == '7':
+            verses['Third Vision: A Plumb Line'][1] += verses['Third Vision: A Plumb Line'][2][1:]
+            verses['Third Vision: A Plumb Line'].pop(2)
+    elif book == "Zechariah":
+        if chapter == '1':
+            verses['A Plea for Repentance'][5] = verses['A Plea for Repentance'][5][:243]
+            verses['Second Vision: Four Horns and Craftsmen'][3] = \
+                verses['Second Vision: Four Horns and Craftsmen'][3][:269]
+    elif book == "Malachi":
+        if chapter == '2':
+            verses['Judgment at the Lord’s Coming'][0] = \
+                verses['Judgment at the Lord’s Coming'][0][:231]
+    elif book == "Matthew":
+        if chapter == '4':
+            split_location = verses['Ministry in Galilee'][3].find('16')
+            tmp_split = verses['Ministry in Galilee'][3][0:split_location], \
+                verses['Ministry in Galilee'][3][split_location:]
+            verses['Ministry in Galilee'][3] = tmp_split[0]
+            verses['Ministry in Galilee'][4] = tmp_split[1]
+        elif chapter == '5':
+            # Verses 3-9 of Matthew 5 get grabbed at the same time for whatever reason, so yeah.
+            verses['The Beatitudes'][1] = verses['The Beatitudes'][0][73:132]
+            verses['The Beatitudes'][2] = verses['The Beatitudes'][0][132:191]
+            verses['The Beatitudes'][3] = verses['The Beatitudes'][0][191:277]
+            verses['The Beatitudes'][4] = verses['The Beatitudes'][0][277:335]
+            verses['The Beatitudes'][5] = verses['The Beatitudes'][0][335:391]
+            verses['The Beatitudes'][6] = verses['The Beatitudes'][0][391:]
+            verses['The Beatitudes'][0] = verses['The Beatitudes'][0][:73]
+        elif chapter == '6':
+            # Same thing for 6:9-13
+            verses['The Lord’s Prayer'][1] = verses['The Lord’s Prayer'][0][94:163]
+            verses['The Lord’s Prayer'][2] = verses['The Lord’s Prayer'][0][163:197]
+            verses['The Lord’s Prayer'][3] = verses['The Lord’s Prayer'][0][197:264]
+            verses['The Lord’s Prayer'][4] = verses['The Lord’s Prayer'][0][264:]
+            verses['The Lord’s Prayer'][0] = verses['The Lord’s Prayer'][0][:94]
+        elif chapter == '11':
+            # Odd one
+            split_location = verses['An Unresponsive Generation'][0].find(':') + 1
+            tmp_split = \
+                verses['An Unresponsive Generation'][0][0:split_location], \
+                "17" + verses['An Unresponsive Generation'][0][split_location:]
+            verses['An Unresponsive Generation'][0] = tmp_split[0]
+            verses['An Unresponsive Generation'].insert(1, tmp_split[1])
+        elif chapter == '20':
+            verses['Suffering and Service'][1] = verses['Suffering and Service'][1][:168]
+    elif book == "Mark":
+        if chapter == '6':
+            verses['Feeding of the Five Thousand'][7] = \
+                verses['Feeding of the Five Thousand'][7][:160]
+    elif book == "Luke":
+        if chapter == '3':
+            verses['The Messiah’s Herald'][13] = verses['The Messiah’s Herald'][13][:172]
+        elif chapter == '6':
+            split_location = verses['Woe to the Self-Satisfied'][0].find('25')
+            tmp_split = verses['Woe to the Self-Satisfied'][0][0:split_location], \
+                verses['Woe to the Self-Satisfied'][0][split_location:]
+            verses['Woe to the Self-Satisfied'][0] = tmp_split[0]
+            verses['Woe to the Self-Satisfied'][1] = tmp_split[1]
+        elif chapter == '8':
+            verses['Wind and Waves Obey Jesus'][3] = verses['Wind and Waves Obey Jesus'][3][:177]
+        elif chapter == '20':
+            tmp_split = verses['The Parable of the Vineyard Owner'][6][0:111], \
+                verses['The Parable of the Vineyard Owner'][6][111:301]
+            verses['The Parable of the Vineyard Owner'][6] = tmp_split[0]
+            verses['The Parable of the Vineyard Owner'].insert(7, tmp_split[1])
+    elif book == "John":
+        if chapter == '1':
+            verses['John the Baptist’s Testimony'][2] = \
+                verses['John the Baptist’s Testimony'][2][:115]
+            verses['The Lamb of God'][9] = verses['The Lamb of God'][9][:173]
+            verses['The Lamb of God'][13] = verses['The Lamb of God'][13][:151]
+            verses['Philip and Nathanael'][5] = verses['Philip and Nathanael'][5][:132]
+        elif chapter == '20':
+            verses['Mary Magdalene Sees the Risen Lord'][2] = \
+                verses['Mary Magdalene Sees the Risen Lord'][2][:146]
+            verses['Mary Magdalene Sees the Risen Lord'][4] = \
+                verses['Mary Magdalene Sees the Risen Lord'][4][:219]
+            verses['Mary Magdalene Sees the Risen Lord'][5] = \
+                verses['Mary Magdalene Sees the Risen Lord'][5][:115]
+            verses['Thomas Sees and Believes'][1] = verses['Thomas Sees and Believes'][1][:237]
+        elif chapter == '21':
+            verses['Jesus’s Third Appearance to the Disciples'][2] = \
+                verses['Jesus’s Third Appearance to the Disciples'][2][:162]
+            verses['Jesus’s Threefold Restoration of Peter'][1] = \
+                verses['Jesus’s Threefold Restoration of Peter'][1][:159]
+            verses['Jesus’s Threefold Restoration of Peter'][1] = \
+                verses['Jesus’s Threefold Restoration of Peter'][1][:205] + \
+                " “Feed my sheep,” Jesus said."
+    elif book == "Acts":
+        if chapter == '16':
+            verses['Paul and Silas in Prison'][2] = verses['Paul and Silas in Prison'][2][:182]
+        elif chapter == '17':
+            verses['Paul in Athens'][2] = verses['Paul in Athens'][2][:269]
+        elif chapter == '22':
+            verses['Paul’s Testimony'][4] = verses['Paul’s Testimony'][4][:161]
+        elif chapter == '24':
+            tmp = "8 " + verses['The Accusation against Paul'][5][68:]
+            verses['The Accusation against Paul'][5] = verses['The Accusation against Paul'][5][:68]
+            verses['The Accusation against Paul'].insert(6, tmp)
+    elif book == "Romans":
+        if chapter == '15':
+            verses['Glorifying God Together'][4] += verses['Glorifying God Together'][5][4:]
+            verses['Glorifying God Together'].pop(5)
+    elif book == "2 Peter":
+        if chapter == '1':
+            verses['Greeting'][0] = verses['Greeting'][0][:169]
+    elif book == "Revelation":
+        if chapter == '7':
+            verses['A Multitude from the Great Tribulation'][5] = \
+                verses['A Multitude from the Great Tribulation'][5][:178]
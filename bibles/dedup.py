@@ -0,0 +1,71 @@
+"""
+Cross-version sharing of identical verse strings.
+"""
+import sys
+import threading
+from typing import Dict, List, Tuple, Union
+
+
+class VersePool:
+    """
+    Stores identical verse strings once and shares them across versions.
+    Near-identical translations (i.e. the KJV family) repeat most verses word for word, and
+    the repeats land at the same book, chapter and position, so each verse is only compared
+    with the distinct texts already seen at its position.
+    """
+    def __init__(self) -> None:
+        # The text seen at each position, or a tuple of the distinct texts seen there
+        self.__pool: Dict[str, Dict[str, List[Union[str, Tuple[str, ...]]]]] = {}
+        self.__saved: Dict[str, int] = {}
+        self.__lock = threading.Lock()
+
+    @property
+    def saved(self) -> Dict[str, int]:
+        """
+        Bytes of duplicate verse strings released by sharing, by version name.
+        This does not subtract the pool's own bookkeeping.
+        """
+        return dict(self.__saved)
+
+    def intern_corpus(self, name: str, data: dict) -> dict:
+        """
+        Replaces the verses of a corpus with previously seen identical ones, in place.
+        Chapters that are not lists of verses (i.e. heading-grouped caches) are left alone.
+        :param name: Name of the version (for the report).
+        :param data: The corpus (book -> chapter -> list of verses).
+        :return: The same corpus.
+        """
+        saved = 0
+        with self.__lock:
+            for book, chapters in data.items():
+                book_pool = self.__pool.setdefault(book, {})
+                for chapter, verses in chapters.items():
+                    if not isinstance(verses, list):
+                        continue
+                    chapter_pool = book_pool.setdefault(chapter, [])
+                    for index, verse in enumerate(verses):
+                        if index == len(chapter_pool):
+                            chapter_pool.append(verse)
+                            continue
+                        pooled = chapter_pool[index]
+                        for candidate in (pooled,) if isinstance(pooled, str) else pooled:
+                            if candidate == verse:
+                                if candidate is not verse:
+                                    verses[index] = candidate
+                                    saved += sys.getsizeof(verse)
+                                break
+                        else:
+                            chapter_pool[index] = (
+                                (pooled, verse) if isinstance(pooled, str) else pooled + (verse,)
+                            )
+            self.__saved[name] = self.__saved.get(name, 0) + saved
+        return data
+
+    def report(self) -> str:
+        """
+        Formats the bytes saved per version.
+        :return: One line per version, plus a total.
+        """
+        lines = [f"{name}: {saved} bytes saved" for name, saved in self.__saved.items()]
+        lines.append(f"Total: {sum(self.__saved.values())} bytes saved")
+        return "\n".join(lines)
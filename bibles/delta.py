@@ -0,0 +1,102 @@
+"""
+Verse and word level deltas of a derived version against a base version.
+"""
+from difflib import SequenceMatcher
+from typing import List, Optional, Union
+import json
+
+
+def _verse_patch(base: str, derived: str) -> Union[str, list]:
+    """
+    Makes the smaller of a word level patch or a whole replacement for a verse.
+    :param base: Base verse.
+    :param derived: Derived verse.
+    :return: The derived verse, or a list of [start, end, [words]] word replacements.
+    """
+    base_words = base.split(' ')
+    derived_words = derived.split(' ')
+    operations = [
+        [start, end, derived_words[derived_start:derived_end]]
+        for tag, start, end, derived_start, derived_end
+        in SequenceMatcher(None, base_words, derived_words, autojunk=False).get_opcodes()
+        if tag != 'equal'
+    ]
+    if len(json.dumps(operations)) < len(json.dumps(derived)):
+        return operations
+    return derived
+
+
+def _apply_verse_patch(base: str, patch: Union[str, list]) -> str:
+    """
+    Applies a patch made by _verse_patch.
+    :param base: Base verse.
+    :param patch: The patch.
+    :return: The derived verse.
+    """
+    if isinstance(patch, str):
+        return patch
+    words = base.split(' ')
+    # Apply from the end so that earlier word positions stay valid
+    for start, end, replacement in reversed(patch):
+        words[start:end] = replacement
+    return ' '.join(words)
+
+
+def make_delta(base_name: str, base: dict, derived: dict) -> dict:
+    """
+    Makes a delta of a derived corpus against a base corpus.
+    Every book and chapter of the derived corpus is listed, in order, so that the round trip
+    is exact. A chapter is None when it matches the base, a list when the base lacks it, or
+    {"n": verse count, "v": {index: verse patch}} otherwise.
+    :param base_name: Name of the base version.
+    :param base: Base corpus (book -> chapter -> list of verses).
+    :param derived: Derived corpus (book -> chapter -> list of verses).
+    :return: The delta.
+    """
+    books: dict = {}
+    for book, chapters in derived.items():
+        books[book] = {}
+        for chapter, verses in chapters.items():
+            base_verses: Optional[List[str]] = base.get(book, {}).get(chapter)
+            if base_verses == verses:
+                books[book][chapter] = None
+            elif base_verses is None:
+                books[book][chapter] = verses
+            else:
+                books[book][chapter] = {
+                    "n": len(verses),
+                    "v": {
+                        str(index): (
+                            _verse_patch(base_verses[index], verse)
+                            if index < len(base_verses) else verse
+                        )
+                        for index, verse in enumerate(verses)
+                        if index >= len(base_verses) or base_verses[index] != verse
+                    }
+                }
+    return {"base": base_name, "books": books}
+
+
+def apply_delta(base: dict, delta: dict) -> dict:
+    """
+    Rebuilds a derived corpus from its base corpus and a delta made by make_delta.
+    :param base: Base corpus (book -> chapter -> list of verses).
+    :param delta: The delta.
+    :return: The derived corpus.
+    """
+    derived: dict = {}
+    for book, chapters in delta["books"].items():
+        derived[book] = {}
+        for chapter, patch in chapters.items():
+            if patch is None:
+                derived[book][chapter] = list(base[book][chapter])
+            elif isinstance(patch, list):
+                derived[book][chapter] = patch
+            else:
+                verses = base[book][chapter][:patch["n"]]
+                verses.extend([""] * (patch["n"] - len(verses)))
+                for index, verse_patch in patch["v"].items():
+                    index = int(index)
+                    verses[index] = _apply_verse_patch(verses[index], verse_patch)
+                derived[book][chapter] = verses
+    return derived
@@ -1,32 +1,47 @@
 """
 Class for the ESV
 """
+import os
 from re import split as resplit
 from re import sub, search, match
-from typing import List
+from typing import Iterable, List, Optional, Tuple
 
 from bs4 import BeautifulSoup, Tag, NavigableString
-from requests import get, HTTPError
+from requests import HTTPError, RequestException
 
 # pylint: disable=import-error
-from bibles.bible import Bible
-from bibles.compresscache import CompressCache
+from bibles import session
+from bibles.bible import NetworkBible
+from bibles.esvparser import ESVPageParser
+from bibles.pagecoverage import PageCoverage
+from bibles.parsepool import PARSE_POOL
 from bibles.passage import PassageInvalid, PassageNotFound
+from bibles.verselru import VerseLRU
 
 
-class ESV(Bible):
+# Most verses the ESV API terms allow an application to cache
+CACHE_VERSE_LIMIT: int = 500
+# Name of the cache, which its recency and page coverage files are named after
+CACHE_NAME: str = "esv"
+# Site whose chapter pages are read when there is no API key
+PAGE_URL: str = "https://www.esv.org/"
+
+
+class ESV(NetworkBible):
     """
     Class for the ESV
     """
+    # Pages hold several chapters and the cache is capped, so fetch one at a time
+    parallel_fetches: int = 1
+
     def __init__(self, key_in="", debug=False) -> None:
         """
         Gets a JSON formatted dictionary of an ESV passage
         :param key_in: (True, "API key"),
         with the default (False, "") being reading from the file api-key.txt
         """
-        super().__init__()
+        super().__init__(CACHE_NAME)
         self.__debug = debug
-        self.__compress_cache = CompressCache("esv")
         # API Setup
         try:
             if len(key_in) < 0:
@@ -38,15 +53,34 @@ class ESV(Bible):
             self.__api_key = ""
         self.__api_url: str = 'https://api.esv.org/v3/passage/text/'
         # Caching
-        try:
-            self.__cache: dict = self.__compress_cache.load()
-        except FileNotFoundError:
-            # Initialize empty cache
-            self.__cache: dict = {
-                book.name: {
-                    str(chapter): {} for chapter in range(1, book.chapter_count + 1)
-                } for book in super().books
-            }
+        self._load_cache(dict)
+        # Recency of the cached chapters, read back from the last run. Chapters it does not
+        # know (i.e. a cache from before it was kept) count as the least recently read
+        self.__recency = VerseLRU(
+            CACHE_VERSE_LIMIT,
+            os.path.join(os.path.dirname(self._compress_cache.path), f"{CACHE_NAME}-recency.json")
+        )
+        saved_order = [
+            chapter for chapter in self.__recency.load_order() if self.__has_verses(*chapter)
+        ]
+        known = set(saved_order)
+        evicted = self.__recency.add_all(
+            ((book, chapter), self.__verse_count(self._cache[book][chapter]))
+            for book, chapter in [
+                (book, chapter) for book, chapters in self._cache.items()
+                for chapter in chapters
+                if (book, chapter) not in known and self.__has_verses(book, chapter)
+            ] + saved_order
+        )
+        for book, chapter in evicted:
+            self._cache[book][chapter] = {}
+        if evicted:
+            self._mark_dirty()
+        self.__evictions: int = 0
+        # The chapters each esv.org page fetched held, learned across runs
+        self.__coverage = PageCoverage(
+            os.path.join(os.path.dirname(self._compress_cache.path), f"{CACHE_NAME}-pages.json")
+        )
 
     # pylint: disable=inconsistent-return-statements
     def get_passage(self, book: str, chapter: int) -> dict:
@@ -60,21 +94,139 @@ class ESV(Bible):
         if super().has_passage(book, chapter):
             try:
                 # Try to use the cache to retrieve the verse
-                if len(self.__cache[book][str(chapter)]['verses']):
-                    return {
-                        'book': book,
-                        'chapter': chapter,
-                        'verses': self.__cache[book][str(chapter)]['verses'],
-                        'footnotes':
-                            self.__cache[book][str(chapter)]['footnotes']
-                            if 'footnotes' in self.__cache[book][str(chapter)]
-                            else ""
-                    }
+                if len(self._cache[book][str(chapter)]['verses']):
+                    return self.__cached_passage(book, chapter)
             except KeyError:
-                return self.__api_return(book, chapter)
+                # Keys are namespaced, so API chapters and esv.org pages never share a flight
+                # or a recent failure
+                return self._single_flight(
+                    ("chapter", book, int(chapter)), self.__api_return, book, chapter
+                )
         else:
             raise PassageInvalid(book + " " + str(chapter))
 
+    def is_cached(self, book: str, chapter: int) -> bool:
+        """
+        Whether a chapter is in the cache
+        :param book: Name of the book
+        :param chapter: the chapter
+        :return: True if cached, or if invalid so that get_passage fails fast
+        """
+        try:
+            return len(self._cache[book][str(chapter)].get('verses', {})) > 0
+        except KeyError:
+            return True
+
+    def warm(
+            self, chapters: Optional[Iterable[Tuple[str, int]]] = None, max_pages: int = 10
+    ) -> int:
+        """
+        Fetches chapters ahead of readers, requesting each time the page known to hold the
+        most uncached chapters wanted. Stops once the cache is full, as fetching more would
+        only evict what was just fetched.
+        :param chapters: (book, chapter) of the chapters to warm, in order of preference.
+        Defaults to the whole canon.
+        :param max_pages: Most pages to request.
+        :return: The number of pages requested.
+        """
+        wanted = [
+            (book, str(chapter)) for book, chapter in (
+                chapters if chapters is not None else (
+                    (book.name, chapter) for book in self.books
+                    for chapter in range(1, book.chapter_count + 1)
+                )
+            )
+        ]
+        failed: set = set()
+        requested = 0
+        while requested < max_pages:
+            page = self.__coverage.best_page(
+                (chapter for chapter in wanted if chapter not in failed), self.is_cached
+            )
+            if page is None:
+                break
+            evictions = self.__evictions
+            requested += 1
+            try:
+                self.__fetch_page(page)
+            except (PassageNotFound, RequestException):
+                failed.update(self.__coverage.chapters_on(page))
+                continue
+            if self.__evictions > evictions:
+                break
+        return requested
+
+    @property
+    def cached_verses(self) -> int:
+        """
+        Verses in the cache, never more than CACHE_VERSE_LIMIT.
+        """
+        return self.__recency.total
+
+    def __has_verses(self, book: str, chapter: str) -> bool:
+        """
+        Whether a cache entry holds any verses
+        :param book: Name of the book
+        :param chapter: the chapter, as a string
+        :return: True if the entry holds verses
+        """
+        return self.__verse_count(self._cache.get(book, {}).get(chapter, {})) > 0
+
+    @staticmethod
+    def __verse_count(entry: dict) -> int:
+        """
+        Counts the verses of a cache entry, across its headings
+        :param entry: The cache entry of a chapter
+        :return: The number of verses
+        """
+        return sum(len(verses) for verses in entry.get('verses', {}).values())
+
+    def __cached_passage(self, book: str, chapter: int) -> dict:
+        """
+        Formats a cached chapter, marking it as just read
+        :param book: Name of the book (pre-validated)
+        :param chapter: chapter number (pre-validated)
+        :return: The dictionary of the chapter.
+        """
+        entry = self._cache[book][str(chapter)]
+        self.__recency.touch((book, str(chapter)))
+        return {
+            'book': book,
+            'chapter': chapter,
+            'verses': entry['verses'],
+            'footnotes': entry['footnotes'] if 'footnotes' in entry else ""
+        }
+
+    def __fetch_page(self, page: Tuple[str, str]) -> None:
+        """
+        Fetches the esv.org page of a chapter (or the chapter from the API, with a key) into
+        the cache. Concurrent fetches of the same page are coalesced into one request.
+        :param page: (book, chapter) the page is requested for.
+        :return: None
+        """
+        if len(self.__api_key):
+            self.get_passage(page[0], int(page[1]))
+        else:
+            self._single_flight(
+                ("page", page[0], str(page[1])), self.__non_api_fetch, page[0], page[1]
+            )
+
+    def __store(self, book: str, chapter: str, entry: dict) -> None:
+        """
+        Caches a chapter as the most recently read, evicting the least recently read chapters
+        so that the cache stays within CACHE_VERSE_LIMIT verses. Call with the lock held.
+        :param book: Name of the book
+        :param chapter: the chapter, as a string
+        :param entry: {'verses': {heading: [verses]}, and optionally 'footnotes'}
+        :return: None
+        """
+        self._cache[book][chapter] = entry
+        for evicted_book, evicted_chapter in self.__recency.add(
+                (book, chapter), self.__verse_count(entry)
+        ):
+            self._cache[evicted_book][evicted_chapter] = {}
+            self.__evictions += 1
+
     def __get_chapter_esv(self, chapter_in) -> tuple:
         """
         Gets a full chapter of the ESV.
@@ -94,11 +246,11 @@ class ESV(Bible):
         headers: dict = {'Authorization': f"Token {self.__api_key}"}
 
         try:
-            response: dict = get(
+            response: dict = session.get(
                 self.__api_url,
                 params=params,
                 headers=headers,
-                timeout=30
+                timeout=(session.CONNECT_TIMEOUT, 30)
             ).json()
             loc_footnotes: int = str(response['passages']).find('Footnotes')
             footnotes: str = (
@@ -250,77 +402,51 @@ class ESV(Bible):
         pre = resplit(r'\[', sub(']', "", verses_in))
         return list(filter(None, [sub(r"\s+$", "", verse) for verse in pre]))
 
-    # pylint: disable=too-many-branches
     def __api_return(self, book: str, chapter: int) -> dict:
         """
         Gets the given verse from the API,
-        and clears the cache in accordance with the ESV API caching limits.
+        and caches it in accordance with the ESV API caching limits.
         :param book: Book to retrieve from.
         :param chapter: The chapter of that book.
         :return: A dictionary formatted by book, chapter, verses, and footnotes.
+        :raises: PassageNotFound if the page fetched did not hold the chapter.
         """
-        if len(self.__api_key):
-            passage = self.__get_chapter_esv_json(book + " " + str(chapter))
-        else:
-            self.__non_api_fetch(book=book, chapter=str(chapter))
-            passage = self.get_passage(book, chapter)
-
+        if not len(self.__api_key):
+            # Fetch the page known to hold the chapter, which may be one another reader is
+            # fetching already. If it no longer does, fall back to the chapter's own page
+            wanted = (book, str(chapter))
+            page = self.__coverage.page_for(wanted)
+            self.__fetch_page(page)
+            if not self.is_cached(book, chapter) and page != wanted:
+                self.__fetch_page(wanted)
+            if not self.is_cached(book, chapter):
+                raise PassageNotFound(book + " " + str(chapter))
+            return self.__cached_passage(book, chapter)
+
+        passage = self.__get_chapter_esv_json(book + " " + str(chapter))
         # This is to be able to evaluate more results at once.
         if self.__debug:
             return passage
 
-
-        # Make sure the cache is within guidelines
-        verse_count = 0
-        for book_iter in self.__cache.keys():
-            for chapter_iter in self.__cache[book_iter].keys():
-                try:
-                    for heading in self.__cache[book_iter][chapter_iter]['verses'].keys():
-                        verse_count += len(self.__cache[book_iter][chapter_iter]['verses'][heading])
-                except KeyError:
-                    # Empty entry
-                    pass
-
-        # If the cache is outside the guidelines,
-        # then remove passages until it is.
-        # This also has the side benefit of keeping the cache small.
-        if verse_count + len(passage['verses']) >= 500:
-            verse_count_to_remove: int = verse_count + len(passage['verses']) - 500
-            for book_iter in self.__cache.keys():
-                for chapter_iter in self.__cache[book_iter].keys():
-                    # Clear the entry iff it has data
-                    try:
-                        if size := len(self.__cache[book_iter][chapter_iter]['verses']):
-                            self.__cache[book_iter][chapter_iter] = {}
-                            verse_count_to_remove -= size
-                    except KeyError:
-                        pass
-                    # Break whenever enough has been cleared
-                    if verse_count_to_remove <= 0:
-                        break
-
-            # Cache the passage and save
-            self.__cache[book][str(chapter)] = {
+        with self._lock:
+            self.__store(book, str(chapter), {
                 'verses': passage['verses'],
                 'footnotes': passage['footnotes']
-            }
-            self.__compress_cache.save(self.__cache)
-        else:
-            self.__cache[book][str(chapter)] = {
-                'verses': passage['verses'],
-                'footnotes': passage['footnotes']
-            }
+            })
+        # The capped cache is small, so all of it is saved rather than tracking the books changed
+        self._mark_dirty()
         return passage
 
     def __non_api_fetch(self, book: str, chapter: str) -> None:
         """
-        Retrieves a passage when an API key is not supplied.
+        Retrieves a passage when an API key is not supplied, caching every chapter on its page
+        and recording which chapters those are.
         :param book: Book to fetch.
         :param chapter: Chapter of the book
         :return: None
         """
         try:
-            uri = "https://www.esv.org/"
+            uri = PAGE_URL
             # Hey website! I'm a browser!
             headers = {
                 "Accept":
@@ -350,42 +476,58 @@ class ESV(Bible):
                 "sec-ch-ua-platform": '"Windows"'
             }
 
-            response = get(
-                f"{uri}{book if book != 'Psalms' else 'Psalm'}+{chapter}", 
+            response = session.get(
+                f"{uri}{book if book != 'Psalms' else 'Psalm'}+{chapter}",
                 headers=headers,
-                timeout=30
+                timeout=(session.CONNECT_TIMEOUT, 30)
             )
+            response.raise_for_status()
         except HTTPError as ex:
             raise PassageNotFound(str(ex)) from ex
-        result = self.parse(response.content.decode('utf-8'))
-        # pylint: disable=consider-using-dict-items,consider-iterating-dictionary
-        for book_ref in result.keys():
-            for chapter_ref in result[book_ref].keys():
-                if book_ref == 'Psalm':
-                    self.__cache['Psalms'][str(chapter_ref)]['verses'] = \
-                        result[book_ref][chapter_ref]
-                elif book_ref == 'Obadia':
-                    self.__cache['Obadiah']['1']['verses'] = result['Obadia']['Obadiah']
-                elif book_ref == 'Philemo':
-                    self.__cache['Philemon']['1']['verses'] = result['Philemo']['Philemon']
-                elif book_ref == '2':
-                    self.__cache['2 John']['1']['verses'] = result['2']['John']
-                elif book_ref == '3':
-                    self.__cache['3 John']['1']['verses'] = result['3']['John']
-                elif book_ref == 'Jud':
-                    self.__cache['Jude']['1']['verses'] = result['Jud']['Jude']
-                else:
-                    self.__cache[book_ref][str(chapter_ref)]['verses'] = \
-                        result[book_ref][chapter_ref]
-        if int(chapter) % 2 == 0:
-            self.__compress_cache.save(self.__cache)
+        # Parsed in a worker process, off this process's GIL
+        result = PARSE_POOL.run(type(self).parse, response.content.decode('utf-8'))
+        # The page's names for single chapter books: page book -> (book, chapter key)
+        single_chapters = {
+            'Obadia': ('Obadiah', 'Obadiah'), 'Philemo': ('Philemon', 'Philemon'),
+            '2': ('2 John', 'John'), '3': ('3 John', 'John'), 'Jud': ('Jude', 'Jude')
+        }
+        fetched = []
+        for book_ref, chapters in result.items():
+            if book_ref in single_chapters:
+                name, key = single_chapters[book_ref]
+                fetched.append((name, '1', chapters[key]))
+                continue
+            for chapter_ref, verses in chapters.items():
+                fetched.append((
+                    'Psalms' if book_ref == 'Psalm' else book_ref, str(chapter_ref), verses
+                ))
+        # The chapter asked for goes last, so it is the most recently read
+        fetched.sort(key=lambda item: (item[0], item[1]) == (book, chapter))
+        self.__coverage.record(
+            (book, chapter), [(book_ref, chapter_ref) for book_ref, chapter_ref, _ in fetched]
+        )
+        with self._lock:
+            for book_ref, chapter_ref, verses in fetched:
+                self.__store(book_ref, chapter_ref, {'verses': verses})
+        self._mark_dirty()
 
 
-    # pylint: disable=too-many-locals,too-many-statements
     @classmethod
     def parse(cls, content: str) -> dict:
         """
-        Pareses the HTML into the desired format.
+        Parses the HTML into the desired format, in one pass over the page (see
+        bibles.esvparser).
+        :param content: HTML, converted to a string.
+        :return: Dict of the same format as the memory cache.
+        """
+        return ESVPageParser.parse(content)
+
+    # pylint: disable=too-many-locals,too-many-statements
+    @classmethod
+    def parse_soup(cls, content: str) -> dict:
+        """
+        Pareses the HTML into the desired format by walking a BeautifulSoup tree of the page.
+        Kept as the reference that parse is checked and benchmarked against.
         :param content: HTML, converted to a string.
         :return: Dict of the same format as the memory cache.
         """
@@ -0,0 +1,299 @@
+"""
+Event-driven parser of esv.org chapter pages.
+It reads the page in one pass, keeping only the open elements and the verse being built, and
+gives the same result as parsing a BeautifulSoup tree of the page (see ESV.parse_soup).
+"""
+import html
+import re
+from html.entities import html5
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+
+# Elements BeautifulSoup closes as soon as they open
+VOID_ELEMENTS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'menuitem',
+    'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound', 'command', 'frame',
+    'image', 'isindex', 'nextid', 'spacer'
+})
+# Elements whose whitespace BeautifulSoup keeps as is
+PRESERVE_WHITESPACE = frozenset({'pre', 'textarea'})
+# Elements whose strings BeautifulSoup leaves out of the text of the elements around them
+STRING_CONTAINERS = frozenset({'rt', 'rp', 'style', 'script', 'template'})
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+# Words that start with these are not spaced from the word before
+NO_SPACE_BEFORE: re.Pattern = re.compile(r'[ \xa0,;.!?“”]')
+
+# Roles of the elements the parser acts on
+_BODY, _OUTER, _MAIN, _ARTICLE, _CONTENT, _SECTIONS = range(6)
+_SECTION, _HEADING, _CHILD, _ELEMENT, _WORDS, _WORD = range(6, 12)
+
+
+class _Element:
+    """
+    An open element.
+    """
+    __slots__ = ('name', 'attrs', 'role')
+
+    def __init__(self, name: str, attrs: Dict[str, str], role: Optional[int]) -> None:
+        self.name = name
+        self.attrs = attrs
+        self.role = role
+
+    def classes(self) -> List[str]:
+        """
+        :return: The element's classes.
+        :raises: KeyError if it has no class attribute, as the tree walk would.
+        """
+        return self.attrs['class'].split()
+
+
+class ESVPageParser(HTMLParser):
+    """
+    Parses an esv.org page into {book: {chapter: {heading: [verses]}}}.
+    The verses are the sections of the second child of the first div of the page's article
+    (body > div > main > article > div > [1] > section), as the tree walk found them.
+    Pages without that structure give an empty result.
+    """
+    def __init__(self) -> None:
+        # References are resolved by the handlers below, as BeautifulSoup resolves them
+        super().__init__(convert_charrefs=False)
+        self.results: dict = {}
+        self.__stack: List[_Element] = []
+        # Text since the last tag, comment or declaration, kept as one string like BeautifulSoup
+        self.__data: List[str] = []
+        self.__preserve: int = 0
+        self.__containers: int = 0
+        # The structural elements, once found
+        self.__found: Dict[int, _Element] = {}
+        self.__content_children: int = 0
+        # The section being read
+        self.__book: str = ""
+        self.__chapter: dict = {}
+        self.__heading: str = 'none'
+        self.__counter: int = 0     # For Song of Solomon
+        self.__verse: str = ""
+        # The heading or verse word whose text is being collected
+        self.__capture: Optional[_Element] = None
+        self.__text: List[str] = []
+
+    @classmethod
+    def parse(cls, content: str) -> dict:
+        """
+        Parses a page.
+        :param content: HTML, converted to a string.
+        :return: Dict of the same format as the memory cache.
+        """
+        parser = cls()
+        parser.feed(content)
+        parser.close()
+        return parser.results
+
+    def close(self) -> None:
+        """
+        Finishes the page, closing the elements still open.
+        :return: None
+        """
+        super().close()
+        self.__end_data()
+        while self.__stack:
+            self.__pop()
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        self.__end_data()
+        element = _Element(
+            tag, {key: "" if value is None else value for key, value in attrs}, self.__role(tag)
+        )
+        if element.role is not None:
+            self.__start(element)
+        self.__stack.append(element)
+        if tag in PRESERVE_WHITESPACE:
+            self.__preserve += 1
+        if tag in STRING_CONTAINERS:
+            self.__containers += 1
+        if tag in VOID_ELEMENTS:
+            self.__pop()
+
+    def handle_startendtag(self, tag: str, attrs: list) -> None:
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        self.__end_data()
+        # Close everything up to the most recent element of that name, if one is open
+        for index in range(len(self.__stack) - 1, -1, -1):
+            if self.__stack[index].name == tag:
+                while len(self.__stack) > index:
+                    self.__pop()
+                return
+
+    def handle_data(self, data: str) -> None:
+        self.__data.append(data)
+
+    def handle_charref(self, name: str) -> None:
+        self.__data.append(html.unescape(f"&#{name};"))
+
+    def handle_entityref(self, name: str) -> None:
+        # Unknown names are kept as written
+        self.__data.append(html5.get(f"{name};", f"&{name}"))
+
+    def handle_comment(self, data: str) -> None:
+        self.__end_data()
+        self.__child_node()
+
+    def handle_decl(self, decl: str) -> None:
+        self.__end_data()
+        self.__child_node()
+
+    def handle_pi(self, data: str) -> None:
+        self.__end_data()
+        self.__child_node()
+
+    def unknown_decl(self, data: str) -> None:
+        self.__end_data()
+        self.__child_node()
+
+    def __end_data(self) -> None:
+        """
+        Finishes the string read since the last markup, collapsing it like BeautifulSoup if it
+        is only whitespace, and adds it to the text being collected.
+        :return: None
+        """
+        if not self.__data:
+            return
+        data = "".join(self.__data)
+        self.__data = []
+        if not self.__preserve and not data.strip(ASCII_SPACES):
+            data = "\n" if "\n" in data else " "
+        self.__child_node()
+        if self.__capture is not None and not self.__containers:
+            self.__text.append(data)
+
+    def __child_node(self) -> None:
+        """
+        Counts a node added to the open element, to find the element holding the sections.
+        :return: None
+        """
+        if self.__stack and self.__stack[-1].role == _CONTENT:
+            self.__content_children += 1
+
+    def __role(self, tag: str) -> Optional[int]:
+        """
+        Works out what an opening element is to the parser.
+        :param tag: The element's name.
+        :return: Its role, or None if it is not acted on.
+        """
+        parent = self.__stack[-1].role if self.__stack else None
+        if parent is not None and parent >= _SECTION:
+            if parent == _SECTION:
+                return _HEADING if tag in ('h3', 'h4') else _CHILD
+            if parent == _CHILD:
+                return _ELEMENT
+            if parent == _ELEMENT:
+                return _WORDS
+            if parent == _WORDS and self.__stack[-1].name == 'span':
+                return _WORD
+            return None
+        if parent == _CONTENT:
+            self.__content_children += 1
+            if self.__content_children == 2:
+                return _SECTIONS
+            return None
+        if parent == _SECTIONS and tag == 'section':
+            return _SECTION
+        # The first body, then the first div, main and article each inside the one before
+        for role, name in (
+                (_BODY, 'body'), (_OUTER, 'div'), (_MAIN, 'main'), (_ARTICLE, 'article')
+        ):
+            if role not in self.__found:
+                if tag == name and (role == _BODY or self.__found[role - 1] in self.__stack):
+                    return role
+                return None
+        if tag == 'div' and parent == _ARTICLE and _CONTENT not in self.__found:
+            return _CONTENT
+        return None
+
+    def __start(self, element: _Element) -> None:
+        """
+        Acts on an element opening.
+        :param element: The element.
+        :return: None
+        """
+        role = element.role
+        if role < _SECTION:
+            self.__found[role] = element
+        elif role == _SECTION:
+            reference = element.attrs['data-reference']
+            self.__book = reference[:reference.rfind(" ")]
+            chapter_ref = reference[reference.rfind(" ") + 1:]
+            self.__chapter = self.results.setdefault(self.__book, {}).setdefault(chapter_ref, {})
+            self.__heading = 'none'
+            self.__counter = 0
+        elif role == _CHILD:
+            self.__verse = ""
+        elif role == _HEADING or (role in (_WORDS, _WORD) and element.name in ('b', 'u')):
+            if element.name == 'b':
+                self.__end_verse()
+            self.__capture = element
+            self.__text = []
+        elif role in (_WORDS, _WORD) and element.name == 'span' \
+                and 'small-caps' in element.classes():
+            self.__verse += 'Lord'
+
+    def __pop(self) -> None:
+        """
+        Closes the innermost open element, acting on it if needed.
+        :return: None
+        """
+        element = self.__stack.pop()
+        if element.name in PRESERVE_WHITESPACE:
+            self.__preserve -= 1
+        if element.name in STRING_CONTAINERS:
+            self.__containers -= 1
+        if element is self.__capture:
+            self.__capture = None
+            self.__end_capture(element, "".join(self.__text))
+        elif element.role == _CHILD:
+            if len(self.__verse) > 0:
+                self.__chapter.setdefault(self.__heading, []).append(self.__verse)
+
+    def __end_capture(self, element: _Element, text: str) -> None:
+        """
+        Acts on a heading or verse word once its text is complete.
+        :param element: The heading, or b or u element.
+        :param text: Its text.
+        :return: None
+        """
+        if element.name == 'h3':
+            self.__heading = text
+        elif element.name == 'h4':
+            if self.__heading != 'none' and self.__book != "Song of Solomon":
+                self.__heading += "\n" + text
+            elif 'speaker' in element.classes():
+                if self.__heading not in self.__chapter:
+                    self.__chapter[self.__heading] = [""]
+                self.__heading = text + " " * self.__counter
+                self.__counter += 1
+        elif element.name == 'b':
+            self.__verse += text if 'verse-num' in element.classes() else "1 "
+        elif len(self.__verse) == 0:
+            # Words carried over from the verse before
+            if self.__heading in self.__chapter:
+                self.__chapter[self.__heading][-1] += text
+            else:
+                self.__verse = text
+        else:
+            if element.role == _WORD and self.__verse[-1] not in ('\xa0', ' ', '“') \
+                    and not NO_SPACE_BEFORE.match(text):
+                self.__verse += " "
+            self.__verse += text
+
+    def __end_verse(self) -> None:
+        """
+        Files the verse being built under the current heading, as a new verse number starts.
+        :return: None
+        """
+        if len(self.__verse) > 0:
+            self.__chapter.setdefault(self.__heading, []).append(self.__verse)
+            self.__verse = ""
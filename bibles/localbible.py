@@ -0,0 +1,160 @@
+"""
+Base class for versions served from a bundled corpus in json-bibles
+"""
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple, Type
+from bibles.bible import Bible
+from bibles.passage import PassageInvalid, PassageNotFound
+from bibles.compresscache import CompressCache
+from bibles.versestore import VerseStore
+
+
+# Defaults for versions constructed without explicit lazy and compact arguments
+LAZY_LOAD: bool = os.environ.get("BIBLE_LAZY_LOAD", "").lower() in ("1", "true", "yes")
+COMPACT: bool = os.environ.get("BIBLE_COMPACT", "").lower() in ("1", "true", "yes")
+
+
+class LocalBible(Bible):
+    """
+    Base class for versions served from a bundled corpus in json-bibles.
+    Subclasses only need to set cache_name.
+    """
+    cache_name: str = ""
+
+    def __init__(
+            self,
+            lazy: Optional[bool] = None,
+            corpus: Optional[dict] = None,
+            compact: Optional[bool] = None
+    ) -> None:
+        """
+        Loads the corpus. When a compiled verse store exists, it is memory mapped instead.
+        Otherwise, when a chapter-indexed file exists, chapters are decompressed as they are
+        first requested.
+        :param lazy: Only record the version and load the corpus on the first get_passage call.
+        Defaults to the BIBLE_LAZY_LOAD environment variable.
+        :param corpus: An already loaded corpus (see load_versions) to use instead of loading one.
+        :param compact: Hold a loaded corpus as an in-memory verse store rather than as
+        dictionaries of lists of strings. Defaults to the BIBLE_COMPACT environment variable.
+        """
+        super().__init__()
+        self.__compress_cache = CompressCache(self.cache_name)
+        self.__lock = threading.Lock()
+        self.__compact: bool = COMPACT if compact is None else compact
+        self.__corpus: Optional[dict] = None
+        self.__store: Optional[VerseStore] = None
+        self.__indexed: bool = False
+        if corpus is not None:
+            self.__use(corpus)
+        elif not (LAZY_LOAD if lazy is None else lazy):
+            self.__load()
+
+    @property
+    def loaded(self) -> bool:
+        """
+        Whether the corpus has been loaded (or opened, for verse stores and chapter-indexed files).
+        """
+        return self.__corpus is not None
+
+    def get_passage(self, book: str, chapter: int) -> dict:
+        """
+        Returns a dictionary (Format: {book: "", chapter: 0, verses: {'none': ["1 content..."]}})
+        of the chapter
+        :param book: Name of the book
+        :param chapter: chapter number
+        :return: dict of the chapter
+        :raises: PassageInvalid for invalid passages (According to Bible ABC validator)
+        """
+        if super().has_passage(book, chapter):
+            return {
+                "book": book,
+                "chapter": chapter,
+                "verses": {
+                    'none': self.__chapter(book, str(chapter))
+                }
+            }
+        raise PassageInvalid(book + " " + str(chapter))
+
+    def get_verse(self, book: str, chapter: int, verse: int) -> str:
+        """
+        Gets a single verse. Verse stores look it up directly by its ordinal.
+        :param book: Name of the book
+        :param chapter: chapter number
+        :param verse: verse number
+        :return: The verse ("16 For God so loved...")
+        :raises: PassageInvalid for invalid chapters, PassageNotFound for missing verses.
+        """
+        if self.__corpus is None:
+            self.__load()
+        if self.__store is None:
+            return super().get_verse(book, chapter, verse)
+        if not super().has_passage(book, int(chapter)):
+            raise PassageInvalid(book + " " + str(chapter))
+        try:
+            return self.__store.verse(book, str(chapter), int(verse))
+        except KeyError as exc:
+            raise PassageNotFound(f"{book} {chapter}:{verse}") from exc
+
+    def __chapter(self, book: str, chapter: str) -> list:
+        """
+        Gets the verses of a chapter from the corpus.
+        :param book: Name of the book (pre-validated)
+        :param chapter: Chapter number as a string (pre-validated)
+        :return: List of verses
+        """
+        corpus = self.__corpus if self.__corpus is not None else self.__load()
+        if self.__store is not None:
+            return self.__store.chapter(book, chapter)
+        if self.__indexed:
+            book_cache = corpus.setdefault(book, {})
+            if chapter not in book_cache:
+                book_cache[chapter] = self.__compress_cache.load_chapter(book, chapter)
+            return book_cache[chapter]
+        return corpus[book][chapter]
+
+    def __load(self) -> dict:
+        """
+        Loads the corpus exactly once, even when several threads ask for it at the same time.
+        :return: The loaded corpus
+        """
+        with self.__lock:
+            if self.__corpus is None:
+                if os.path.exists(self.__compress_cache.store_path):
+                    self.__store = VerseStore.open(self.__compress_cache.store_path)
+                    self.__corpus = {}
+                elif self.__compress_cache.has_index():
+                    self.__indexed = True
+                    self.__corpus = {}
+                else:
+                    self.__use(self.__compress_cache.load())
+            return self.__corpus
+
+    def __use(self, corpus: dict) -> None:
+        """
+        Uses a fully loaded corpus, compacting it if configured to.
+        :param corpus: The loaded corpus
+        :return: None
+        """
+        if self.__compact:
+            self.__store = VerseStore.from_corpus(corpus)
+            self.__corpus = {}
+        else:
+            self.__corpus = corpus
+
+
+def load_versions(
+        versions: Iterable[Type[LocalBible]],
+        max_workers: Optional[int] = None
+) -> Tuple[List[LocalBible], Dict[str, float]]:
+    """
+    Constructs several local versions, loading their corpora in parallel worker processes.
+    :param versions: The LocalBible subclasses to construct.
+    :param max_workers: Number of worker processes. Defaults to the number of CPUs.
+    :return: The constructed versions, in the given order, and the load time of each by cache name.
+    """
+    versions = list(versions)
+    corpora, timings = CompressCache.load_many(
+        [version.cache_name for version in versions], max_workers
+    )
+    return [version(corpus=corpora[version.cache_name]) for version in versions], timings
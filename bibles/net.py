@@ -3,31 +3,22 @@ NET Bible
 """
 import re
 from typing import List
-from requests import get, HTTPError
+from requests import HTTPError
+from bibles import session
 from bibles.passage import PassageInvalid, PassageNotFound
-from bibles.bible import Bible
-from bibles.compresscache import CompressCache
+from bibles.bible import NetworkBible
 
 
-class NET(Bible):
+class NET(NetworkBible):
     """NET Bible"""
     def __init__(self) -> None:
         """
         Gets a JSON formatted dictionary of an NET passage
         """
-        super().__init__()
-        self.__compress_cache = CompressCache('net')
+        super().__init__('net')
 
         # Caching
-        try:
-            self.__cache: dict = self.__compress_cache.load()
-        except FileNotFoundError:
-            # Initialize empty cache
-            self.__cache: dict = {
-                book.name: {
-                    str(chapter): [] for chapter in range(1, book.chapter_count + 1)
-                } for book in super().books
-            }
+        self._load_cache(list)
 
         self.__api_url: str = "http://labs.bible.org/api/?passage="
 
@@ -44,32 +35,31 @@ class NET(Bible):
         if super().has_passage(book, chapter):
             try:
                 # Try to use the cache to retrieve the verse
-                if len(self.__cache[book][str(chapter)]) == 0:
-                    self.__api_return(book, chapter)
+                if len(self._cache[book][str(chapter)]) == 0:
+                    self._single_flight((book, chapter), self.__api_return, book, chapter)
+                self._read_ahead(book, chapter)
                 return {
                     'book': book,
                     'chapter': chapter,
                     'verses': {
-                        'none': self.__cache[book][str(chapter)]
+                        'none': self._cache[book][str(chapter)]
                     }
                 }
             except KeyError as exc:
                 raise PassageNotFound(book + " " + str(chapter)) from exc
         raise PassageInvalid(book + " " + str(chapter))
 
-    # pylint: disable=inconsistent-return-statements
-    def __api_return(self, book: str, chapter: int) -> dict:
+    def __api_return(self, book: str, chapter: int) -> None:
         """
         Gets a passage from the API
         :param book: Name of the book to get (pre-validated)
         :param chapter: chapter number to get (pre-validated)
         :return: None
+        :raises: PassageNotFound if the API failed or answered with something unexpected
         """
         tag_remover: re.Pattern = re.compile(r'<.*?>')
         try:
-            response = get(
-                f"{self.__api_url}{book} {chapter}&type=json", timeout=20
-            )
+            response = session.get(f"{self.__api_url}{book} {chapter}&type=json")
             response.raise_for_status()
             response = response.json()
             tmp_verses: List[str] = []
@@ -77,17 +67,12 @@ class NET(Bible):
                 tmp_verses.append(
                     verse['verse'] + " " + tag_remover.sub('', verse['text'])
                 )
-            self.__cache[book][str(chapter)] = tmp_verses
-        except KeyError:
-            return {
-                "API Overloaded?": "If this keeps happening, the app could be heavily throttled"
-            }
-        except HTTPError:
-            return {
-                "Issue connecting to the NET API":
-                "Try checking the status of the NET API and the server's network connection"
-            }
+            with self._lock:
+                self._cache[book][str(chapter)] = tmp_verses
+        except (KeyError, ValueError) as exc:
+            # The API is overloaded or throttling: it answers with something other than verses
+            raise PassageNotFound(book + " " + str(chapter)) from exc
+        except HTTPError as exc:
+            raise PassageNotFound(book + " " + str(chapter)) from exc
 
-        # Save for every even chapter query
-        if chapter % 2 == 0:
-            self.__compress_cache.save(self.__cache)
+        self._mark_dirty((book,))
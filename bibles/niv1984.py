@@ -5,30 +5,22 @@ import re
 from typing import List
 from bs4 import BeautifulSoup
 import requests
+from bibles import session
+from bibles.parsepool import PARSE_POOL
 from bibles.passage import PassageInvalid, PassageNotFound
-from bibles.bible import Bible
-from bibles.compresscache import CompressCache
+from bibles.bible import NetworkBible
 
 
-class NIV1984(Bible):
+class NIV1984(NetworkBible):
     """NIV (1984)"""
     def __init__(self) -> None:
         """
         Gets a JSON formatted dictionary of a NIV (1984) passage
         """
-        super().__init__()
-        self.__compress_cache = CompressCache('niv1984')
+        super().__init__('niv1984')
 
         # Caching
-        try:
-            self.__cache: dict = self.__compress_cache.load()
-        except FileNotFoundError:
-            # Initialize empty cache
-            self.__cache: dict = {
-                book.name: {
-                    str(chapter): [] for chapter in range(1, book.chapter_count + 1)
-                } for book in super().books
-            }
+        self._load_cache(list)
 
         self.__headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) '
@@ -54,13 +46,14 @@ class NIV1984(Bible):
         if super().has_passage(book, chapter):
             try:
                 # Try to use the cache to retrieve the verse
-                if len(self.__cache[book][str(chapter)]) == 0:
-                    self.__api_return(book, chapter)
+                if len(self._cache[book][str(chapter)]) == 0:
+                    self._single_flight((book, chapter), self.__api_return, book, chapter)
+                self._read_ahead(book, chapter)
                 return {
                     'book': book,
                     'chapter': chapter,
                     'verses': {
-                        'none': self.__cache[book][str(chapter)]
+                        'none': self._cache[book][str(chapter)]
                     }
                 }
             except KeyError as exc:
@@ -80,24 +73,26 @@ class NIV1984(Bible):
                 f"https://www.studylight.org/bible/eng/n84/"
                 f"{book_url_name}/{chapter}.html"
             )
-            html_content = requests.get(
-                content_url,
-                headers=self.__headers,
-                timeout=20
-            ).text
-            verses = self.__parse(html_content)
-            self.__cache[book][str(chapter)] = verses
+            response = session.get(content_url, headers=self.__headers)
+            response.raise_for_status()
+            # Parsed in a worker process, off this process's GIL
+            verses = PARSE_POOL.run(NIV1984.parse, response.text)
+            with self._lock:
+                self._cache[book][str(chapter)] = verses
         except KeyError as exc:
             raise PassageInvalid(book + " " + str(chapter)) from exc
         except requests.HTTPError as exc:
             raise PassageNotFound(book + " " + str(chapter)) from exc
 
-        # Save for every even chapter query
-        if chapter % 2 == 0:
-            self.__compress_cache.save(self.__cache)
+        self._mark_dirty((book,))
 
     @staticmethod
-    def __parse(content: str) -> List[str]:
+    def parse(content: str) -> List[str]:
+        """
+        Parses a studylight.org chapter page. Public, so a parse worker can look it up by name.
+        :param content: HTML of the page.
+        :return: The verses of the chapter.
+        """
         # Parse the HTML content
         soup = BeautifulSoup(content, 'html.parser')
 
@@ -0,0 +1,131 @@
+"""
+Which chapters each fetched page holds, for versions whose pages span several chapters.
+"""
+import json
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from bibles.compresscache import write_json
+from bibles.persister import PERSISTER
+
+
+Chapter = Tuple[str, str]
+
+
+class PageCoverage:
+    """
+    Learns the chapters each page returns (i.e. the esv.org page of John 3 also holds John 4),
+    so that a miss on any of them fetches the page already known to hold it, and a warmup can
+    pick the pages that fill the most uncached chapters per request.
+    Pages are named by the chapter they were requested for. The map is saved to a small JSON
+    file by the write-behind persister.
+    """
+    def __init__(self, path: Optional[str] = None) -> None:
+        """
+        :param path: JSON file the map is kept in, or None to keep it in memory only.
+        """
+        self.__path = path
+        self.__lock = threading.Lock()
+        # Page -> the chapters it holds, and chapter -> the page last seen holding it
+        self.__pages: Dict[Chapter, List[Chapter]] = {}
+        self.__page_of: Dict[Chapter, Chapter] = {}
+        if path is not None:
+            try:
+                with open(path, "r", encoding="utf-8") as coverage_file:
+                    saved = json.load(coverage_file)
+                for page, chapters in saved:
+                    self.__add(tuple(page), [tuple(chapter) for chapter in chapters])
+            except (FileNotFoundError, ValueError, TypeError):
+                pass
+
+    @property
+    def path(self) -> Optional[str]:
+        """
+        File the map is kept in.
+        """
+        return self.__path
+
+    def __len__(self) -> int:
+        with self.__lock:
+            return len(self.__pages)
+
+    def record(self, page: Chapter, chapters: Iterable[Chapter]) -> None:
+        """
+        Records the chapters a page returned.
+        :param page: (book, chapter) the page was requested for.
+        :param chapters: (book, chapter) of each chapter on it.
+        :return: None
+        """
+        with self.__lock:
+            self.__add(page, list(chapters))
+        if self.__path is not None:
+            PERSISTER.mark_dirty(self, None)
+
+    def page_for(self, chapter: Chapter) -> Chapter:
+        """
+        The page to request for a chapter.
+        :param chapter: (book, chapter) wanted.
+        :return: The page known to hold it, or the chapter's own page.
+        """
+        with self.__lock:
+            return self.__page_of.get(chapter, chapter)
+
+    def chapters_on(self, page: Chapter) -> List[Chapter]:
+        """
+        The chapters a page is known to hold.
+        :param page: (book, chapter) the page is requested for.
+        :return: Its chapters, or just the page's own chapter if it has not been fetched.
+        """
+        with self.__lock:
+            return list(self.__pages.get(page, [page]))
+
+    def best_page(
+            self, chapters: Iterable[Chapter], is_cached: Callable[[str, str], bool]
+    ) -> Optional[Chapter]:
+        """
+        Picks the page that holds the most uncached chapters of those wanted.
+        Chapters on no known page count as their own page of one chapter.
+        :param chapters: (book, chapter) of the chapters wanted.
+        :param is_cached: Whether a chapter is cached.
+        :return: The page, or None if every chapter wanted is cached.
+        """
+        wanted = [chapter for chapter in chapters if not is_cached(*chapter)]
+        if not wanted:
+            return None
+        wanted_set = set(wanted)
+        with self.__lock:
+            # Each candidate page, by the first wanted chapter it holds
+            first: Dict[Chapter, int] = {}
+            for index, chapter in enumerate(wanted):
+                first.setdefault(self.__page_of.get(chapter, chapter), index)
+            # Ties go to the page of the earliest chapter wanted, so a warmup keeps its order
+            return max(first, key=lambda page: (
+                sum(chapter in wanted_set for chapter in self.__pages.get(page, [page])),
+                -first[page]
+            ))
+
+    def save(self, data=None, lock=None, books=None) -> int:  # pylint: disable=unused-argument
+        """
+        Writes the map to the file, replacing it in one step. Has the signature of
+        CompressCache.save so that the write-behind persister can save it.
+        :return: Bytes written.
+        """
+        if self.__path is None:
+            return 0
+        with self.__lock:
+            pages = [
+                [list(page), [list(chapter) for chapter in chapters]]
+                for page, chapters in self.__pages.items()
+            ]
+        return write_json(self.__path, pages)
+
+    def __add(self, page: Chapter, chapters: List[Chapter]) -> None:
+        """
+        Records a page's chapters. Call with the lock held (or before the map is shared).
+        :param page: (book, chapter) the page was requested for.
+        :param chapters: (book, chapter) of each chapter on it.
+        :return: None
+        """
+        self.__pages[page] = chapters
+        for chapter in chapters:
+            self.__page_of[chapter] = page
@@ -0,0 +1,170 @@
+"""
+Process pool that the network-backed versions parse fetched pages in.
+A parse is pure Python and holds the GIL for as long as it runs, so on a request thread one big
+page stalls every other thread of the server, even those serving cached or local chapters.
+In a worker process it costs the caller a wait and the other threads nothing.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Optional, TypeVar
+
+
+# Worker processes (0, the default, parses on the calling thread instead), and parses that may be
+# handed to them at once before further callers wait for room
+PARSE_WORKERS: int = int(os.environ.get("BIBLE_PARSE_WORKERS", "0"))
+PARSE_QUEUE: int = int(os.environ.get("BIBLE_PARSE_QUEUE", "8"))
+
+T = TypeVar('T')
+
+
+def _load_parsers() -> None:
+    """
+    Runs in each worker as it starts, so the first parse it is given does not pay for the imports.
+    :return: None
+    """
+    # pylint: disable=import-outside-toplevel,unused-import
+    import bibles.csbparser
+    import bibles.esv
+    import bibles.niv1984
+
+
+def _ready() -> int:
+    """
+    Does nothing, in a worker.
+    :return: The worker's process id.
+    """
+    return os.getpid()
+
+
+class ParsePool:
+    """
+    Runs parses in long-lived worker processes, started with spawn so that they do not inherit
+    the locks of the server's threads. At most queue parses are handed to the workers at once;
+    callers beyond that wait for one to finish, so a burst of cold chapters queues up here instead
+    of piling pages into the pool's memory.
+    If a worker dies, the pool is replaced and the parse that was running is made in the caller.
+    """
+    def __init__(self, workers: int = PARSE_WORKERS, queue: int = PARSE_QUEUE) -> None:
+        """
+        :param workers: Worker processes, or 0 to parse on the calling thread.
+        :param queue: Parses handed to the workers at once (at least one per worker).
+        """
+        self.__workers = workers
+        self.__slots = threading.BoundedSemaphore(max(queue, workers, 1))
+        self.__lock = threading.Lock()
+        self.__executor: Optional[Executor] = None
+        self.__stats: Dict[str, int] = {
+            "parsed": 0, "inline": 0, "in_flight": 0, "waiting": 0, "restarts": 0
+        }
+
+    @property
+    def workers(self) -> int:
+        """
+        Worker processes, or 0 if parses run on the calling thread.
+        """
+        return self.__workers
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Pool metrics: parses made by workers and on the calling thread, parses handed to the
+        workers right now, callers waiting for room, and pools replaced after a worker died.
+        :return: The metrics, plus the worker count.
+        """
+        with self.__lock:
+            stats = dict(self.__stats)
+        stats["workers"] = self.__workers
+        return stats
+
+    def run(self, function: Callable[..., T], *args) -> T:
+        """
+        Runs a parse in a worker and waits for its result.
+        :param function: The parse, a function or class method importable by name (so that it
+        can be sent to a worker).
+        :param args: Its arguments (i.e. the raw page), which must be picklable.
+        :return: Its result.
+        :raises: Whatever the parse raised.
+        """
+        if self.__workers <= 0:
+            self.__count("inline")
+            return function(*args)
+        self.__count("waiting")
+        with self.__slots:
+            self.__count("waiting", -1)
+            self.__count("in_flight")
+            try:
+                executor = self.__start()
+                try:
+                    result = executor.submit(function, *args).result()
+                except BrokenProcessPool:
+                    self.__replace(executor)
+                    self.__count("inline")
+                    return function(*args)
+                self.__count("parsed")
+                return result
+            finally:
+                self.__count("in_flight", -1)
+
+    def warm(self) -> None:
+        """
+        Starts every worker now rather than on the first parses (i.e. as a server starts).
+        :return: None
+        """
+        if self.__workers > 0:
+            executor = self.__start()
+            for ready in [executor.submit(_ready) for _ in range(self.__workers)]:
+                ready.result()
+
+    def shutdown(self) -> None:
+        """
+        Stops the workers. The next parse starts new ones.
+        :return: None
+        """
+        with self.__lock:
+            executor, self.__executor = self.__executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def __start(self) -> Executor:
+        """
+        Gets the process pool, starting it if needed.
+        :return: The pool.
+        """
+        with self.__lock:
+            if self.__executor is None:
+                self.__executor = ProcessPoolExecutor(
+                    max_workers=self.__workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_load_parsers
+                )
+            return self.__executor
+
+    def __replace(self, broken: Executor) -> None:
+        """
+        Drops a pool whose worker died, unless another caller already has.
+        :param broken: The pool.
+        :return: None
+        """
+        with self.__lock:
+            if self.__executor is not broken:
+                return
+            self.__executor = None
+            self.__stats["restarts"] += 1
+        broken.shutdown(wait=False)
+
+    def __count(self, stat: str, change: int = 1) -> None:
+        """
+        Updates a metric.
+        :param stat: Name of the metric.
+        :param change: Amount to add.
+        :return: None
+        """
+        with self.__lock:
+            self.__stats[stat] += change
+
+
+PARSE_POOL = ParsePool()
+atexit.register(PARSE_POOL.shutdown)
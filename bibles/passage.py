@@ -14,6 +14,13 @@ class PassageNotFound(Exception):
         return f"Passage not found {self.__verse}"
 
 
+class PassageFailedRecently(PassageNotFound):
+    """
+    Thrown instead of fetching a passage again soon after its fetch failed (see
+    Bible._single_flight), so it may well be found once the failure has expired
+    """
+
+
 class PassageInvalid(Exception):
     """
     Exception to be thrown whenever a query results in a passage that does not exist
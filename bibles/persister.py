@@ -0,0 +1,181 @@
+"""
+Write-behind persistence of changed caches.
+"""
+import atexit
+import os
+import threading
+import time
+from typing import Any, ContextManager, Dict, FrozenSet, Optional, Tuple
+
+
+# Seconds between flushes of changed caches, and changes that trigger an early flush
+FLUSH_INTERVAL: float = float(os.environ.get("BIBLE_FLUSH_INTERVAL", "30"))
+FLUSH_CHANGES: int = int(os.environ.get("BIBLE_FLUSH_CHANGES", "20"))
+
+
+class WriteBehind:
+    """
+    Collects caches marked dirty and saves them on a background thread: at most every
+    interval seconds, sooner once changes have accumulated, and at interpreter shutdown.
+    Each cache is saved once per flush however many times it was marked. A save that fails is
+    kept for the next flush and reported in stats() and errors.
+    """
+    def __init__(self, interval: float = FLUSH_INTERVAL, changes: int = FLUSH_CHANGES) -> None:
+        """
+        :param interval: Seconds between flushes while there are changes.
+        :param changes: Changes (across all caches) that trigger a flush before the interval.
+        """
+        self.__interval = interval
+        self.__changes = changes
+        self.__condition = threading.Condition()
+        # Path -> (cache, latest data, lock guarding the data, changed books or None for all)
+        self.__dirty: Dict[
+            str, Tuple[Any, dict, Optional[ContextManager], Optional[FrozenSet[str]]]
+        ] = {}
+        self.__change_count: int = 0
+        # Serializes flushes from the background thread and from flush()
+        self.__flush_lock = threading.Lock()
+        self.__thread: Optional[threading.Thread] = None
+        self.__stats: Dict[str, float] = {
+            "flushes": 0, "saves": 0, "failed_saves": 0, "bytes_written": 0,
+            "last_flush_seconds": 0.0, "max_flush_seconds": 0.0, "total_flush_seconds": 0.0
+        }
+        # Path -> why its last save failed, until it is saved
+        self.__errors: Dict[str, str] = {}
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of caches waiting to be saved.
+        """
+        with self.__condition:
+            return len(self.__dirty)
+
+    @property
+    def errors(self) -> Dict[str, str]:
+        """
+        Why the caches that could not be saved failed, by path (and under "write-behind", why
+        the background thread last failed). A cache is dropped from it once a flush saves it.
+        """
+        with self.__flush_lock:
+            return dict(self.__errors)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Flush metrics: flushes made, cache saves made and failed, bytes written, and the
+        duration of the last, longest and all flushes in seconds.
+        :return: The metrics, plus the caches pending.
+        """
+        with self.__flush_lock:
+            stats = dict(self.__stats)
+        stats["pending"] = self.pending
+        return stats
+
+    def mark_dirty(
+            self,
+            cache,
+            data: dict,
+            lock: Optional[ContextManager] = None,
+            books: Optional[FrozenSet[str]] = None,
+            count: bool = True
+    ) -> None:
+        """
+        Records that a cache has changed and should be saved by a coming flush.
+        :param cache: The CompressCache to save with.
+        :param data: The cache's data (the latest marking wins).
+        :param lock: Lock guarding the data against changes, held while it is serialized.
+        :param books: The books that changed, or None for all of them. Markings between
+        flushes add up.
+        :param count: Whether the change counts toward an early flush. Minor changes (i.e. a
+        reordering) pass False to be saved by the interval flush only.
+        :return: None
+        """
+        with self.__condition:
+            self.__add(cache, data, lock, books)
+            if count:
+                self.__change_count += 1
+            if self.__thread is None:
+                self.__thread = threading.Thread(
+                    target=self.__run, name="cache-write-behind", daemon=True
+                )
+                self.__thread.start()
+            self.__condition.notify()
+
+    def flush(self) -> None:
+        """
+        Saves every dirty cache now, on the calling thread.
+        :return: None
+        """
+        with self.__flush_lock:
+            with self.__condition:
+                dirty, self.__dirty = self.__dirty, {}
+                self.__change_count = 0
+            if not dirty:
+                return
+            start = time.perf_counter()
+            for path, (cache, data, lock, books) in dirty.items():
+                try:
+                    self.__stats["bytes_written"] += cache.save(data, lock, books)
+                    self.__stats["saves"] += 1
+                    self.__errors.pop(path, None)
+                except Exception as exc:  # pylint: disable=broad-except
+                    self.__stats["failed_saves"] += 1
+                    self.__errors[path] = f"{type(exc).__name__}: {exc}"
+                    # Try again on the next flush, with newer data if it was marked meanwhile
+                    with self.__condition:
+                        self.__add(*self.__dirty.get(path, (cache, data, lock, books)), books)
+            duration = time.perf_counter() - start
+            self.__stats["flushes"] += 1
+            self.__stats["last_flush_seconds"] = duration
+            self.__stats["max_flush_seconds"] = max(self.__stats["max_flush_seconds"], duration)
+            self.__stats["total_flush_seconds"] += duration
+
+    def __run(self) -> None:
+        """
+        Flushes whenever the interval passes with changes pending, or enough changes pile up.
+        :return: None
+        """
+        while True:
+            try:
+                with self.__condition:
+                    while not self.__dirty:
+                        self.__condition.wait()
+                    self.__condition.wait_for(
+                        lambda: self.__change_count >= self.__changes, self.__interval
+                    )
+                self.flush()
+            except Exception as exc:  # pylint: disable=broad-except
+                # Keep the thread alive, or later changes would silently never be saved
+                with self.__flush_lock:
+                    self.__errors["write-behind"] = f"{type(exc).__name__}: {exc}"
+
+    def __add(
+            self,
+            cache,
+            data: dict,
+            lock: Optional[ContextManager],
+            books: Optional[FrozenSet[str]],
+            also: Optional[FrozenSet[str]] = frozenset()
+    ) -> None:
+        """
+        Records a cache as dirty, adding up the changed books with an earlier marking.
+        Call with the condition held.
+        :param cache: The CompressCache to save with.
+        :param data: The cache's data.
+        :param lock: Lock guarding the data.
+        :param books: The books that changed, or None for all of them.
+        :param also: More books that changed (i.e. those of a failed save), or None for all.
+        :return: None
+        """
+        previous = self.__dirty[cache.path][3] if cache.path in self.__dirty else frozenset()
+        changed = [previous, books, also]
+        self.__dirty[cache.path] = (
+            cache, data, lock,
+            None if None in changed else frozenset().union(*changed)
+        )
+
+
+# Shared by every CompressCache (see CompressCache.save_in_background)
+PERSISTER: WriteBehind = WriteBehind()
+# Save what is still dirty before the interpreter exits
+atexit.register(PERSISTER.flush)
@@ -0,0 +1,165 @@
+"""
+Background prefetching of whole network-backed versions into their caches.
+"""
+import json
+import os
+import threading
+from typing import Dict, Mapping, Optional
+
+from bibles.bible import Bible
+from bibles.breaker import CircuitOpen
+from bibles.canon import CHAPTER_TOTAL, chapter_reference
+from bibles.compresscache import write_json
+from bibles.passage import PassageFailedRecently
+from bibles.persister import PERSISTER
+
+
+# Uncached chapters fetched per second, across every version being prefetched
+RATE: float = float(os.environ.get("BIBLE_PREFETCH_RATE", "0.5"))
+# Where the next chapter ordinal of each version is kept between runs
+PROGRESS_PATH: str = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "json-bibles", "prefetch-progress.json"
+)
+# Chapters between cache saves and progress updates
+SAVE_EVERY: int = 50
+# Seconds waited before retrying a chapter whose host is failing, doubled up to MAX_BACKOFF
+BACKOFF: float = 1.0
+MAX_BACKOFF: float = 60.0
+
+
+class Prefetcher(threading.Thread):
+    """
+    Walks the canon of each version in order, fetching every chapter that is not cached yet.
+    Cached chapters are skipped without waiting, so only fetches count against the rate limit.
+    While a version's host is failing (its circuit is open, or the chapter failed moments ago) the
+    walk backs off and retries the same chapter rather than skipping ahead past it.
+    Progress is saved along with the caches, so a restarted prefetcher resumes where it stopped.
+    """
+    def __init__(
+            self,
+            bibles: Mapping[str, Bible],
+            rate: float = RATE,
+            progress_path: str = PROGRESS_PATH
+    ) -> None:
+        """
+        :param bibles: Versions to prefetch, by name (i.e. {"nkjv": NKJV()}).
+        :param rate: Uncached chapters fetched per second.
+        :param progress_path: JSON file recording the next chapter ordinal of each version.
+        """
+        super().__init__(name="bible-prefetch", daemon=True)
+        self.__bibles = dict(bibles)
+        self.__interval: float = 1 / rate if rate > 0 else 0.0
+        self.__progress_path = progress_path
+        self.__stop_event = threading.Event()
+        self.__lock = threading.Lock()
+        self.__failed: Dict[str, int] = {name: 0 for name in self.__bibles}
+        self.__next: Dict[str, int] = {name: 1 for name in self.__bibles}
+        try:
+            with open(progress_path, "r", encoding="utf-8") as progress_file:
+                saved: Dict[str, int] = json.load(progress_file)
+            for name in self.__next:
+                self.__next[name] = min(max(int(saved.get(name, 1)), 1), CHAPTER_TOTAL + 1)
+        except (FileNotFoundError, ValueError):
+            pass
+
+    @property
+    def progress(self) -> float:
+        """
+        Percentage of the chapters of every version that have been walked.
+        """
+        with self.__lock:
+            walked = sum(ordinal - 1 for ordinal in self.__next.values())
+        return 100.0 * walked / (CHAPTER_TOTAL * len(self.__next)) if self.__next else 100.0
+
+    @property
+    def version_progress(self) -> Dict[str, float]:
+        """
+        Percentage of the chapters walked, by version.
+        """
+        with self.__lock:
+            return {
+                name: 100.0 * (ordinal - 1) / CHAPTER_TOTAL
+                for name, ordinal in self.__next.items()
+            }
+
+    @property
+    def failed(self) -> Dict[str, int]:
+        """
+        Chapters that could not be fetched during this run, by version.
+        They are fetched on demand later, or on a run after reset().
+        """
+        with self.__lock:
+            return dict(self.__failed)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stops prefetching after the current chapter, saving the caches and progress.
+        :param timeout: Seconds to wait for the thread to finish.
+        :return: None
+        """
+        self.__stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def reset(self) -> None:
+        """
+        Restarts every version from Genesis 1 and removes the progress file.
+        Only call this while the prefetcher is not running.
+        :return: None
+        """
+        with self.__lock:
+            self.__next = {name: 1 for name in self.__bibles}
+        if os.path.exists(self.__progress_path):
+            os.remove(self.__progress_path)
+
+    def run(self) -> None:
+        """
+        Prefetches each version in turn until every chapter has been walked or stop() is called.
+        :return: None
+        """
+        for name, bible in self.__bibles.items():
+            while not self.__stop_event.is_set() and self.__next[name] <= CHAPTER_TOTAL:
+                with bible.deferred_saves():
+                    self.__walk(name, bible)
+                self.__save_progress()
+
+    def __walk(self, name: str, bible: Bible) -> None:
+        """
+        Walks up to SAVE_EVERY chapters of a version.
+        :param name: Name of the version.
+        :param bible: The version.
+        :return: None
+        """
+        end = min(self.__next[name] + SAVE_EVERY, CHAPTER_TOTAL + 1)
+        backoff = BACKOFF
+        while self.__next[name] < end and not self.__stop_event.is_set():
+            book, chapter = chapter_reference(self.__next[name])
+            if not bible.is_cached(book, chapter):
+                try:
+                    bible.get_passage(book, chapter)
+                except (CircuitOpen, PassageFailedRecently):
+                    # Wait for the host to recover; wakes early when stopped
+                    self.__stop_event.wait(backoff)
+                    backoff = min(backoff * 2, MAX_BACKOFF)
+                    continue
+                except Exception:  # pylint: disable=broad-except
+                    # Not found, invalid, or an answer that could not be parsed: fetched on
+                    # demand later
+                    with self.__lock:
+                        self.__failed[name] += 1
+                backoff = BACKOFF
+                # Rate limit; wakes early when stopped
+                self.__stop_event.wait(self.__interval)
+            with self.__lock:
+                self.__next[name] += 1
+
+    def __save_progress(self) -> None:
+        """
+        Writes the progress file, replacing it in one step.
+        The caches are flushed first, so the progress never gets ahead of the chapters saved.
+        :return: None
+        """
+        PERSISTER.flush()
+        with self.__lock:
+            data = dict(self.__next)
+        write_json(self.__progress_path, data)
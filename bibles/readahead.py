@@ -0,0 +1,92 @@
+"""
+Speculative background fetching of the chapters around the one just read.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+
+class ReadAhead:
+    """
+    Fetches the next (and optionally the previous) chapter of a network-backed version in the
+    background, so that the reader's next page is a cache hit.
+    Each chapter is fetched at most once at a time, and queued fetches of chapters the reader
+    has moved away from are cancelled.
+    """
+    # Marks the worker threads, so their own get_passage calls do not read further ahead
+    __local = threading.local()
+
+    def __init__(self, bible, previous: bool = False, max_workers: int = 2) -> None:
+        """
+        :param bible: The version to read ahead in (see Bible.enable_read_ahead).
+        :param previous: Also fetch the previous chapter.
+        :param max_workers: Chapters fetched at once.
+        """
+        self.__bible = bible
+        self.__previous = previous
+        self.__executor = ThreadPoolExecutor(max_workers, thread_name_prefix="read-ahead")
+        self.__pending: Dict[Tuple[str, int], Future] = {}
+        self.__lock = threading.Lock()
+
+    @property
+    def pending(self) -> List[Tuple[str, int]]:
+        """
+        Chapters queued or being fetched.
+        """
+        with self.__lock:
+            return list(self.__pending)
+
+    def around(self, book: str, chapter: int) -> None:
+        """
+        Starts fetching the uncached chapters around a chapter that was just read.
+        :param book: Book of the chapter read.
+        :param chapter: The chapter read.
+        :return: None
+        """
+        if getattr(ReadAhead.__local, 'active', False):
+            return
+        targets = [self.__bible.next_passage(book, chapter)]
+        if self.__previous:
+            targets.append(self.__bible.previous_passage(book, chapter))
+        wanted = [
+            (target[0], int(target[1])) for target in targets
+            if target is not None and self.__bible.has_passage(target[0], int(target[1]))
+        ]
+        wanted = [ref for ref in wanted if not self.__bible.is_cached(*ref)]
+        with self.__lock:
+            # The reader jumped elsewhere: drop queued fetches that have not started
+            for ref, future in list(self.__pending.items()):
+                if ref not in wanted and future.cancel():
+                    del self.__pending[ref]
+            for ref in wanted:
+                if ref not in self.__pending:
+                    self.__pending[ref] = self.__executor.submit(self.__fetch, ref)
+
+    def shutdown(self) -> None:
+        """
+        Cancels queued fetches and lets running ones finish in the background.
+        :return: None
+        """
+        with self.__lock:
+            for future in self.__pending.values():
+                future.cancel()
+            self.__pending.clear()
+        self.__executor.shutdown(wait=False)
+
+    def __fetch(self, ref: Tuple[str, int]) -> None:
+        """
+        Fetches a chapter into the version's cache. Failures are left for the reader's own
+        request to report.
+        :param ref: (book, chapter) to fetch.
+        :return: None
+        """
+        ReadAhead.__local.active = True
+        try:
+            if not self.__bible.is_cached(*ref):
+                self.__bible.get_passage(*ref)
+        except Exception:  # pylint: disable=broad-except
+            pass
+        finally:
+            ReadAhead.__local.active = False
+            with self.__lock:
+                self.__pending.pop(ref, None)
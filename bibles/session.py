@@ -0,0 +1,158 @@
+"""
+Shared, pooled HTTP session for the versions fetched over the network.
+Connections are kept alive and reused across versions and threads, so a cache miss does not pay
+for a fresh TCP and TLS handshake.
+"""
+import os
+import threading
+import time
+from typing import Dict, FrozenSet, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from bibles.breaker import breaker_for
+
+
+# Connections kept open per host, and retries of failed or throttled requests
+POOL_SIZE: int = int(os.environ.get("BIBLE_HTTP_POOL_SIZE", "10"))
+RETRIES: int = int(os.environ.get("BIBLE_HTTP_RETRIES", "3"))
+# Seconds to wait for a connection, and for a response
+CONNECT_TIMEOUT: int = 5
+TIMEOUT: int = 20
+# Seconds before the first retry, doubled before each one after it
+BACKOFF: float = 0.5
+# Statuses that count as the host failing (see bibles.breaker)
+FAILURE_STATUSES: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+
+_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+_pool_size: int = POOL_SIZE
+_retries: int = RETRIES
+
+
+def _make_session(pool_size: int) -> requests.Session:
+    """
+    Makes a session with a connection pool for http and https. It does not retry by itself:
+    get does, so that the host's circuit breaker sees every attempt.
+    :param pool_size: Connections kept open per host.
+    :return: The session.
+    """
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Gets the shared session, making it on first use.
+    :return: The shared session.
+    """
+    global _session  # pylint: disable=global-statement
+    with _lock:
+        if _session is None:
+            _session = _make_session(POOL_SIZE)
+        return _session
+
+
+def configure(pool_size: int = POOL_SIZE, retries: int = RETRIES) -> requests.Session:
+    """
+    Replaces the shared session with one of the given pool size and retry count.
+    Connections of the previous session are closed.
+    :param pool_size: Connections kept open per host.
+    :param retries: Retries of a request that failed to connect or got a 429 or 5xx status.
+    :return: The new shared session.
+    """
+    global _session, _pool_size, _retries  # pylint: disable=global-statement
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = _make_session(pool_size)
+        _pool_size = pool_size
+        _retries = retries
+        return _session
+
+
+def pool_size() -> int:
+    """
+    Connections the shared session keeps open per host (see configure).
+    :return: The pool size.
+    """
+    with _lock:
+        return _pool_size
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """
+    Sends a GET request through the shared session, with the default timeouts.
+    Requests that failed to connect or got a 429 or 5xx status are retried with backoff. A read
+    timeout is not: the host accepted the request and stalled, and waiting on it again would hold
+    the caller for several timeouts.
+    The host's circuit breaker is checked before every attempt and told its outcome.
+    :param url: URL to get.
+    :param kwargs: Keyword arguments for requests (i.e. headers).
+    :return: The response, which is the last one if every attempt got a failure status.
+    :raises: bibles.breaker.CircuitOpen if the host has been failing, or whatever requests
+    raised.
+    """
+    kwargs.setdefault('timeout', (CONNECT_TIMEOUT, TIMEOUT))
+    breaker = breaker_for(url)
+    retries = max(_retries, 0)
+    for attempt in range(retries + 1):
+        if attempt > 0:
+            time.sleep(BACKOFF * 2 ** (attempt - 1))
+        breaker.before()
+        try:
+            response = get_session().get(url, **kwargs)
+        except requests.ConnectionError:
+            # Includes connect timeouts, but not read timeouts
+            breaker.failure()
+            if attempt < retries:
+                continue
+            raise
+        except requests.RequestException:
+            breaker.failure()
+            raise
+        except BaseException:
+            # Anything else still settles the attempt, so a probe never leaves the circuit
+            # half-open
+            breaker.failure()
+            raise
+        if response.status_code not in FAILURE_STATUSES:
+            breaker.success()
+            return response
+        breaker.failure()
+        if attempt < retries:
+            response.close()
+    # Hand the last response back so that raise_for_status() raises HTTPError as before
+    return response
+
+
+def pool_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Connection pool statistics of the shared session, by host.
+    :return: host -> {"connections": connections opened, "requests": requests sent,
+    "idle": connections open and waiting for reuse}
+    """
+    with _lock:
+        session = _session
+    if session is None:
+        return {}
+    stats: Dict[str, Dict[str, int]] = {}
+    for adapter in {id(adapter): adapter for adapter in session.adapters.values()}.values():
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            stats[f"{key.key_scheme}://{key.key_host}:{key.key_port}"] = {
+                "connections": pool.num_connections,
+                "requests": pool.num_requests,
+                # The pool queue is padded with None for connections not opened yet
+                "idle": sum(
+                    connection is not None for connection in list(pool.pool.queue)
+                ) if pool.pool is not None else 0
+            }
+    return stats
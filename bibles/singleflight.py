@@ -0,0 +1,78 @@
+"""
+Coalescing of concurrent calls for the same key into one call.
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    """
+    A call in flight and its outcome.
+    """
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time. Callers that arrive while a call for their key is
+    in flight wait for it and share its result (or its exception) instead of making their own.
+    """
+    def __init__(self) -> None:
+        self.__lock = threading.Lock()
+        self.__calls: Dict[Hashable, _Call] = {}
+        self.__shared: int = 0
+
+    @property
+    def in_flight(self) -> int:
+        """
+        Number of keys with a call in flight.
+        """
+        with self.__lock:
+            return len(self.__calls)
+
+    @property
+    def shared(self) -> int:
+        """
+        Number of callers so far that waited for another caller's call instead of making one.
+        """
+        return self.__shared
+
+    def do(self, key: Hashable, function: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Calls a function, unless a call for the same key is already in flight, in which case
+        that call's outcome is waited for and shared.
+        :param key: Key identifying the work (i.e. (book, chapter)).
+        :param function: The function to call.
+        :param args: Positional arguments for the function.
+        :param kwargs: Keyword arguments for the function.
+        :return: The function's result.
+        :raises: Whatever the function raised.
+        """
+        with self.__lock:
+            call = self.__calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.__calls[key] = _Call()
+            else:
+                self.__shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function(*args, **kwargs)
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self.__lock:
+                del self.__calls[key]
+            call.done.set()
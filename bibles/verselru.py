@@ -0,0 +1,166 @@
+"""
+Least-recently-read tracking of cached chapters, bounded by their total verse count.
+"""
+import json
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+from bibles.compresscache import write_json
+from bibles.persister import PERSISTER
+
+
+Chapter = Tuple[str, str]
+
+
+class VerseLRU:
+    """
+    Orders cached chapters from least to most recently read and keeps a running total of their
+    verses, so that keeping a cache under a verse limit costs a few dictionary operations
+    instead of a count over the whole canon.
+    The order is saved to a small JSON file by the write-behind persister, so recency
+    survives restarts. Reads only reorder chapters, so they are saved with the next interval
+    flush rather than counting toward an early one.
+    """
+    def __init__(self, limit: int, path: Optional[str] = None) -> None:
+        """
+        :param limit: Most verses the chapters tracked may hold between them.
+        :param path: JSON file the order is kept in, or None to keep it in memory only.
+        """
+        self.__limit = limit
+        self.__path = path
+        self.__lock = threading.Lock()
+        # (book, chapter) -> verses, least recently read first
+        self.__chapters: OrderedDict = OrderedDict()
+        self.__total: int = 0
+
+    @property
+    def path(self) -> Optional[str]:
+        """
+        File the order is kept in.
+        """
+        return self.__path
+
+    @property
+    def limit(self) -> int:
+        """
+        Most verses the chapters tracked may hold between them.
+        """
+        return self.__limit
+
+    @property
+    def total(self) -> int:
+        """
+        Verses held by the chapters tracked.
+        """
+        with self.__lock:
+            return self.__total
+
+    def __len__(self) -> int:
+        with self.__lock:
+            return len(self.__chapters)
+
+    def __contains__(self, chapter: Chapter) -> bool:
+        with self.__lock:
+            return chapter in self.__chapters
+
+    def order(self) -> List[Chapter]:
+        """
+        The chapters tracked.
+        :return: (book, chapter) of each, least recently read first.
+        """
+        with self.__lock:
+            return list(self.__chapters)
+
+    def load_order(self) -> List[Chapter]:
+        """
+        Reads the order saved by a previous run.
+        :return: (book, chapter) of each chapter saved, least recently read first, or an empty
+        list if there is no (readable) file.
+        """
+        if self.__path is None:
+            return []
+        try:
+            with open(self.__path, "r", encoding="utf-8") as order_file:
+                return [(str(book), str(chapter)) for book, chapter in json.load(order_file)]
+        except (FileNotFoundError, ValueError, TypeError):
+            return []
+
+    def touch(self, chapter: Chapter) -> None:
+        """
+        Marks a tracked chapter as just read.
+        :param chapter: (book, chapter) read.
+        :return: None
+        """
+        with self.__lock:
+            if chapter not in self.__chapters:
+                return
+            self.__chapters.move_to_end(chapter)
+        self.__mark_dirty(count=False)
+
+    def add(self, chapter: Chapter, verses: int) -> List[Chapter]:
+        """
+        Tracks a chapter as just read, evicting the least recently read chapters until the
+        total fits the limit again.
+        :param chapter: (book, chapter) cached.
+        :param verses: Verses the chapter holds.
+        :return: The chapters evicted, for the caller to drop from its cache. A chapter with
+        more verses than the limit on its own is evicted straight away.
+        """
+        with self.__lock:
+            evicted = self.__add(chapter, verses)
+        self.__mark_dirty()
+        return evicted
+
+    def add_all(self, chapters: Iterable[Tuple[Chapter, int]]) -> List[Chapter]:
+        """
+        Tracks chapters in order, least recently read first (i.e. when loading a cache).
+        Seeding only restates what is cached, so the order is queued once and does not count
+        toward an early flush.
+        :param chapters: ((book, chapter), verses) of each chapter.
+        :return: The chapters evicted.
+        """
+        evicted: List[Chapter] = []
+        with self.__lock:
+            for chapter, verses in chapters:
+                evicted.extend(self.__add(chapter, verses))
+        self.__mark_dirty(count=False)
+        return evicted
+
+    def save(self, data=None, lock=None, books=None) -> int:  # pylint: disable=unused-argument
+        """
+        Writes the order to the file, replacing it in one step. Has the signature of
+        CompressCache.save so that the write-behind persister can save it.
+        :return: Bytes written.
+        """
+        if self.__path is None:
+            return 0
+        with self.__lock:
+            order = [list(chapter) for chapter in self.__chapters]
+        return write_json(self.__path, order)
+
+    def __add(self, chapter: Chapter, verses: int) -> List[Chapter]:
+        """
+        Tracks a chapter as just read and evicts down to the limit. Call with the lock held.
+        :param chapter: (book, chapter) cached.
+        :param verses: Verses the chapter holds.
+        :return: The chapters evicted.
+        """
+        evicted: List[Chapter] = []
+        self.__total -= self.__chapters.pop(chapter, 0)
+        self.__chapters[chapter] = verses
+        self.__total += verses
+        while self.__total > self.__limit:
+            oldest, size = self.__chapters.popitem(last=False)
+            self.__total -= size
+            evicted.append(oldest)
+        return evicted
+
+    def __mark_dirty(self, count: bool = True) -> None:
+        """
+        Queues the order to be saved by the write-behind persister.
+        :param count: Whether the change counts toward an early flush (see WriteBehind).
+        :return: None
+        """
+        if self.__path is not None:
+            PERSISTER.mark_dirty(self, None, count=count)
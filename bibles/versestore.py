@@ -0,0 +1,217 @@
+"""
+Compact, offset-indexed verse storage, held in memory or memory mapped from a file.
+"""
+import json
+import mmap
+import re
+import struct
+import sys
+from array import array
+from typing import Dict, List, Tuple, Union
+
+
+# Verse store layout:
+#   magic (4 bytes) | format version (1 byte) | header length (uint32, big endian) |
+#   header JSON | padding to 4 bytes | verse offsets (uint32 * (verses + 1)) |
+#   verse numbers (uint16 * verses) | padding to 4 bytes | UTF-8 verse text
+# The arrays are little endian. Verse text is stored without its leading verse number.
+STORE_MAGIC: bytes = b"VSTR"
+STORE_VERSION: int = 1
+_PREAMBLE = struct.Struct(">4sBI")
+_VERSE_NUMBER = re.compile(r'([1-9]\d{0,4}) ')
+
+
+def _pad(length: int) -> int:
+    """
+    Number of bytes needed to pad the given length to a multiple of 4.
+    :param length: Length so far.
+    :return: Padding byte count.
+    """
+    return -length % 4
+
+
+def split_verse(verse: str) -> Tuple[int, str]:
+    """
+    Splits the leading verse number from a verse.
+    :param verse: Verse in the form "16 For God so loved...".
+    :return: The verse number and the text. Verses without a number get 0 and are kept whole.
+    """
+    match = _VERSE_NUMBER.match(verse)
+    if match is None or int(match.group(1)) > 0xFFFF:
+        return 0, verse
+    return int(match.group(1)), verse[match.end():]
+
+
+def join_verse(number: int, text: str) -> str:
+    """
+    Reverses split_verse.
+    :param number: Verse number, 0 if there was none.
+    :param text: Verse text.
+    :return: The verse as stored in the corpus.
+    """
+    return f"{number} {text}" if number else text
+
+
+def serialize_corpus(data: dict) -> bytes:
+    """
+    Serializes a corpus (book -> chapter -> list of verses) into the verse store layout.
+    :param data: The corpus to serialize.
+    :return: The serialized verse store.
+    """
+    chapters: Dict[str, Dict[str, List[int]]] = {}
+    offsets = array('I', [0])
+    numbers = array('H')
+    text = bytearray()
+    for book, book_chapters in data.items():
+        chapters[book] = {}
+        for chapter, verses in book_chapters.items():
+            chapters[book][chapter] = [len(numbers), len(verses)]
+            for verse in verses:
+                number, verse_text = split_verse(verse)
+                text += verse_text.encode('utf-8')
+                offsets.append(len(text))
+                numbers.append(number)
+    if sys.byteorder != 'little':
+        offsets.byteswap()
+        numbers.byteswap()
+    header = json.dumps(
+        {"verses": len(numbers), "chapters": chapters}, separators=(',', ':')
+    ).encode('utf-8')
+
+    return b"".join((
+        _PREAMBLE.pack(STORE_MAGIC, STORE_VERSION, len(header)),
+        header,
+        b"\0" * _pad(_PREAMBLE.size + len(header)),
+        offsets.tobytes(),
+        numbers.tobytes(),
+        b"\0" * _pad(len(numbers) * numbers.itemsize),
+        text
+    ))
+
+
+def compile_corpus(data: dict, path: str) -> None:
+    """
+    Writes a corpus (book -> chapter -> list of verses) as a verse store file.
+    :param data: The corpus to write.
+    :param path: Path of the file to write.
+    :return: None
+    """
+    with open(path, "wb") as data_file:
+        data_file.write(serialize_corpus(data))
+
+
+class VerseStore:
+    """
+    Read-only verse store: one contiguous text buffer plus verse offset and verse number
+    arrays, indexed by the verse's ordinal within the corpus.
+    Verse text is sliced out of the buffer on demand. When the buffer is a memory mapped file,
+    every process that maps it shares one copy through the OS page cache.
+    """
+    def __init__(self, buffer: Union[bytes, mmap.mmap]) -> None:
+        """
+        :param buffer: A serialized verse store (see serialize_corpus).
+        :raises: ValueError if the buffer is not a verse store.
+        """
+        self.__map = buffer
+        magic, version, header_length = _PREAMBLE.unpack_from(self.__map, 0)
+        if magic != STORE_MAGIC or version != STORE_VERSION:
+            raise ValueError("Not a verse store")
+        header = json.loads(self.__map[_PREAMBLE.size:_PREAMBLE.size + header_length])
+        self.__chapters: Dict[str, Dict[str, List[int]]] = header['chapters']
+        verse_count: int = header['verses']
+
+        position = _PREAMBLE.size + header_length
+        position += _pad(position)
+        view = memoryview(self.__map)
+        if sys.byteorder == 'little':
+            self.__offsets = view[position:position + (verse_count + 1) * 4].cast('I')
+            position += (verse_count + 1) * 4
+            self.__numbers = view[position:position + verse_count * 2].cast('H')
+        else:
+            self.__offsets = array('I')
+            self.__offsets.frombytes(view[position:position + (verse_count + 1) * 4])
+            self.__offsets.byteswap()
+            position += (verse_count + 1) * 4
+            self.__numbers = array('H')
+            self.__numbers.frombytes(view[position:position + verse_count * 2])
+            self.__numbers.byteswap()
+        position += verse_count * 2
+        self.__text_start: int = position + _pad(position)
+        # Verse number -> ordinal, for chapters whose verse numbers are not simply 1 to n
+        self.__irregular: Dict[Tuple[str, str], Dict[int, int]] = {}
+
+    @classmethod
+    def open(cls, path: str) -> 'VerseStore':
+        """
+        Memory maps a verse store file.
+        :param path: Path of a file written by compile_corpus.
+        :return: The verse store.
+        :raises: ValueError if the file is not a verse store.
+        """
+        with open(path, "rb") as data_file:
+            buffer = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return cls(buffer)
+        except ValueError as exc:
+            buffer.close()
+            raise ValueError(f"{path} is not a verse store") from exc
+
+    @classmethod
+    def from_corpus(cls, data: dict) -> 'VerseStore':
+        """
+        Builds an in-memory verse store from a loaded corpus.
+        :param data: The corpus (book -> chapter -> list of verses).
+        :return: The verse store.
+        """
+        return cls(serialize_corpus(data))
+
+    @property
+    def size(self) -> int:
+        """
+        Size of the buffer in bytes.
+        """
+        return len(self.__map)
+
+    def chapter(self, book: str, chapter: str) -> List[str]:
+        """
+        Gets the verses of a chapter.
+        :param book: Name of the book.
+        :param chapter: Chapter number as a string.
+        :return: List of verses in the corpus format ("1 content...").
+        :raises: KeyError if the chapter is not in the store.
+        """
+        first, count = self.__chapters[book][chapter]
+        offsets = self.__offsets
+        numbers = self.__numbers
+        text_start = self.__text_start
+        return [
+            join_verse(
+                numbers[verse],
+                self.__map[text_start + offsets[verse]:text_start + offsets[verse + 1]]
+                .decode('utf-8')
+            ) for verse in range(first, first + count)
+        ]
+
+    def verse(self, book: str, chapter: str, number: int) -> str:
+        """
+        Gets a single verse by its number.
+        :param book: Name of the book.
+        :param chapter: Chapter number as a string.
+        :param number: Verse number.
+        :return: The verse in the corpus format ("16 For God so loved...").
+        :raises: KeyError if the chapter or verse is not in the store.
+        """
+        first, count = self.__chapters[book][chapter]
+        ordinal = first + number - 1
+        if not (0 < number <= count and self.__numbers[ordinal] == number):
+            irregular = self.__irregular.get((book, chapter))
+            if irregular is None:
+                irregular = {}
+                for verse in range(first + count - 1, first - 1, -1):
+                    if self.__numbers[verse]:
+                        irregular[self.__numbers[verse]] = verse
+                self.__irregular[(book, chapter)] = irregular
+            ordinal = irregular[number]
+        start = self.__text_start + self.__offsets[ordinal]
+        end = self.__text_start + self.__offsets[ordinal + 1]
+        return join_verse(number, self.__map[start:end].decode('utf-8'))
@@ -1,8 +1,8 @@
 #!/usr/bin/env ash
 
-# Retrieve any missing Bibles
+# Retrieve any missing Bibles (versions stored as deltas against the KJV are not missing)
 test -f /usr/src/app/bibles/json-bibles/acv.json.pbz2 || wget -O /usr/src/app/bibles/json-bibles/acv.json.pbz2 https://github.com/samhaswon/selfhosted-bible/raw/main/bibles/json-bibles/acv.json.pbz2
-test -f /usr/src/app/bibles/json-bibles/akjv.json.pbz2 || wget -O /usr/src/app/bibles/json-bibles/akjv.json.pbz2 https://github.com/samhaswon/selfhosted-bible/raw/main/bibles/json-bibles/akjv.json.pbz2
+test -f /usr/src/app/bibles/json-bibles/akjv.json.pbz2 || test -f /usr/src/app/bibles/json-bibles/akjv.delta.json.pbz2 || wget -O /usr/src/app/bibles/json-bibles/akjv.json.pbz2 https://github.com/samhaswon/selfhosted-bible/raw/main/bibles/json-bibles/akjv.json.pbz2
 test -f /usr/src/app/bibles/json-bibles/asv.json.pbz2 || wget -O /usr/src/app/bibles/json-bibles/asv.json.pbz2 https://github.com/samhaswon/selfhosted-bible/raw/main/bibles/json-bibles/asv.json.pbz2
 test -f /usr/src/app/bibles/json-bibles/bbe.json.pbz2 || wget -O /usr/src/app/bibles/json-bibles/bbe.json.pbz2 https://github.com/samhaswon/selfhosted-bible/raw/main/bibles/json-bibles/bbe.json.pbz2
 test -f /usr/src/app/bibles/json-bibles/bsb.json.pbz2 || wget -O /usr/src/app/bibles/json-bibles/bsb.json.pbz2 https://github.com/samhaswon/selfhosted-bible/raw/main/bibles/json-bibles/bsb.json.pbz2
@@ -13,10 +13,10 @@ test -f /usr/src/app/bibles/json-bibles/gnv.json.pbz2 || wget -O /usr/src/app/bi
 test -f /usr/src/app/bibles/json-bibles/kjv.json.pbz2 || wget -O /usr/src/app/bibles/json-bibles/kjv.json.pbz2 https://github.com/samhaswon/selfhosted-bible/raw/main/bibles/json-bibles/kjv.json.pbz2
 test -f /usr/src/app/bibles/json-bibles/kjv1611.json.pbz2 || wget -O /usr/src/app/bibles/json-bibles/kjv1611.json.pbz2 https://github.com/samhaswon/selfhosted-bible/raw/main/bibles/json-bibles/kjv1611.json.pbz2
 test -f /usr/src/app/bibles/json-bibles/lsv.json.pbz2 || wget -O /usr/src/app/bibles/json-bibles/lsv.json.pbz2 https://github.com/samhaswon/selfhosted-bible/raw/main/bibles/json-bibles/lsv.json.pbz2
-test -f /usr/src/app/bibles/json-bibles/rnkjv.json.pbz2 || wget -O /usr/src/app/bibles/json-bibles/rnkjv.json.pbz2 https://github.com/samhaswon/selfhosted-bible/raw/main/bibles/json-bibles/rnkjv.json.pbz2
+test -f /usr/src/app/bibles/json-bibles/rnkjv.json.pbz2 || test -f /usr/src/app/bibles/json-bibles/rnkjv.delta.json.pbz2 || wget -O /usr/src/app/bibles/json-bibles/rnkjv.json.pbz2 https://github.com/samhaswon/selfhosted-bible/raw/main/bibles/json-bibles/rnkjv.json.pbz2
 test -f /usr/src/app/bibles/json-bibles/rv2004.json.pbz2 || wget -O /usr/src/app/bibles/json-bibles/rv2004.json.pbz2 https://github.com/samhaswon/selfhosted-bible/raw/main/bibles/json-bibles/rv2004.json.pbz2
-test -f /usr/src/app/bibles/json-bibles/rwv.json.pbz2 || wget -O /usr/src/app/bibles/json-bibles/rwv.json.pbz2 https://github.com/samhaswon/selfhosted-bible/raw/main/bibles/json-bibles/rwv.json.pbz2
-test -f /usr/src/app/bibles/json-bibles/ukjv.json.pbz2 || wget -O /usr/src/app/bibles/json-bibles/ukjv.json.pbz2 https://github.com/samhaswon/selfhosted-bible/raw/main/bibles/json-bibles/ukjv.json.pbz2
+test -f /usr/src/app/bibles/json-bibles/rwv.json.pbz2 || test -f /usr/src/app/bibles/json-bibles/rwv.delta.json.pbz2 || wget -O /usr/src/app/bibles/json-bibles/rwv.json.pbz2 https://github.com/samhaswon/selfhosted-bible/raw/main/bibles/json-bibles/rwv.json.pbz2
+test -f /usr/src/app/bibles/json-bibles/ukjv.json.pbz2 || test -f /usr/src/app/bibles/json-bibles/ukjv.delta.json.pbz2 || wget -O /usr/src/app/bibles/json-bibles/ukjv.json.pbz2 https://github.com/samhaswon/selfhosted-bible/raw/main/bibles/json-bibles/ukjv.json.pbz2
 test -f /usr/src/app/bibles/json-bibles/web.json.pbz2 || wget -O /usr/src/app/bibles/json-bibles/web.json.pbz2 https://github.com/samhaswon/selfhosted-bible/raw/main/bibles/json-bibles/web.json.pbz2
 test -f /usr/src/app/bibles/json-bibles/ylt.json.pbz2 || wget -O /usr/src/app/bibles/json-bibles/ylt.json.pbz2 https://github.com/samhaswon/selfhosted-bible/raw/main/bibles/json-bibles/ylt.json.pbz2
 
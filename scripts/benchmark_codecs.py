@@ -0,0 +1,54 @@
+"""
+Benchmarks every installed codec against every Bible in bibles/json-bibles.
+Reports the compressed size, compression time and decompression time of each.
+Usage: python benchmark_codecs.py [repetitions]
+To switch a version to another codec afterwards:
+    CompressCache(name, codec='zstd').save(CompressCache(name).load())
+"""
+import glob
+import json
+import os
+import sys
+import time
+from bibles.codec import CODECS, detect_codec
+
+if __name__ == '__main__':
+    JSON_BIBLES = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bibles", "json-bibles"
+    )
+    REPETITIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    totals = {name: [0, 0.0, 0.0] for name in CODECS}
+
+    print(
+        f"{'file':<24}{'codec':<8}{'bytes':>12}{'ratio':>8}{'compress s':>12}{'decompress s':>14}"
+    )
+    for path in sorted(glob.glob(os.path.join(JSON_BIBLES, "*.json.pbz2"))):
+        with open(path, "rb") as data_file:
+            compressed = data_file.read()
+        raw = detect_codec(compressed, path).decompress(compressed)
+        # Normalize to how CompressCache writes the JSON
+        raw = json.dumps(json.loads(raw), separators=(',', ':')).encode('utf-8')
+
+        for name, codec in CODECS.items():
+            start = time.perf_counter()
+            for _ in range(REPETITIONS):
+                compressed = codec.compress(raw)
+            compress_time = (time.perf_counter() - start) / REPETITIONS
+
+            start = time.perf_counter()
+            for _ in range(REPETITIONS):
+                if codec.decompress(compressed) != raw:
+                    raise ValueError(f"{name} did not round trip {path}")
+            decompress_time = (time.perf_counter() - start) / REPETITIONS
+
+            totals[name][0] += len(compressed)
+            totals[name][1] += compress_time
+            totals[name][2] += decompress_time
+            print(
+                f"{os.path.basename(path):<24}{name:<8}{len(compressed):>12}"
+                f"{len(compressed) / len(raw):>8.3f}{compress_time:>12.4f}{decompress_time:>14.4f}"
+            )
+
+    print("\nTotals")
+    for name, (size, compress_time, decompress_time) in totals.items():
+        print(f"{name:<8}{size:>12}{compress_time:>12.3f}{decompress_time:>14.3f}")
@@ -0,0 +1,47 @@
+"""
+Benchmarks the ESV page parsers against saved esv.org pages, without network access.
+Reports the time per page and throughput of the one pass parser (ESV.parse) and of the
+BeautifulSoup tree walk it replaced (ESV.parse_soup), and checks they agree.
+Usage: python benchmark_esv_parse.py [repetitions] [page.html ...]
+With no pages given, the pages in tests/fixtures/esv are used.
+"""
+import glob
+import os
+import sys
+import time
+from bibles.esv import ESV
+
+if __name__ == '__main__':
+    FIXTURES = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "fixtures", "esv"
+    )
+    REPETITIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    pages = sys.argv[2:] or sorted(glob.glob(os.path.join(FIXTURES, "*.html")))
+    parsers = {"parse": ESV.parse, "parse_soup": ESV.parse_soup}
+    totals = {name: 0.0 for name in parsers}
+    total_bytes = 0
+
+    print(f"{'page':<28}{'bytes':>10}" + "".join(f"{name + ' ms':>16}" for name in parsers))
+    for path in pages:
+        with open(path, "r", encoding="utf-8") as page_file:
+            content = page_file.read()
+        if ESV.parse(content) != ESV.parse_soup(content):
+            raise ValueError(f"The parsers disagree on {path}")
+        total_bytes += len(content.encode('utf-8'))
+        row = f"{os.path.basename(path):<28}{len(content.encode('utf-8')):>10}"
+        for name, parse in parsers.items():
+            start = time.perf_counter()
+            for _ in range(REPETITIONS):
+                parse(content)
+            duration = (time.perf_counter() - start) / REPETITIONS
+            totals[name] += duration
+            row += f"{duration * 1000:>16.3f}"
+        print(row)
+
+    print("\nTotals")
+    for name, duration in totals.items():
+        print(
+            f"{name:<12}{duration * 1000:>10.3f} ms/pass{len(pages) / duration:>10.1f} pages/s"
+            f"{total_bytes / duration / 1e6:>8.2f} MB/s"
+        )
+    print(f"parse is {totals['parse_soup'] / totals['parse']:.2f}x parse_soup")
@@ -0,0 +1,90 @@
+"""
+Benchmarks how parsing fetched pages affects reads of a local version, without network access.
+Threads parse the saved esv.org pages and CSB books in a loop, as cold network chapters would,
+while another thread reads cached KJV chapters at a steady rate and records each read's latency.
+This is run with the parses on the parsing threads and then in a ParsePool of worker processes.
+Usage: python benchmark_parse_pool.py [seconds] [parsing threads] [workers]
+"""
+import glob
+import os
+import statistics
+import sys
+import threading
+import time
+from bibles.csbparser import CSBBookParser
+from bibles.esv import ESV
+from bibles.kjv import KJV
+from bibles.parsepool import ParsePool
+
+# Seconds between reads
+INTERVAL: float = 0.005
+
+
+def parse_book(pool: ParsePool, raw: bytes) -> None:
+    """
+    Parses a CSB book as CSB does, converting its chapters in the pool if it has workers.
+    """
+    parser = CSBBookParser(lambda *chapter: None, pool.run if pool.workers > 0 else None)
+    parser.feed(raw)
+    parser.close()
+
+
+def measure(pool: ParsePool, pages: list, books: list, seconds: float, threads: int) -> list:
+    """
+    Reads KJV chapters while the threads parse pages and books through the pool.
+    :return: The latency of each read in milliseconds.
+    """
+    kjv = KJV()
+    stop = threading.Event()
+
+    def parse_pages() -> None:
+        while not stop.is_set():
+            for page in pages:
+                pool.run(ESV.parse, page)
+            for book in books:
+                parse_book(pool, book)
+
+    parsers = [threading.Thread(target=parse_pages) for _ in range(threads)]
+    for parser in parsers:
+        parser.start()
+    latencies = []
+    begin = time.perf_counter()
+    for chapter in range(int(seconds / INTERVAL)):
+        # A read arrives every INTERVAL seconds, as requests would, and its latency counts from
+        # then, so that waiting for the GIL is included
+        arrival = begin + chapter * INTERVAL
+        time.sleep(max(arrival - time.perf_counter(), 0))
+        kjv.get_passage("Psalms", chapter % 150 + 1)
+        latencies.append((time.perf_counter() - arrival) * 1000)
+    stop.set()
+    for parser in parsers:
+        parser.join()
+    return latencies
+
+
+if __name__ == '__main__':
+    FIXTURES = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "fixtures"
+    )
+    SECONDS = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    THREADS = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    WORKERS = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    PAGES = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "esv", "*.html"))):
+        with open(path, "r", encoding="utf-8") as page_file:
+            PAGES.append(page_file.read())
+    BOOKS = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "csb", "*.xml"))):
+        with open(path, "rb") as book_file:
+            BOOKS.append(book_file.read())
+
+    print(f"{'parsing':<24}{'reads':>8}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, pool in (("on threads", ParsePool(workers=0)),
+                       (f"{WORKERS} worker processes", ParsePool(workers=WORKERS))):
+        pool.warm()
+        times = sorted(measure(pool, PAGES, BOOKS, SECONDS, THREADS))
+        pool.shutdown()
+        print(
+            f"{name:<24}{len(times):>8}{statistics.median(times):>10.3f}"
+            f"{times[int(len(times) * 0.99)]:>10.3f}{times[-1]:>10.3f}"
+        )
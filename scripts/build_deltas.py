@@ -0,0 +1,32 @@
+"""
+Stores derivative versions as deltas against their base version and verifies the round trip.
+Usage: python build_deltas.py [--remove]
+With --remove, the full files of the derived versions are deleted once their delta verifies.
+"""
+import os
+import sys
+from bibles.compresscache import CompressCache
+
+if __name__ == '__main__':
+    # Derived version: base version
+    BASES = {
+        'akjv': 'kjv',
+        'ukjv': 'kjv',
+        'rnkjv': 'kjv',
+        'rwv': 'kjv',
+    }
+    REMOVE = "--remove" in sys.argv[1:]
+
+    for derived_name, base_name in BASES.items():
+        compress_cache = CompressCache(derived_name)
+        derived = compress_cache.load(dedup=False)
+        compress_cache.save_delta(derived, base_name)
+
+        if CompressCache(derived_name).load_delta() != derived:
+            raise ValueError(f"{derived_name} did not round trip against {base_name}")
+        print(
+            f"{derived_name} (base {base_name}): {os.path.getsize(compress_cache.path)} -> "
+            f"{os.path.getsize(compress_cache.delta_path)} bytes"
+        )
+        if REMOVE:
+            os.remove(compress_cache.path)
@@ -0,0 +1,33 @@
+"""
+Compiles Bibles into uncompressed, memory mappable verse stores (*.verses).
+Local versions map these instead of loading their compressed corpus, so several worker
+processes share one copy of each version through the OS page cache.
+Usage: python compile_verses.py [version ...]
+With no versions given, every *.json.pbz2 file in bibles/json-bibles is compiled.
+"""
+import glob
+import os
+import sys
+from bibles.compresscache import CompressCache
+from bibles.versestore import VerseStore, compile_corpus
+
+if __name__ == '__main__':
+    JSON_BIBLES = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bibles", "json-bibles"
+    )
+    versions = sys.argv[1:] or sorted(
+        os.path.basename(path)[:-len(".json.pbz2")]
+        for path in glob.glob(os.path.join(JSON_BIBLES, "*.json.pbz2"))
+    )
+    for version in versions:
+        compress_cache = CompressCache(version)
+        bible = compress_cache.load()
+        compile_corpus(bible, compress_cache.store_path)
+
+        # Verify the round trip before reporting success
+        store = VerseStore.open(compress_cache.store_path)
+        for book, chapters in bible.items():
+            for chapter, content in chapters.items():
+                if store.chapter(book, chapter) != content:
+                    raise ValueError(f"{version}: {book} {chapter} did not round trip")
+        print(f"{version}: {os.path.getsize(compress_cache.store_path)} bytes")
@@ -0,0 +1,33 @@
+"""
+Converts the single stream *.json.pbz2 Bibles into the chapter-indexed (*.json.cidx) format.
+Usage: python convert_indexed.py [version ...]
+With no versions given, every *.json.pbz2 file in bibles/json-bibles is converted.
+"""
+import glob
+import os
+import sys
+from bibles.compresscache import CompressCache
+
+if __name__ == '__main__':
+    JSON_BIBLES = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bibles", "json-bibles"
+    )
+    versions = sys.argv[1:] or sorted(
+        os.path.basename(path)[:-len(".json.pbz2")]
+        for path in glob.glob(os.path.join(JSON_BIBLES, "*.json.pbz2"))
+    )
+    for version in versions:
+        compress_cache = CompressCache(version)
+        bible = compress_cache.load()
+        compress_cache.save_indexed(bible)
+
+        # Verify the round trip before reporting success
+        check_cache = CompressCache(version)
+        for book, chapters in bible.items():
+            for chapter, content in chapters.items():
+                if check_cache.load_chapter(book, chapter) != content:
+                    raise ValueError(f"{version}: {book} {chapter} did not round trip")
+        print(
+            f"{version}: {os.path.getsize(compress_cache.path)} -> "
+            f"{os.path.getsize(compress_cache.indexed_path)} bytes"
+        )
@@ -0,0 +1,21 @@
+"""
+Converts network version caches into sharded caches, one compressed file per book plus a manifest.
+Usage: python convert_sharded.py version [version ...]
+Shards of single books can then be copied between instances; missing shards are fetched again.
+"""
+import os
+import sys
+from bibles.compresscache import CompressCache
+
+if __name__ == '__main__':
+    for version in sys.argv[1:]:
+        compress_cache = CompressCache(version)
+        bible = compress_cache.load()
+        sharded_cache = CompressCache(version, codec=compress_cache.codec.name, sharded=True)
+        written = sharded_cache.save_sharded(bible)
+
+        # Verify the round trip before removing the single stream file
+        if CompressCache(version).load() != bible:
+            raise ValueError(f"{version} did not round trip")
+        print(f"{version}: {os.path.getsize(compress_cache.path)} -> {written} bytes")
+        os.remove(compress_cache.path)
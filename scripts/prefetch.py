@@ -0,0 +1,40 @@
+"""
+Fills the caches of the network-backed versions in the background, resuming where it left off.
+Usage: python prefetch.py [version ...] [--reset]
+Without versions, every network-backed version except the ESV (whose cache is capped) is
+prefetched. The rate limit comes from BIBLE_PREFETCH_RATE (chapters per second).
+Naming esv warms its capped cache instead, by the esv.org pages that fill the most chapters.
+"""
+import importlib
+import sys
+from bibles.esv import ESV
+from bibles.parsepool import PARSE_POOL
+from bibles.prefetch import Prefetcher
+
+if __name__ == '__main__':
+    # Module and class name of each network-backed version
+    VERSIONS = {
+        'nkjv': 'NKJV', 'nlt': 'NLT', 'amp': 'AMP', 'nasb1995': 'NASB1995',
+        'niv2011': 'NIV2011', 'rsv': 'RSV', 'msg': 'MSG', 'rv1960': 'RV1960', 'btx3': 'BTX3',
+        'net': 'NET', 'niv1984': 'NIV1984', 'csb': 'CSB',
+    }
+    NAMES = [name for name in sys.argv[1:] if not name.startswith("--")] or list(VERSIONS)
+    PARSE_POOL.warm()
+    if 'esv' in NAMES:
+        NAMES.remove('esv')
+        print(f"ESV: {ESV().warm()} pages requested")
+
+    prefetcher = Prefetcher({
+        name: getattr(importlib.import_module(f"bibles.{name}"), VERSIONS[name])()
+        for name in NAMES
+    })
+    if "--reset" in sys.argv[1:]:
+        prefetcher.reset()
+    prefetcher.start()
+    try:
+        while prefetcher.is_alive():
+            prefetcher.join(30)
+            print(f"{prefetcher.progress:.1f}% walked, failed: {prefetcher.failed}")
+    except KeyboardInterrupt:
+        print("Stopping, saving caches and progress...")
+        prefetcher.stop()
@@ -0,0 +1,70 @@
+"""
+Local HTTP server and temporary cache directory shared by the tests
+"""
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Type
+from unittest import TestCase
+from unittest.mock import patch
+from bibles.persister import PERSISTER
+
+
+class QuietHandler(BaseHTTPRequestHandler):
+    """
+    Base of the test handlers. Keeps connections alive and the test output quiet.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def send_body(
+            self, body: bytes, content_type: str = "application/json", status: int = 200
+    ) -> None:
+        """
+        Sends a whole response.
+        :param body: The response body.
+        :param content_type: Its content type.
+        :param status: The response status.
+        :return: None
+        """
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        """
+        Keeps the test output quiet.
+        """
+
+
+def serve(test: TestCase, handler: Type[BaseHTTPRequestHandler]) -> str:
+    """
+    Serves a handler on a free local port until the test ends.
+    :param test: The test.
+    :param handler: The handler class.
+    :return: The server's URL (i.e. http://127.0.0.1:8000), without a trailing slash.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # Cleanups run last in, first out
+    test.addCleanup(server.server_close)
+    test.addCleanup(server.shutdown)
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def use_temp_caches(test: TestCase) -> str:
+    """
+    Keeps the caches a test saves in a temporary directory, removed when the test ends, instead
+    of bibles/json-bibles.
+    :param test: The test.
+    :return: The directory.
+    """
+    directory = tempfile.TemporaryDirectory()
+    test.addCleanup(directory.cleanup)
+    patcher = patch('bibles.compresscache.CACHE_DIR', directory.name)
+    patcher.start()
+    test.addCleanup(patcher.stop)
+    # Saves still waiting on the write-behind persister are made before the directory goes
+    test.addCleanup(PERSISTER.flush)
+    return directory.name
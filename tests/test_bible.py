@@ -1,8 +1,14 @@
 """
 Test the ABC Bible methods
 """
+import contextlib
+import threading
+import time
 from unittest import TestCase
+from unittest.mock import patch
 from bibles.bible import Bible
+from bibles.canon import CHAPTER_TOTAL, chapter_ordinal, chapter_reference
+from bibles.passage import PassageInvalid, PassageNotFound
 
 
 class BibleTest(Bible):
@@ -15,6 +21,71 @@ class BibleTest(Bible):
         """
 
 
+class HeadingBibleTest(Bible):
+    """
+    Test class with heading-grouped chapters, like the ESV and CSB.
+    """
+    def get_passage(self, book, chapter) -> dict:
+        """
+        Every chapter has two headings; the first verse of the second heading continues
+        over an unnumbered line.
+        """
+        return {
+            'book': book,
+            'chapter': chapter,
+            'verses': {
+                'First': ["1 One", "2 Two"],
+                'Second': ["3 Three", "continued", "4 Four"]
+            }
+        }
+
+
+class FetchingBibleTest(Bible):
+    """
+    Test class that "fetches" chapters missing from its cache, like the network versions.
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        self.cache = {("Genesis", 1): ["1 Cached"]}
+        self.fetched = []
+        self.saves = 0
+        self.lock = threading.Lock()
+        # Holds read-ahead fetches until set; waiting is set once one is held
+        self.gate = threading.Event()
+        self.gate.set()
+        self.waiting = threading.Event()
+
+    def get_passage(self, book, chapter) -> dict:
+        """
+        Fetches and caches chapters that are not cached yet.
+        """
+        if not self.has_passage(book, chapter):
+            raise PassageInvalid(f"{book} {chapter}")
+        if (book, chapter) not in self.cache:
+            if threading.current_thread().name.startswith("read-ahead"):
+                self.waiting.set()
+                self.gate.wait(10)
+            with self.lock:
+                self.fetched.append((book, chapter))
+            self.cache[(book, chapter)] = [f"1 Fetched {book} {chapter}"]
+        self._read_ahead(book, chapter)
+        return {'book': book, 'chapter': chapter, 'verses': {'none': self.cache[(book, chapter)]}}
+
+    def is_cached(self, book, chapter) -> bool:
+        """
+        Whether a chapter is cached.
+        """
+        return (book, chapter) in self.cache
+
+    @contextlib.contextmanager
+    def deferred_saves(self):
+        """
+        Counts the saves made at the end of a batch.
+        """
+        yield
+        self.saves += 1
+
+
 class TestBible(TestCase):
     """
     Test the ABC Bible methods
@@ -38,3 +109,111 @@ class TestBible(TestCase):
         """Make sure that has passage does things right"""
         self.assertTrue(self.bible.has_passage("Genesis", 50))
         self.assertFalse(self.bible.has_passage("Genesis", 51))
+
+    def test_canon(self):
+        """Make sure the shared canon table and chapter ordinals line up"""
+        self.assertEqual(1189, CHAPTER_TOTAL)
+        self.assertEqual(1, chapter_ordinal("Genesis", 1))
+        self.assertEqual(1189, chapter_ordinal("Revelation", "22"))
+        self.assertIsNone(chapter_ordinal("Genesis", 51))
+        self.assertEqual(("John", 3), chapter_reference(chapter_ordinal("John", 3)))
+        self.assertIs(self.bible.books, BibleTest().books)
+        self.assertEqual(66, len(self.bible.books_of_the_bible))
+
+    def test_get_verse(self):
+        """Make sure verses are found by number across headings"""
+        bible = HeadingBibleTest()
+        self.assertEqual("2 Two", bible.get_verse("John", 3, 2))
+        self.assertEqual("4 Four", bible.get_verse("John", 3, 4))
+        self.assertRaises(PassageNotFound, bible.get_verse, "John", 3, 5)
+
+    def test_get_range(self):
+        """Make sure ranges cross chapter and book boundaries and keep headings"""
+        bible = HeadingBibleTest()
+        passages = bible.get_range(("Genesis", 1, 2), ("Genesis", 2, 3))
+        self.assertEqual([("Genesis", 1), ("Genesis", 2)],
+                         [(passage['book'], passage['chapter']) for passage in passages])
+        self.assertEqual({'First': ["2 Two"], 'Second': ["3 Three", "continued", "4 Four"]},
+                         passages[0]['verses'])
+        self.assertEqual({'First': ["1 One", "2 Two"], 'Second': ["3 Three"]},
+                         passages[1]['verses'])
+        passages = bible.get_range(("Malachi", 4, 4), ("Matthew", 1))
+        self.assertEqual(["Malachi", "Matthew"], [passage['book'] for passage in passages])
+        self.assertEqual({'Second': ["4 Four"]}, passages[0]['verses'])
+        self.assertRaises(PassageInvalid, bible.get_range, ("John", 3, 4), ("John", 3, 2))
+        self.assertRaises(PassageInvalid, bible.get_range, ("John", 3), ("John", 2))
+
+    def test_get_passages(self):
+        """Make sure batches keep their order, fetch each miss once and save once"""
+        bible = FetchingBibleTest()
+        refs = [("Genesis", 1), ("John", "3"), ("Jude", 1), ("John", 3)]
+        passages = bible.get_passages(refs)
+        self.assertEqual([("Genesis", 1), ("John", 3), ("Jude", 1), ("John", 3)],
+                         [(passage['book'], passage['chapter']) for passage in passages])
+        self.assertEqual({'none': ["1 Cached"]}, passages[0]['verses'])
+        self.assertEqual(["1 Fetched John 3"], passages[1]['verses']['none'])
+        self.assertEqual([("John", 3), ("Jude", 1)], sorted(bible.fetched))
+        self.assertEqual(1, bible.saves)
+        bible.get_passages([("Genesis", 1), ("Jude", 1)])
+        self.assertEqual(1, bible.saves)
+        self.assertRaises(PassageInvalid, bible.get_passages, [("Genesis", 51)])
+
+    def test_get_passages_first_error(self):
+        """Make sure a batch raises the error of its first failing reference"""
+        bible = FetchingBibleTest()
+        # Invalid chapters count as cached, so only Jude 1 is fetched, and that fails
+        bible.is_cached = lambda book, chapter: (book, chapter) != ("Jude", 1)
+        fetch = bible.get_passage
+
+        def get_passage(book, chapter):
+            if (book, chapter) == ("Jude", 1):
+                raise PassageNotFound("Jude 1")
+            return fetch(book, chapter)
+        bible.get_passage = get_passage
+        self.assertRaises(PassageInvalid, bible.get_passages, [("Genesis", 51), ("Jude", 1)])
+
+    def test_read_ahead(self):
+        """Make sure adjacent chapters are fetched once, without chaining, and dropped on jumps"""
+        bible = FetchingBibleTest()
+        bible.enable_read_ahead(previous=True)
+        bible.get_passage("John", 3)
+        deadline = time.monotonic() + 10
+        while bible.pending_read_ahead() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual([("John", 2), ("John", 3), ("John", 4)], sorted(bible.fetched))
+
+        bible = FetchingBibleTest()
+        bible.gate.clear()
+        bible.enable_read_ahead(max_workers=1)
+        bible.get_passage("John", 1)
+        self.assertTrue(bible.waiting.wait(10))
+        bible.get_passage("Acts", 1)
+        bible.get_passage("Romans", 1)
+        self.assertEqual([("John", 2), ("Romans", 2)], sorted(bible.pending_read_ahead()))
+        bible.gate.set()
+        deadline = time.monotonic() + 10
+        while bible.pending_read_ahead() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertNotIn(("Acts", 2), bible.fetched)
+        self.assertIn(("Romans", 2), bible.fetched)
+        bible.disable_read_ahead()
+
+    def test_negative_cache(self):
+        """Make sure failed fetches fail fast until the TTL passes"""
+        bible = FetchingBibleTest()
+        calls = []
+
+        def fail(book, chapter):
+            calls.append((book, chapter))
+            raise ConnectionError(f"{book} {chapter} is down")
+
+        with patch('bibles.bible.NEGATIVE_TTL', 0.2):
+            self.assertRaises(ConnectionError, bible._single_flight, ("John", 3), fail, "John", 3)
+            self.assertRaises(PassageNotFound, bible._single_flight, ("John", 3), fail, "John", 3)
+            self.assertEqual(1, bible.recent_failures)
+            self.assertEqual(1, len(calls))
+            time.sleep(0.25)
+            self.assertEqual(0, bible.recent_failures)
+            self.assertRaises(ConnectionError, bible._single_flight, ("John", 3), fail, "John", 3)
+            self.assertEqual(2, len(calls))
+        self.assertEqual("ok", bible._single_flight(("John", 4), lambda: "ok"))
@@ -0,0 +1,177 @@
+"""
+Test the bolls.life base class against a local server
+"""
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import patch
+from bibles import session
+from bibles.bollsbible import BollsBible, _fetch_executor, get_passages_many
+from bibles.compresscache import CompressCache
+from tests.support import QuietHandler, serve, use_temp_caches
+
+
+class SampleBolls(BollsBible):
+    """Version backed by the local server"""
+    translation = 'TEST'
+    cache_name = 'test-bolls'
+
+
+class OtherBolls(BollsBible):
+    """Second version backed by the local server"""
+    translation = 'OTHER'
+    cache_name = 'test-bolls-other'
+
+
+class ChapterHandler(QuietHandler):
+    """
+    Serves a bolls.life style chapter for every /get-chapter/<translation>/<book>/<chapter>/ path.
+    """
+    paths = []
+    # Seconds to wait before answering
+    delay = 0.0
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Sends one verse naming the requested translation, book and chapter.
+        """
+        ChapterHandler.paths.append(self.path)
+        time.sleep(ChapterHandler.delay)
+        translation, book, chapter = self.path.strip('/').split('/')[1:]
+        self.send_body(json.dumps(
+            [{"verse": 1, "text": f"<i>{translation}</i> {book}:{chapter}"}]
+        ).encode('utf-8'))
+
+
+class TestBollsBible(TestCase):
+    """
+    Test fetching, caching and batching of bolls.life versions
+    """
+    def setUp(self) -> None:
+        ChapterHandler.paths = []
+        ChapterHandler.delay = 0.0
+        use_temp_caches(self)
+        api_url = patch('bibles.bollsbible.API_URL', f"{serve(self, ChapterHandler)}/get-chapter/")
+        api_url.start()
+        self.addCleanup(api_url.stop)
+
+    def test_get_passage(self):
+        """Make sure a miss is fetched, stripped of tags and then served from the cache"""
+        bible = SampleBolls()
+        self.assertEqual(["1 TEST 43:3"], bible.get_passage("John", 3)['verses']['none'])
+        bible.get_passage("John", 3)
+        self.assertEqual(["/get-chapter/TEST/43/3/"], ChapterHandler.paths)
+
+    def test_partial_shards(self):
+        """Make sure a partial sharded cache loads and only the changed book is rewritten"""
+        CompressCache('test-bolls', sharded=True).save({"Ruth": {"1": ["1 Shipped"]}})
+        bible = SampleBolls()
+        self.assertEqual(["1 Shipped"], bible.get_passage("Ruth", 1)['verses']['none'])
+        self.assertEqual(["1 TEST 8:2"], bible.get_passage("Ruth", 2)['verses']['none'])
+        self.assertEqual(["1 TEST 1:1"], bible.get_passage("Genesis", 1)['verses']['none'])
+        CompressCache.flush()
+        shards = os.listdir(CompressCache('test-bolls').shard_path)
+        self.assertEqual(3, len(shards))
+        self.assertEqual(["1 TEST 8:2"], SampleBolls().get_passage("Ruth", 2)['verses']['none'])
+        self.assertEqual(2, len(ChapterHandler.paths))
+
+    def test_get_passages(self):
+        """Make sure batches fetch each miss once and save the cache once, at the end"""
+        bible = SampleBolls()
+        bible.get_passage("Genesis", 1)
+        passages = bible.get_passages([("Genesis", 1), ("Exodus", 3), ("Jude", "1"), ("Exodus", 3)])
+        self.assertEqual(["1 TEST 1:1", "1 TEST 2:3", "1 TEST 65:1", "1 TEST 2:3"],
+                         [passage['verses']['none'][0] for passage in passages])
+        self.assertEqual(3, len(ChapterHandler.paths))
+        CompressCache.flush()
+        self.assertEqual(["1 TEST 65:1"], SampleBolls().get_passage("Jude", 1)['verses']['none'])
+        self.assertEqual(3, len(ChapterHandler.paths))
+
+    def test_many_versions(self):
+        """Make sure chapters of several versions are fetched together from a running loop"""
+        sample, other = SampleBolls(), OtherBolls()
+        passages = asyncio.run(sample.get_passages_async([("Ruth", 1)]))
+        self.assertEqual(["1 TEST 8:1"], passages[0]['verses']['none'])
+        passages = get_passages_many([(sample, "Ruth", 2), (other, "Ruth", 2)])
+        self.assertEqual(["1 TEST 8:2", "1 OTHER 8:2"],
+                         [passage['verses']['none'][0] for passage in passages])
+
+    def test_fetch_threads_follow_pool_size(self):
+        """Make sure the asyncio fetch threads are resized along with the session's pool"""
+        # pylint: disable=protected-access
+        session.configure(pool_size=3)
+        try:
+            self.assertEqual(3, _fetch_executor()._max_workers)
+            passages = get_passages_many([(SampleBolls(), "Ruth", 3)])
+            self.assertEqual(["1 TEST 8:3"], passages[0]['verses']['none'])
+        finally:
+            session.configure()
+        self.assertEqual(session.POOL_SIZE, _fetch_executor()._max_workers)
+
+    def test_async_read_ahead(self):
+        """Make sure chapters served from a loop read ahead like get_passage does"""
+        bible = SampleBolls()
+        bible.enable_read_ahead()
+        try:
+            asyncio.run(bible.get_passage_async("Ruth", 1))
+            for _ in range(50):
+                if bible.is_cached("Ruth", 2):
+                    break
+                time.sleep(0.05)
+            self.assertTrue(bible.is_cached("Ruth", 2))
+        finally:
+            bible.disable_read_ahead()
+
+    def test_concurrent_misses(self):
+        """Make sure concurrent misses of one chapter make one request and share its result"""
+        ChapterHandler.delay = 0.3
+        bible = SampleBolls()
+        barrier = threading.Barrier(6)
+        results = []
+
+        def read():
+            barrier.wait()
+            results.append(bible.get_passage("Mark", 4)['verses']['none'])
+
+        threads = [threading.Thread(target=read) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        self.assertEqual([["1 TEST 41:4"]] * 6, results)
+        self.assertEqual(["/get-chapter/TEST/41/4/"], ChapterHandler.paths)
+
+    def test_stress(self):
+        """Make sure many threads reading and saving one version leave a complete, valid cache"""
+        bible = SampleBolls()
+        refs = [("Psalms", chapter) for chapter in range(1, 61)]
+        errors = []
+
+        def read(seed):
+            generator = random.Random(seed)
+            try:
+                for _ in range(40):
+                    book, chapter = generator.choice(refs)
+                    verses = bible.get_passage(book, chapter)['verses']['none']
+                    if verses != [f"1 TEST 19:{chapter}"]:
+                        errors.append((book, chapter, verses))
+            except Exception as exc:  # pylint: disable=broad-except
+                errors.append(exc)
+
+        threads = [threading.Thread(target=read, args=(seed,)) for seed in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(60)
+        self.assertEqual([], errors)
+        self.assertEqual(len(ChapterHandler.paths), len(set(ChapterHandler.paths)))
+
+        CompressCache.flush()
+        reloaded = CompressCache('test-bolls').load()
+        for book, chapter in refs:
+            if f"/get-chapter/TEST/19/{chapter}/" in ChapterHandler.paths:
+                self.assertEqual([f"1 TEST 19:{chapter}"], reloaded[book][str(chapter)])
@@ -0,0 +1,108 @@
+"""
+Test the upstream circuit breakers
+"""
+import time
+from unittest import TestCase
+from unittest.mock import patch
+from urllib.parse import urlsplit
+from bibles import breaker, session
+from bibles.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen
+from tests.support import QuietHandler, serve
+
+
+class FailingHandler(QuietHandler):
+    """
+    Answers 503 until the class is told the upstream has recovered.
+    """
+    status = 503
+    requests = 0
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Sends an empty chapter list with the current status.
+        """
+        FailingHandler.requests += 1
+        self.send_body(b'[]', status=FailingHandler.status)
+
+
+class TestBreaker(TestCase):
+    """
+    Test opening, probing and closing circuits
+    """
+    def setUp(self) -> None:
+        FailingHandler.status = 503
+        FailingHandler.requests = 0
+        self.url = serve(self, FailingHandler)
+        session.configure(pool_size=2, retries=0)
+        breaker.reset()
+
+    def tearDown(self) -> None:
+        session.configure()
+        breaker.reset()
+
+    def test_states(self):
+        """Make sure a circuit opens after repeated failures and one probe closes it"""
+        circuit = CircuitBreaker("example.org", threshold=2, reset_timeout=0.1)
+        circuit.before()
+        circuit.failure()
+        self.assertEqual(CLOSED, circuit.state)
+        circuit.failure()
+        self.assertEqual(OPEN, circuit.state)
+        self.assertRaises(CircuitOpen, circuit.before)
+        time.sleep(0.15)
+        circuit.before()
+        self.assertEqual(HALF_OPEN, circuit.state)
+        # Only the probe goes through
+        self.assertRaises(CircuitOpen, circuit.before)
+        circuit.failure()
+        self.assertEqual(OPEN, circuit.state)
+        time.sleep(0.15)
+        circuit.before()
+        circuit.success()
+        self.assertEqual(CLOSED, circuit.state)
+        self.assertEqual(2, circuit.health()["rejected"])
+        self.assertEqual(3, circuit.health()["total_failures"])
+
+    def test_session_fails_fast(self):
+        """Make sure the session stops calling a failing host and reports its health"""
+        host = urlsplit(self.url).netloc
+        url = f"{self.url}/get-chapter/KJV/1/1/"
+        for _ in range(breaker.FAILURE_THRESHOLD):
+            self.assertEqual(503, session.get(url).status_code)
+        self.assertRaises(CircuitOpen, session.get, url)
+        self.assertEqual(breaker.FAILURE_THRESHOLD, FailingHandler.requests)
+        health = breaker.health()[host]
+        self.assertEqual(OPEN, health["state"])
+        self.assertEqual(1, health["rejected"])
+        self.assertGreater(health["retry_in"], 0)
+
+    def test_retries_count(self):
+        """Make sure every retry counts toward the breaker, and stops once the circuit opens"""
+        session.configure(pool_size=2, retries=2)
+        backoff, session.BACKOFF = session.BACKOFF, 0
+        try:
+            host = urlsplit(self.url).netloc
+            url = f"{self.url}/get-chapter/KJV/1/1/"
+            self.assertEqual(503, session.get(url).status_code)
+            self.assertEqual(3, breaker.health()[host]["failures"])
+            # Two more attempts open the circuit, and the third is never sent
+            self.assertRaises(CircuitOpen, session.get, url)
+            self.assertEqual(breaker.FAILURE_THRESHOLD, FailingHandler.requests)
+        finally:
+            session.BACKOFF = backoff
+
+    def test_probe_error_settles(self):
+        """Make sure a probe failing with a non-requests error reopens the circuit"""
+        url = f"{self.url}/get-chapter/KJV/1/1/"
+        circuit = CircuitBreaker(urlsplit(self.url).netloc, threshold=1, reset_timeout=0.05)
+        with patch('bibles.session.breaker_for', return_value=circuit):
+            self.assertEqual(503, session.get(url).status_code)
+            self.assertEqual(OPEN, circuit.state)
+            time.sleep(0.1)
+            with patch.object(session.get_session(), 'get', side_effect=ValueError("bad URL")):
+                self.assertRaises(ValueError, session.get, url)
+            self.assertEqual(OPEN, circuit.state)
+            time.sleep(0.1)
+            FailingHandler.status = 200
+            self.assertEqual(200, session.get(url).status_code)
+            self.assertEqual(CLOSED, circuit.state)
@@ -0,0 +1,209 @@
+"""
+Test the CompressCache storage formats
+"""
+import os
+import threading
+from unittest import TestCase
+from unittest.mock import patch
+from bibles.codec import CODECS, detect_codec
+from bibles.compresscache import CompressCache
+from bibles.dedup import VersePool
+from bibles.localbible import LocalBible, load_versions
+from bibles.versestore import VerseStore, compile_corpus
+from tests.support import use_temp_caches
+
+
+SAMPLE = {
+    "Genesis": {
+        "1": ["1 In the beginning God created the heaven and the earth.",
+              "2 And the earth was without form, and void."],
+        "2": ["1 Thus the heavens and the earth were finished."]
+    },
+    "John": {
+        "3": ["16 For God so loved the world, that he gave his only begotten Son."]
+    }
+}
+
+
+class SampleBible(LocalBible):
+    """
+    Local version backed by the test cache.
+    """
+    cache_name = 'test-sample'
+
+
+class TestCompressCache(TestCase):
+    """
+    Test saving and loading of the cache formats
+    """
+    def setUp(self) -> None:
+        use_temp_caches(self)
+        self.cache = CompressCache('test-sample')
+
+    def test_legacy_round_trip(self):
+        """Make sure the single stream format still round trips"""
+        self.cache.save(SAMPLE)
+        self.assertEqual(SAMPLE, self.cache.load())
+
+    def test_deferred_save(self):
+        """Make sure saves inside deferred() are made once, with the latest data, on exit"""
+        with self.cache.deferred():
+            self.cache.save({"Genesis": {}})
+            with self.cache.deferred():
+                self.cache.save(SAMPLE)
+            self.assertFalse(os.path.exists(self.cache.path))
+        self.assertEqual(SAMPLE, self.cache.load())
+
+    def test_concurrent_saves(self):
+        """Make sure concurrent saves never leave a partly written or mixed file"""
+        versions = [{"Genesis": {"1": [f"1 Version {number}"] * 2000}} for number in range(8)]
+
+        def save(data):
+            for _ in range(5):
+                self.cache.save(data)
+                self.cache.save_in_background(data)
+
+        threads = [threading.Thread(target=save, args=(data,)) for data in versions]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(60)
+        CompressCache.flush()
+        self.assertIn(self.cache.load(), versions)
+        self.assertEqual([], [name for name in os.listdir(os.path.dirname(self.cache.path))
+                              if name.endswith(".tmp")])
+
+    def test_sharded(self):
+        """Make sure sharded saves rewrite only the changed books and loads skip missing shards"""
+        cache = CompressCache('test-sample', sharded=True)
+        cache.save(SAMPLE)
+        self.assertTrue(cache.has_shards())
+        self.assertFalse(os.path.exists(cache.path))
+        self.assertEqual(SAMPLE, CompressCache('test-sample').load())
+
+        changed = {"Genesis": SAMPLE["Genesis"], "John": {"3": ["16 For God so loved"]}}
+        john = os.path.join(cache.shard_path, f"John{cache.codec.extension}")
+        genesis = os.path.join(cache.shard_path, f"Genesis{cache.codec.extension}")
+        os.remove(genesis)
+        written = CompressCache('test-sample').save(changed, books=["John"])
+        self.assertFalse(os.path.exists(genesis))
+        self.assertEqual(os.path.getsize(john) + os.path.getsize(
+            os.path.join(cache.shard_path, "manifest.json")), written)
+        self.assertEqual({"John": changed["John"]}, CompressCache('test-sample').load())
+
+    def test_indexed_round_trip(self):
+        """Make sure chapters can be read individually from the indexed format"""
+        self.cache.save_indexed(SAMPLE)
+        self.assertTrue(self.cache.has_index())
+        self.assertEqual(SAMPLE["John"]["3"], self.cache.load_chapter("John", 3))
+        self.assertEqual(SAMPLE["Genesis"]["1"], self.cache.load_chapter("Genesis", "1"))
+        self.assertRaises(KeyError, self.cache.load_chapter, "Genesis", 3)
+        # Without the single stream file, load() reads the indexed file
+        self.assertEqual(SAMPLE, CompressCache('test-sample').load())
+
+    def test_local_bible_indexed(self):
+        """Make sure a local version serves chapters from the indexed format"""
+        self.cache.save_indexed(SAMPLE)
+        passage = SampleBible().get_passage("Genesis", 2)
+        self.assertEqual(SAMPLE["Genesis"]["2"], passage['verses']['none'])
+
+    def test_local_bible_lazy(self):
+        """Make sure a lazy local version loads once, on first access, across threads"""
+        self.cache.save(SAMPLE)
+        with patch.object(CompressCache, 'load', autospec=True,
+                          side_effect=lambda cache: SAMPLE) as load:
+            bible = SampleBible(lazy=True)
+            self.assertFalse(bible.loaded)
+            threads = [
+                threading.Thread(target=bible.get_passage, args=("John", 3)) for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertTrue(bible.loaded)
+            self.assertEqual(1, load.call_count)
+
+    def test_load_many(self):
+        """Make sure versions load in worker processes and are handed back to the classes"""
+        self.cache.save(SAMPLE)
+        corpora, timings = CompressCache.load_many(['test-sample', 'test-sample'], max_workers=2)
+        self.assertEqual({'test-sample': SAMPLE}, corpora)
+        self.assertIn('test-sample', timings)
+        bibles, timings = load_versions([SampleBible], max_workers=1)
+        self.assertTrue(bibles[0].loaded)
+        self.assertEqual(SAMPLE["John"]["3"], bibles[0].get_passage("John", 3)['verses']['none'])
+
+    def test_codecs(self):
+        """Make sure every installed codec round trips and is detected from its header"""
+        for name, codec in CODECS.items():
+            cache = CompressCache('test-sample', name)
+            cache.save(SAMPLE)
+            with open(cache.path, "rb") as data_file:
+                self.assertEqual(codec, detect_codec(data_file.read(), cache.path), msg=name)
+            self.assertEqual(SAMPLE, cache.load(), msg=name)
+            cache.save_indexed(SAMPLE)
+            self.assertEqual(
+                SAMPLE["John"]["3"], CompressCache('test-sample').load_chapter("John", 3)
+            )
+            os.remove(cache.path)
+
+    def test_verse_store(self):
+        """Make sure the memory mapped verse store round trips, including unnumbered verses"""
+        data = {"Psalms": {"3": ["A psalm of David.", "1 Lord, how they are increased"]}}
+        data.update(SAMPLE)
+        compile_corpus(data, self.cache.store_path)
+        store = VerseStore.open(self.cache.store_path)
+        for book, chapters in data.items():
+            for chapter, verses in chapters.items():
+                self.assertEqual(verses, store.chapter(book, chapter))
+        bible = SampleBible()
+        passage = bible.get_passage("Psalms", 3)
+        self.assertEqual(data["Psalms"]["3"], passage['verses']['none'])
+        self.assertEqual("1 Lord, how they are increased", bible.get_verse("Psalms", 3, 1))
+        self.assertEqual(SAMPLE["John"]["3"][0], bible.get_verse("John", 3, 16))
+        self.assertEqual(SAMPLE["Genesis"]["1"][1], bible.get_verse("Genesis", 1, 2))
+
+    def test_local_bible_compact(self):
+        """Make sure a compacted local version serves the same chapters"""
+        self.cache.save(SAMPLE)
+        bible = SampleBible(compact=True)
+        for book, chapters in SAMPLE.items():
+            for chapter, verses in chapters.items():
+                self.assertEqual(verses, bible.get_passage(book, int(chapter))['verses']['none'])
+
+    def test_dedup(self):
+        """Make sure identical verses are shared across versions and reported"""
+        pool = VersePool()
+        first = {"John": {"3": ["16 For God so loved the world", "17 For God sent not"]}}
+        # Built at runtime so that it is an equal but distinct string object
+        second = {
+            "John": {"3": ["".join(["16 For God so loved ", "the world"]), "17 For God sent"]}
+        }
+        pool.intern_corpus('first', first)
+        pool.intern_corpus('second', second)
+        self.assertIs(first["John"]["3"][0], second["John"]["3"][0])
+        self.assertEqual("17 For God sent", second["John"]["3"][1])
+        self.assertEqual(0, pool.saved['first'])
+        self.assertGreater(pool.saved['second'], 0)
+
+    def test_delta(self):
+        """Make sure a derived version round trips through a delta against its base"""
+        self.cache.save(SAMPLE)
+        derived = {
+            "Genesis": {
+                "1": ["1 In the beginning God created the heavens and the earth.",
+                      "2 And the earth was without form, and void."],
+                "2": ["1 Thus the heavens and the earth were finished.", "2 And on the seventh"]
+            },
+            "John": {
+                "3": ["16 For God so loved the world, that he gave his one and only Son."]
+            },
+            "Jude": {
+                "1": ["1 Jude, the servant of Jesus Christ"]
+            }
+        }
+        cache = CompressCache('test-derived')
+        cache.save_delta(derived, 'test-sample')
+        self.assertFalse(os.path.exists(cache.path))
+        self.assertEqual(derived, cache.load())
@@ -0,0 +1,148 @@
+"""
+Test the incremental CSB parser against golden output of saved books, and that a chapter is
+served while the rest of its book is still downloading
+"""
+import glob
+import json
+import os
+import threading
+from unittest import TestCase
+from unittest.mock import patch
+from bibles.csb import CSB
+from bibles.csbparser import CSBBookParser
+from bibles.passage import PassageNotFound
+from bibles.persister import PERSISTER
+from tests.support import QuietHandler, serve, use_temp_caches
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "csb")
+
+
+def read_fixture(name: str) -> bytes:
+    """
+    Reads a saved book.
+    """
+    with open(os.path.join(FIXTURES, name), "rb") as book_file:
+        return book_file.read()
+
+
+class TestCSBBookParser(TestCase):
+    """
+    Test that the parser gives the recorded output, however the book is split up
+    """
+    def test_golden(self):
+        """Make sure every saved book parses to its recorded output, whole or in pieces"""
+        books = sorted(glob.glob(os.path.join(FIXTURES, "*.xml")))
+        self.assertTrue(books)
+        for book in books:
+            with self.subTest(book=os.path.basename(book)):
+                raw = read_fixture(book)
+                with open(f"{book[:-len('.xml')]}.json", "r", encoding="utf-8") as golden_file:
+                    golden = json.load(golden_file)
+                self.assertEqual(golden, CSBBookParser.parse(raw))
+
+                # Each chapter serialized for a parse worker, as CSB does with a pool
+                pieces = {}
+                parser = CSBBookParser(
+                    lambda name, chapter, verses: pieces.setdefault(name, {}).update(
+                        {chapter: verses}
+                    ),
+                    lambda function, *args: function(*args)
+                )
+                for start in range(0, len(raw), 7):
+                    parser.feed(raw[start:start + 7])
+                parser.close()
+                self.assertEqual(golden, pieces)
+
+    def test_chapter_as_soon_as_parsed(self):
+        """Make sure a chapter is handed on once its closing tag arrives"""
+        raw = read_fixture("psalms.xml")
+        split = raw.index(b"</chapter>") + len(b"</chapter>")
+        chapters = []
+        parser = CSBBookParser(lambda name, chapter, verses: chapters.append((name, chapter)))
+        parser.feed(raw[:split])
+        self.assertEqual([("Psalms", "1")], chapters)
+        parser.feed(raw[split:])
+        parser.close()
+        self.assertEqual([("Psalms", "1"), ("Psalms", "2")], chapters)
+
+
+    def test_markup_between_chapters(self):
+        """Make sure comments and CDATA, even ones mentioning chapters, are parsed as XML"""
+        raw = (b'<?xml version="1.0" encoding="UTF-8"?><book><bookname>Jude</bookname>'
+               b'<!-- <chapter display="9"> --><chapter display="1"><p><verse '
+               b'display-number="1"><versenum>1</versenum> Jude, <![CDATA[a servant]]> of '
+               b'Jesus Christ</verse></p></chapter><!-- </chapter> --></book>')
+        for run in (None, lambda function, *args: function(*args)):
+            chapters = {}
+            parser = CSBBookParser(
+                lambda name, chapter, verses: chapters.update({(name, chapter): verses}), run
+            )
+            for start in range(0, len(raw), 5):
+                parser.feed(raw[start:start + 5])
+            parser.close()
+            self.assertEqual(
+                {("Jude", "1"): {'none': ["1 Jude, a servant of Jesus Christ"]}}, chapters
+            )
+
+
+class BookHandler(QuietHandler):
+    """
+    Serves the saved Psalms in two chunks, holding the second back until released.
+    """
+    release = threading.Event()
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Sends Psalms, or a 404 for other books.
+        """
+        if not self.path.endswith("-Ps.xml"):
+            self.send_body(b"", "application/xml", 404)
+            return
+        raw = read_fixture("psalms.xml")
+        split = raw.index(b"</chapter>") + len(b"</chapter>")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/xml")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for part in (raw[:split], raw[split:]):
+            self.wfile.write(f"{len(part):x}\r\n".encode() + part + b"\r\n")
+            self.wfile.flush()
+            BookHandler.release.wait(10)
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class TestCSBStream(TestCase):
+    """
+    Test fetching CSB books against a local server
+    """
+    def setUp(self) -> None:
+        BookHandler.release.clear()
+        self.directory = use_temp_caches(self)
+        xml_url = patch('bibles.csb.XML_URL', f"{serve(self, BookHandler)}/")
+        xml_url.start()
+        self.addCleanup(xml_url.stop)
+
+    def tearDown(self) -> None:
+        BookHandler.release.set()
+
+    def test_first_chapter_early(self):
+        """Make sure a chapter is served before the rest of its book has arrived"""
+        with open(os.path.join(FIXTURES, "psalms.json"), "r", encoding="utf-8") as golden_file:
+            golden = json.load(golden_file)["Psalms"]
+        csb = CSB()
+        self.assertEqual(golden["1"], csb.get_passage("Psalms", 1)['verses'])
+        self.assertFalse(csb.is_cached("Psalms", 2))
+
+        BookHandler.release.set()
+        self.assertEqual(golden["2"], csb.get_passage("Psalms", 2)['verses'])
+        # The book did not have it
+        with self.assertRaises(PassageNotFound):
+            csb.get_passage("Psalms", 3)
+
+    def test_missing_book(self):
+        """Make sure a failed download reaches every reader"""
+        with self.assertRaises(PassageNotFound):
+            CSB().get_passage("Obadiah", 1)
+        # Nothing was cached, so nothing is saved
+        PERSISTER.flush()
+        self.assertEqual([], os.listdir(self.directory))
@@ -0,0 +1,83 @@
+"""
+Test fetching ESV chapters by esv.org page against a local server
+"""
+import glob
+import os
+from unittest import TestCase
+from unittest.mock import patch
+from bibles.esv import CACHE_NAME, ESV
+from bibles.persister import PERSISTER
+from tests.support import QuietHandler, serve, use_temp_caches
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "esv")
+
+
+class PageHandler(QuietHandler):
+    """
+    Serves the saved page of a book for every /<book>+<chapter> path.
+    """
+    paths = []
+    pages = {'John': "john-3.html", 'Psalm': "psalm-23.html"}
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Sends the book's page, or a 404 for other books.
+        """
+        PageHandler.paths.append(self.path)
+        page = PageHandler.pages.get(self.path.strip('/').split('+')[0])
+        body = b"Not found"
+        if page is not None:
+            with open(os.path.join(FIXTURES, page), "rb") as page_file:
+                body = page_file.read()
+        self.send_body(body, "text/html; charset=utf-8", 200 if page is not None else 404)
+
+
+class TestESVPages(TestCase):
+    """
+    Test that pages fill every chapter they hold and are reused by their other chapters
+    """
+    def setUp(self) -> None:
+        PageHandler.paths = []
+        self.directory = use_temp_caches(self)
+        page_url = patch('bibles.esv.PAGE_URL', f"{serve(self, PageHandler)}/")
+        page_url.start()
+        self.addCleanup(page_url.stop)
+
+    def remove_cache(self) -> None:
+        """
+        Removes the saved chapters, keeping the recency and page coverage files.
+        """
+        PERSISTER.flush()
+        for path in glob.glob(os.path.join(self.directory, f"{CACHE_NAME}.*")):
+            os.remove(path)
+
+    def test_page_coverage(self):
+        """Make sure one request fills a page's chapters and later misses reuse the page"""
+        esv = ESV()
+        self.assertEqual(["1 Now there was a man of the Pharisees named Nicodemus, "
+                          "a ruler of the Jews."],
+                         esv.get_passage("John", 3)['verses']['You Must Be Born Again'][:1])
+        self.assertTrue(esv.is_cached("John", 4))
+        esv.get_passage("John", 4)
+        self.assertEqual(["/John+3"], PageHandler.paths)
+
+        # A new instance knows John 4 is on the John 3 page, even once it is not cached
+        self.remove_cache()
+        esv = ESV()
+        self.assertFalse(esv.is_cached("John", 4))
+        esv.get_passage("John", 4)
+        self.assertEqual(["/John+3", "/John+3"], PageHandler.paths)
+
+    def test_warm(self):
+        """Make sure warming requests the pages holding the most uncached chapters"""
+        ESV().get_passage("John", 3)
+        self.remove_cache()
+        PageHandler.paths = []
+
+        esv = ESV()
+        wanted = [("Psalms", 23), ("John", 4), ("Psalms", 24), ("John", 3), ("Jude", 1)]
+        self.assertEqual(3, esv.warm(wanted))
+        # The known two chapter page first, then in order, skipping the page that failed
+        self.assertEqual(["/John+3", "/Psalm+23", "/Jude+1"], PageHandler.paths)
+        self.assertTrue(all(esv.is_cached(*chapter) for chapter in wanted[:4]))
+        self.assertEqual(0, esv.warm(wanted[:4]))
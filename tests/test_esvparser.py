@@ -0,0 +1,34 @@
+"""
+Test the ESV page parser against golden output of saved pages
+"""
+import glob
+import json
+import os
+from unittest import TestCase
+from bibles.esv import ESV
+from bibles.esvparser import ESVPageParser
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "esv")
+
+
+class TestESVPageParser(TestCase):
+    """
+    Test that the one pass parser matches the BeautifulSoup tree walk
+    """
+    def test_golden(self):
+        """Make sure both parsers give the recorded output for every saved page"""
+        pages = sorted(glob.glob(os.path.join(FIXTURES, "*.html")))
+        self.assertTrue(pages)
+        for page in pages:
+            with self.subTest(page=os.path.basename(page)):
+                with open(page, "r", encoding="utf-8") as page_file:
+                    content = page_file.read()
+                with open(f"{page[:-len('.html')]}.json", "r", encoding="utf-8") as golden_file:
+                    golden = json.load(golden_file)
+                self.assertEqual(golden, ESV.parse(content))
+                self.assertEqual(golden, ESV.parse_soup(content))
+
+    def test_missing_structure(self):
+        """Make sure pages without the passage layout give nothing"""
+        self.assertEqual({}, ESVPageParser.parse("<html><body><p>Not found</p></body></html>"))
+        self.assertEqual({}, ESVPageParser.parse(""))
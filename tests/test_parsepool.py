@@ -0,0 +1,79 @@
+"""
+Test the parse process pool
+"""
+import os
+import threading
+import time
+from unittest import TestCase
+from bibles.csbparser import parse_chapter_xml
+from bibles.esv import ESV
+from bibles.parsepool import ParsePool
+
+ESV_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "esv", "jude.html")
+CHAPTER = b'<chapter display="1"><head1>Greeting</head1><p><verse display-number="1">' \
+          b'<versenum>1</versenum> Jude, a servant of Jesus Christ</verse></p></chapter>'
+
+
+def exit_in_worker(parent: int) -> str:
+    """
+    Kills the worker it runs in, or says it ran in the parent.
+    """
+    if os.getpid() != parent:
+        os._exit(1)  # pylint: disable=protected-access
+    return "parent"
+
+
+class TestParsePool(TestCase):
+    """
+    Test that parses run in workers, give the same results and are bounded
+    """
+    def test_inline(self):
+        """Make sure a pool without workers parses on the calling thread"""
+        pool = ParsePool(workers=0)
+        self.assertEqual(os.getpid(), pool.run(os.getpid))
+        self.assertEqual(("1", {'Greeting': ["1 Jude, a servant of Jesus Christ"]}),
+                         pool.run(parse_chapter_xml, "Jude", CHAPTER))
+        self.assertEqual(2, pool.stats()["inline"])
+
+    def test_workers(self):
+        """Make sure parses run in another process and match parsing here"""
+        pool = ParsePool(workers=1)
+        try:
+            pool.warm()
+            self.assertNotEqual(os.getpid(), pool.run(os.getpid))
+            with open(ESV_PAGE, "r", encoding="utf-8") as page_file:
+                page = page_file.read()
+            self.assertEqual(ESV.parse(page), pool.run(ESV.parse, page))
+            self.assertEqual(parse_chapter_xml("Jude", CHAPTER),
+                             pool.run(parse_chapter_xml, "Jude", CHAPTER))
+            self.assertEqual(3, pool.stats()["parsed"])
+        finally:
+            pool.shutdown()
+
+    def test_backpressure(self):
+        """Make sure callers wait for room once the queue is full"""
+        pool = ParsePool(workers=1, queue=1)
+        try:
+            pool.warm()
+            threads = [threading.Thread(target=pool.run, args=(time.sleep, 0.5)) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            time.sleep(0.25)
+            stats = pool.stats()
+            self.assertEqual(1, stats["in_flight"])
+            self.assertEqual(1, stats["waiting"])
+            for thread in threads:
+                thread.join()
+            self.assertEqual(0, pool.stats()["waiting"])
+        finally:
+            pool.shutdown()
+
+    def test_worker_died(self):
+        """Make sure a dead worker is replaced and its parse made here"""
+        pool = ParsePool(workers=1)
+        try:
+            self.assertEqual("parent", pool.run(exit_in_worker, os.getpid()))
+            self.assertEqual(1, pool.stats()["restarts"])
+            self.assertNotEqual(os.getpid(), pool.run(os.getpid))
+        finally:
+            pool.shutdown()
@@ -0,0 +1,99 @@
+"""
+Test the write-behind persister
+"""
+import os
+import time
+from unittest import TestCase
+from bibles.compresscache import CompressCache
+from bibles.persister import WriteBehind
+from tests.support import use_temp_caches
+
+
+class FailingCache:
+    """
+    Cache whose first save fails, recording the books of the saves that follow.
+    """
+    path = "failing"
+
+    def __init__(self) -> None:
+        self.failures = 1
+        self.saved = []
+
+    def save(self, data, lock=None, books=None) -> int:
+        """
+        Fails, or records the save.
+        """
+        if self.failures > 0:
+            self.failures -= 1
+            raise OSError("No space left on device")
+        self.saved.append((data, books))
+        return 1
+
+
+class TestWriteBehind(TestCase):
+    """
+    Test coalescing, flush triggers and metrics
+    """
+    def setUp(self) -> None:
+        use_temp_caches(self)
+        self.cache = CompressCache('test-sample')
+
+    def wait_for_flushes(self, persister: WriteBehind, flushes: int) -> None:
+        """
+        Waits up to 10 seconds for the background thread to flush.
+        """
+        deadline = time.monotonic() + 10
+        while persister.stats()["flushes"] < flushes and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_change_trigger(self):
+        """Make sure enough changes flush early, once per cache, with metrics"""
+        persister = WriteBehind(interval=3600, changes=3)
+        data = {"Genesis": {"1": ["1 In the beginning"]}}
+        persister.mark_dirty(self.cache, data)
+        persister.mark_dirty(self.cache, data)
+        self.assertEqual(1, persister.pending)
+        self.assertFalse(os.path.exists(self.cache.path))
+        persister.mark_dirty(self.cache, data)
+        self.wait_for_flushes(persister, 1)
+        stats = persister.stats()
+        self.assertEqual(1, stats["saves"])
+        self.assertEqual(os.path.getsize(self.cache.path), stats["bytes_written"])
+        self.assertGreater(stats["last_flush_seconds"], 0)
+        self.assertEqual(0, stats["pending"])
+        self.assertEqual(data, self.cache.load())
+
+    def test_interval_trigger(self):
+        """Make sure a single change is flushed once the interval passes"""
+        persister = WriteBehind(interval=0.1, changes=1000)
+        persister.mark_dirty(self.cache, {"John": {"3": ["16 For God so loved"]}})
+        self.wait_for_flushes(persister, 1)
+        self.assertEqual({"John": {"3": ["16 For God so loved"]}}, self.cache.load())
+
+    def test_failed_save_kept(self):
+        """Make sure a failed save is reported and retried, with the books of both markings"""
+        persister = WriteBehind(interval=3600, changes=1000)
+        cache = FailingCache()
+        persister.mark_dirty(cache, {"v": 1}, books=frozenset({"Ruth"}))
+        persister.flush()
+        self.assertEqual(1, persister.pending)
+        self.assertEqual(1, persister.stats()["failed_saves"])
+        self.assertIn("No space left on device", persister.errors["failing"])
+        persister.mark_dirty(cache, {"v": 2}, books=frozenset({"Jude"}))
+        persister.flush()
+        self.assertEqual([({"v": 2}, frozenset({"Ruth", "Jude"}))], cache.saved)
+        self.assertEqual({}, persister.errors)
+        self.assertEqual(0, persister.pending)
+
+    def test_uncounted_changes(self):
+        """Make sure changes marked as not counting wait for the interval"""
+        persister = WriteBehind(interval=3600, changes=2)
+        data = {"Genesis": {"1": ["1 In the beginning"]}}
+        for _ in range(5):
+            persister.mark_dirty(self.cache, data, count=False)
+        persister.mark_dirty(self.cache, data)
+        self.assertEqual(0, persister.stats()["flushes"])
+        self.assertEqual(1, persister.pending)
+        persister.mark_dirty(self.cache, data)
+        self.wait_for_flushes(persister, 1)
+        self.assertEqual(1, persister.stats()["saves"])
@@ -0,0 +1,165 @@
+"""
+Test the background prefetcher
+"""
+import contextlib
+import json
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+from bibles.bible import Bible, NetworkBible
+from bibles.breaker import CircuitOpen
+from bibles.canon import CHAPTER_TOTAL, chapter_ordinal
+from bibles.compresscache import write_json
+from bibles.prefetch import Prefetcher
+from tests.support import use_temp_caches
+
+
+class MissingBible(Bible):
+    """
+    Test class with a few uncached chapters.
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        self.missing = {("Genesis", 3), ("Psalms", 119), ("Revelation", 22)}
+        self.fetched = []
+        self.saves = 0
+
+    def get_passage(self, book, chapter) -> dict:
+        """
+        "Fetches" a chapter.
+        """
+        self.fetched.append((book, chapter))
+        self.missing.discard((book, chapter))
+        return {'book': book, 'chapter': chapter, 'verses': {'none': []}}
+
+    def is_cached(self, book, chapter) -> bool:
+        """
+        Whether a chapter is cached.
+        """
+        return (book, chapter) not in self.missing
+
+    @contextlib.contextmanager
+    def deferred_saves(self):
+        """
+        Counts the cache saves.
+        """
+        yield
+        self.saves += 1
+
+
+class FlakyBible(MissingBible):
+    """
+    Test class whose host fails a few times, and with a chapter that cannot be parsed.
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        self.outages = 2
+
+    def get_passage(self, book, chapter) -> dict:
+        """
+        "Fetches" a chapter, unless the host is down or the chapter is Psalms 119.
+        """
+        if self.outages > 0:
+            self.outages -= 1
+            raise CircuitOpen("example.org is failing; not retrying for now")
+        if (book, chapter) == ("Psalms", 119):
+            raise KeyError("verses")
+        return super().get_passage(book, chapter)
+
+
+class CachingBible(NetworkBible):
+    """
+    Test class that caches what it "fetches" through the write-behind persister.
+    """
+    def __init__(self) -> None:
+        super().__init__("prefetch-test")
+        self._load_cache(list)
+        self.missing = {("Genesis", 3), ("Revelation", 22)}
+        for book, chapter in chapter_keys(self):
+            if (book, chapter) not in self.missing:
+                self._cache[book][str(chapter)] = ["1 cached"]
+
+    def get_passage(self, book, chapter) -> dict:
+        """
+        "Fetches" a chapter into the cache.
+        """
+        with self._lock:
+            self._cache[book][str(chapter)] = ["1 fetched"]
+        self._mark_dirty([book])
+        return {'book': book, 'chapter': chapter, 'verses': {'none': ["1 fetched"]}}
+
+
+def chapter_keys(bible: Bible):
+    """
+    Every (book, chapter) of a version.
+    """
+    for book in bible.books:
+        for chapter in range(1, book.chapter_count + 1):
+            yield book.name, chapter
+
+
+class TestPrefetcher(TestCase):
+    """
+    Test walking, progress and resuming
+    """
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.progress_path = os.path.join(self.directory.name, "progress.json")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_walk(self):
+        """Make sure only uncached chapters are fetched and progress reaches 100%"""
+        bible = MissingBible()
+        prefetcher = Prefetcher({"test": bible}, rate=0, progress_path=self.progress_path)
+        self.assertEqual(0.0, prefetcher.progress)
+        prefetcher.start()
+        prefetcher.join(10)
+        self.assertEqual([("Genesis", 3), ("Psalms", 119), ("Revelation", 22)], bible.fetched)
+        self.assertEqual(100.0, prefetcher.progress)
+        self.assertGreater(bible.saves, 1)
+        with open(self.progress_path, "r", encoding="utf-8") as progress_file:
+            self.assertEqual({"test": CHAPTER_TOTAL + 1}, json.load(progress_file))
+
+    def test_resume(self):
+        """Make sure a new prefetcher resumes from the saved progress"""
+        with open(self.progress_path, "w", encoding="utf-8") as progress_file:
+            json.dump({"test": chapter_ordinal("Psalms", 120)}, progress_file)
+        bible = MissingBible()
+        prefetcher = Prefetcher({"test": bible}, rate=0, progress_path=self.progress_path)
+        self.assertAlmostEqual(
+            100.0 * (chapter_ordinal("Psalms", 120) - 1) / CHAPTER_TOTAL, prefetcher.progress
+        )
+        prefetcher.run()
+        self.assertEqual([("Revelation", 22)], bible.fetched)
+        prefetcher.reset()
+        self.assertEqual(0.0, prefetcher.progress)
+        self.assertFalse(os.path.exists(self.progress_path))
+
+    def test_failures(self):
+        """Make sure an open circuit is waited out and other errors are counted and skipped"""
+        bible = FlakyBible()
+        prefetcher = Prefetcher({"test": bible}, rate=0, progress_path=self.progress_path)
+        with patch('bibles.prefetch.BACKOFF', 0.01):
+            prefetcher.run()
+        self.assertEqual([("Genesis", 3), ("Revelation", 22)], bible.fetched)
+        self.assertEqual({"test": 1}, prefetcher.failed)
+        self.assertEqual(100.0, prefetcher.progress)
+
+    def test_cache_saved_before_progress(self):
+        """Make sure the fetched chapters are on disk before the progress is written past them"""
+        use_temp_caches(self)
+        bible = CachingBible()
+        prefetcher = Prefetcher({"test": bible}, rate=0, progress_path=self.progress_path)
+        saved = []
+
+        def check_cache(path, data):
+            saved.append(os.path.exists(bible._compress_cache.path))
+            write_json(path, data)
+
+        with patch('bibles.prefetch.write_json', side_effect=check_cache):
+            prefetcher.run()
+        self.assertTrue(saved)
+        self.assertTrue(all(saved))
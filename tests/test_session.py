@@ -0,0 +1,87 @@
+"""
+Test the shared HTTP session
+"""
+import threading
+import time
+from unittest import TestCase
+from urllib.parse import urlsplit
+import requests
+from bibles import breaker, session
+from tests.support import QuietHandler, serve
+
+
+class ChapterHandler(QuietHandler):
+    """
+    Serves a bolls.life style chapter for every path.
+    """
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Sends one verse as JSON, keeping the connection alive.
+        """
+        self.send_body(b'[{"verse": 1, "text": "In the beginning"}]')
+
+
+class StallingHandler(QuietHandler):
+    """
+    Accepts every request and then answers nothing until released.
+    """
+    released = threading.Event()
+    requests = 0
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Waits for the test to end.
+        """
+        StallingHandler.requests += 1
+        StallingHandler.released.wait()
+
+
+class TestSession(TestCase):
+    """
+    Test connection reuse and pool statistics against a local server
+    """
+    def setUp(self) -> None:
+        self.url = serve(self, ChapterHandler)
+        session.configure(pool_size=2, retries=1)
+
+    def tearDown(self) -> None:
+        session.configure()
+
+    def test_connection_reuse(self):
+        """Make sure sequential requests share one kept-alive connection"""
+        url = f"{self.url}/get-chapter/KJV/1/1/"
+        for _ in range(3):
+            response = session.get(url)
+            response.raise_for_status()
+            self.assertEqual(1, response.json()[0]['verse'])
+        stats = session.pool_stats()[self.url]
+        self.assertEqual({"connections": 1, "requests": 3, "idle": 1}, stats)
+
+
+class TestStall(TestCase):
+    """
+    Test that a stalled upstream is not waited on again by the retries
+    """
+    def setUp(self) -> None:
+        StallingHandler.released.clear()
+        StallingHandler.requests = 0
+        self.url = serve(self, StallingHandler)
+        # The default retries, with a short read timeout
+        session.configure(pool_size=2)
+        breaker.reset()
+        self.timeout = session.TIMEOUT
+        session.TIMEOUT = 0.3
+
+    def tearDown(self) -> None:
+        session.TIMEOUT = self.timeout
+        StallingHandler.released.set()
+        session.configure()
+        breaker.reset()
+
+    def test_read_timeout_not_retried(self):
+        """Make sure a read timeout costs one timeout and counts once toward the breaker"""
+        start = time.monotonic()
+        self.assertRaises(requests.ReadTimeout, session.get, f"{self.url}/get-chapter/")
+        self.assertLess(time.monotonic() - start, 2 * session.TIMEOUT)
+        self.assertEqual(1, StallingHandler.requests)
+        self.assertEqual(1, breaker.health()[urlsplit(self.url).netloc]["total_failures"])
@@ -0,0 +1,46 @@
+"""
+Test single-flight call coalescing
+"""
+import threading
+from unittest import TestCase
+from bibles.singleflight import SingleFlight
+
+
+class TestSingleFlight(TestCase):
+    """
+    Test that concurrent calls for a key share one call
+    """
+    def test_shared_outcome(self):
+        """Make sure waiters share the leader's result and exception"""
+        flights = SingleFlight()
+        release = threading.Event()
+        calls = []
+        outcomes = []
+
+        def fetch(value):
+            calls.append(value)
+            release.wait(10)
+            if value == "bad":
+                raise ValueError(value)
+            return value
+
+        def call(value):
+            try:
+                outcomes.append(flights.do(value, fetch, value))
+            except ValueError as exc:
+                outcomes.append(exc)
+
+        threads = [threading.Thread(target=call, args=(value,))
+                   for value in ("good", "good", "good", "bad", "bad")]
+        for thread in threads:
+            thread.start()
+        while flights.shared < 3:
+            release.wait(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(10)
+        self.assertEqual(["bad", "good"], sorted(calls))
+        self.assertEqual(3, outcomes.count("good"))
+        self.assertEqual(2, sum(isinstance(outcome, ValueError) for outcome in outcomes))
+        self.assertEqual(0, flights.in_flight)
+        self.assertEqual("again", flights.do("good", lambda: "again"))
@@ -0,0 +1,66 @@
+"""
+Test the verse bounded LRU
+"""
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+from bibles.persister import PERSISTER
+from bibles.verselru import VerseLRU
+
+
+class TestVerseLRU(TestCase):
+    """
+    Test eviction by recency and persisting the order
+    """
+    def test_eviction(self):
+        """Make sure the least recently read chapters go first and the limit is exact"""
+        lru = VerseLRU(100)
+        self.assertEqual([], lru.add(("Genesis", "1"), 31))
+        self.assertEqual([], lru.add(("Genesis", "2"), 25))
+        self.assertEqual([], lru.add(("John", "3"), 36))
+        lru.touch(("Genesis", "1"))
+        # 92 + 8 fits exactly
+        self.assertEqual([], lru.add(("Jude", "1"), 8))
+        self.assertEqual(100, lru.total)
+        self.assertEqual([("Genesis", "2")], lru.add(("Ruth", "1"), 22))
+        self.assertEqual(97, lru.total)
+        # Re-adding a chapter replaces its count
+        self.assertEqual([], lru.add(("Ruth", "1"), 25))
+        self.assertEqual(100, lru.total)
+        # A chapter over the limit on its own is not kept
+        self.assertEqual(
+            [("John", "3"), ("Genesis", "1"), ("Jude", "1"), ("Ruth", "1"), ("Psalms", "119")],
+            lru.add(("Psalms", "119"), 176)
+        )
+        self.assertEqual(0, lru.total)
+        self.assertEqual(0, len(lru))
+
+    def test_persistence(self):
+        """Make sure the order survives a save and load"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "recency.json")
+            lru = VerseLRU(500, path)
+            self.assertEqual([], lru.load_order())
+            lru.add(("John", "3"), 36)
+            lru.add(("Genesis", "1"), 31)
+            lru.touch(("John", "3"))
+            self.assertGreater(lru.save(), 0)
+            self.assertEqual([("Genesis", "1"), ("John", "3")], VerseLRU(500, path).load_order())
+            with open(path, "w", encoding="utf-8") as order_file:
+                order_file.write("not json")
+            self.assertEqual([], VerseLRU(500, path).load_order())
+            # Let the queued write-behind save happen before the directory goes
+            PERSISTER.flush()
+
+    def test_seeding(self):
+        """Make sure seeding from a cache queues one save that does not force an early flush"""
+        lru = VerseLRU(60, "recency.json")
+        with patch('bibles.verselru.PERSISTER') as persister:
+            self.assertEqual(
+                [("Genesis", "1")],
+                lru.add_all([(("Genesis", "1"), 31), (("Genesis", "2"), 25), (("Jude", "1"), 8)])
+            )
+        persister.mark_dirty.assert_called_once_with(lru, None, count=False)
+        self.assertEqual([("Genesis", "2"), ("Jude", "1")], lru.order())
+        self.assertEqual(33, lru.total)